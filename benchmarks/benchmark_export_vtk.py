@@ -0,0 +1,79 @@
+'''
+Benchmark of exporting the heart scaffold with its annotation groups to vtk.
+Compares finding annotation group membership with containsElement for every element of
+every group, as ExportVtk previously did, with the single pass annotation mask, then times
+complete exports in each format.
+Run from the repository root, e.g.:
+    python benchmarks/benchmark_export_vtk.py --refine 2 --repeat 3
+'''
+
+import argparse
+import io
+import statistics
+import timeit
+from opencmiss.zinc.context import Context
+from scaffoldmaker.meshtypes.meshtype_3d_heart1 import MeshType_3d_heart1
+from scaffoldmaker.utils.exportvtk import ExportVtk
+
+
+def generateHeart(refineCount):
+    '''
+    :return: Zinc context owning region with heart scaffold, list of AnnotationGroup.
+    '''
+    options = MeshType_3d_heart1.getDefaultOptions()
+    if refineCount > 1:
+        options['Refine'] = True
+        options['Refine number of elements surface'] = refineCount
+        options['Refine number of elements through LV wall'] = refineCount
+        options['Refine number of elements through wall'] = refineCount
+    context = Context('benchmark')
+    region = context.getDefaultRegion()
+    annotationGroups = MeshType_3d_heart1.generateMesh(region, options)
+    return context, annotationGroups
+
+
+def getMembershipPerGroup(mesh, annotationGroups):
+    '''
+    Reference implementation testing every element against every group.
+    '''
+    groupsValues = []
+    for annotationGroup in annotationGroups:
+        meshGroup = annotationGroup.getMeshGroup(mesh)
+        values = []
+        elementIter = mesh.createElementiterator()
+        element = elementIter.next()
+        while element.isValid():
+            values.append(1 if meshGroup.containsElement(element) else 0)
+            element = elementIter.next()
+        groupsValues.append(values)
+    return groupsValues
+
+
+def printTimes(label, times):
+    print('{0:40s} min {1:8.4f} s  median {2:8.4f} s  max {3:8.4f} s'.format(
+        label, min(times), statistics.median(times), max(times)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark vtk export of heart scaffold.')
+    parser.add_argument('--refine', type=int, default=1, help='Refine number of elements in each direction, 1 for none.')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs of each kind.')
+    args = parser.parse_args()
+    context, annotationGroups = generateHeart(args.refine)
+    region = context.getDefaultRegion()
+    exportVtk = ExportVtk(region, 'Heart benchmark', annotationGroups)
+    mesh = exportVtk._mesh
+    print('Heart with', mesh.getSize(), 'elements and', len(annotationGroups), 'annotation groups')
+    printTimes('membership per group', timeit.repeat(lambda: getMembershipPerGroup(mesh, annotationGroups),
+        number=1, repeat=args.repeat))
+    printTimes('annotation mask', timeit.repeat(exportVtk._getAnnotationMask, number=1, repeat=args.repeat))
+    for label, kwargs in [
+            ( 'export legacy text', {} ),
+            ( 'export legacy binary', { 'binary' : True } ),
+            ( 'export vtu', { 'vtu' : True } ),
+            ( 'export vtu with annotation mask', { 'vtu' : True, 'annotationMask' : True } ) ]:
+        printTimes(label, timeit.repeat(lambda: exportVtk.write(io.BytesIO(), **kwargs), number=1, repeat=args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+'''
+Benchmark of the start up cost of importing the scaffold registry, with all scaffold types
+or only the one needed.
+Each sample is run in a fresh interpreter so module caches do not hide the cost.
+Run from the repository root, e.g.:
+    python benchmarks/benchmark_import.py --repeat 10
+Compare the output for two commits to measure the effect of a change.
+'''
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+IMPORT_SCRIPT = '''
+import time
+start = time.perf_counter()
+import scaffoldmaker.scaffolds
+scaffoldTypes = scaffoldmaker.scaffolds.Scaffolds().getScaffoldTypes()
+print(time.perf_counter() - start)
+'''
+
+FIND_SCRIPT = '''
+import time
+start = time.perf_counter()
+import scaffoldmaker.scaffolds
+scaffoldType = scaffoldmaker.scaffolds.Scaffolds().findScaffoldTypeByName('3D Box 1')
+print(time.perf_counter() - start)
+'''
+
+STOMACH_SCRIPT = '''
+import time
+from scaffoldmaker.meshtypes.meshtype_3d_stomachhuman1 import MeshType_3d_stomachhuman1
+start = time.perf_counter()
+MeshType_3d_stomachhuman1.getHostStomach()
+print(time.perf_counter() - start)
+'''
+
+
+def timeScript(script, repeat):
+    '''
+    :return: List of times in seconds printed by script, each run in a new process.
+    '''
+    times = []
+    for r in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', script])
+        times.append(float(output.decode().strip().splitlines()[-1]))
+    return times
+
+
+def printTimes(label, times):
+    print('{0:40s} min {1:8.4f} s  median {2:8.4f} s  max {3:8.4f} s'.format(
+        label, min(times), statistics.median(times), max(times)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark import time of scaffoldmaker.scaffolds.')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of fresh processes to time.')
+    args = parser.parse_args()
+    printTimes('import scaffoldmaker.scaffolds', timeScript(IMPORT_SCRIPT, args.repeat))
+    printTimes('import and find one scaffold type', timeScript(FIND_SCRIPT, args.repeat))
+    try:
+        printTimes('first stomach host mesh load', timeScript(STOMACH_SCRIPT, args.repeat))
+    except subprocess.CalledProcessError:
+        print('first stomach host mesh load: not supported by this version')
+
+
+if __name__ == '__main__':
+    main()
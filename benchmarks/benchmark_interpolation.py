@@ -0,0 +1,156 @@
+'''
+Benchmark of array cubic Hermite interpolation, arc length and track surface kernels against
+the list-based functions evaluating one curve or position at a time, and of sampling curves,
+arc length solves and derivative smoothing, including the small curves most scaffolds sample.
+Run from the repository root, e.g.:
+    python benchmarks/benchmark_interpolation.py --points 10 100 1000 10000
+'''
+
+import argparse
+import time
+import numpy as np
+from scaffoldmaker.utils import interpolation as interp
+from scaffoldmaker.utils.tracksurface import TrackSurface, TrackSurfacePosition
+
+
+def timeCall(function, repeats):
+    '''
+    :return: Minimum time in seconds of repeats calls to function.
+    '''
+    minTime = None
+    for r in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if (minTime is None) or (elapsed < minTime):
+            minTime = elapsed
+    return minTime
+
+
+def getKernelCases(pointsCount):
+    '''
+    :return: List of (name, list function, array function) evaluating pointsCount random curves.
+    '''
+    rng = np.random.default_rng(0)
+    v1, d1, v2, d2, radial = [ rng.random((pointsCount, 3)) for i in range(5) ]
+    xi = rng.random(pointsCount)
+    lv1, ld1, lv2, ld2, lradial = [ a.tolist() for a in (v1, d1, v2, d2, radial) ]
+    lxi = xi.tolist()
+    trackSurface = TrackSurface(10, 10, rng.random((121, 3)).tolist(), rng.random((121, 3)).tolist(), rng.random((121, 3)).tolist())
+    positions = trackSurface.createPositionsProportionArray(rng.random((pointsCount, 2)))
+    trackSurfacePositions = [ TrackSurfacePosition(int(e1), int(e2), xi1, xi2) for e1, e2, xi1, xi2 in positions.tolist() ]
+    return [
+        ( 'interpolateCubicHermite',
+            lambda: [ interp.interpolateCubicHermite(lv1[n], ld1[n], lv2[n], ld2[n], lxi[n]) for n in range(pointsCount) ],
+            lambda: interp.interpolateCubicHermiteArray(v1, d1, v2, d2, xi) ),
+        ( 'interpolateCubicHermiteDerivative',
+            lambda: [ interp.interpolateCubicHermiteDerivative(lv1[n], ld1[n], lv2[n], ld2[n], lxi[n]) for n in range(pointsCount) ],
+            lambda: interp.interpolateCubicHermiteDerivativeArray(v1, d1, v2, d2, xi) ),
+        ( 'getCubicHermiteCurvature',
+            lambda: [ interp.getCubicHermiteCurvature(lv1[n], ld1[n], lv2[n], ld2[n], lradial[n], lxi[n]) for n in range(pointsCount) ],
+            lambda: interp.getCubicHermiteCurvatureArray(v1, d1, v2, d2, radial, xi) ),
+        ( 'getCubicHermiteArcLength',
+            lambda: [ interp.getCubicHermiteArcLength(lv1[n], ld1[n], lv2[n], ld2[n]) for n in range(pointsCount) ],
+            lambda: interp.getCubicHermiteArcLengthArray(v1, d1, v2, d2) ),
+        ( 'getCubicHermiteArcLength tolerance 1.0E-8',
+            lambda: [ interp.getCubicHermiteArcLength(lv1[n], ld1[n], lv2[n], ld2[n], tolerance = 1.0E-8) for n in range(pointsCount) ],
+            lambda: interp.getCubicHermiteArcLengthArray(v1, d1, v2, d2, tolerance = 1.0E-8) ),
+        ( 'TrackSurface.evaluateCoordinates',
+            lambda: [ trackSurface.evaluateCoordinates(position, derivatives = True) for position in trackSurfacePositions ],
+            lambda: trackSurface.evaluateCoordinatesMany(positions, derivatives = True) ),
+        ( 'single curve at many xi',
+            lambda: [ interp.interpolateCubicHermite(lv1[0], ld1[0], lv2[0], ld2[0], lxi[n]) for n in range(pointsCount) ],
+            lambda: interp.interpolateCubicHermiteArray(v1[0], d1[0], v2[0], d2[0], xi) ) ]
+
+
+def getSampleCases(pointsCount):
+    '''
+    :return: List of (name, function) sampling a helix into pointsCount elements, and smoothing
+    derivatives along pointsCount lines.
+    '''
+    nodesCount = 11
+    angle = np.linspace(0.0, 4.0*np.pi, nodesCount)
+    dAngle = 4.0*np.pi/(nodesCount - 1)
+    nx = np.stack([ np.cos(angle), np.sin(angle), 0.2*angle ], axis=1).tolist()
+    nd1 = (dAngle*np.stack([ -np.sin(angle), np.cos(angle), np.full(nodesCount, 0.2) ], axis=1)).tolist()
+    nv = np.linspace(1.0, 2.0, nodesCount).tolist()
+    nd = [ 0.1 ]*nodesCount
+    _, _, pe, pxi, psf = interp.sampleCubicHermiteCurves(nx, nd1, pointsCount, arcLengthDerivatives = True)
+    arcDistances = np.linspace(0.0, interp.HermiteCurveArcLengthIndex(nx, nd1).getLength(), pointsCount)
+    # pointsCount lines around a tube of 11 nodes each, with perturbed derivatives to smooth
+    linesCount = pointsCount
+    around = np.linspace(0.0, 2.0*np.pi, linesCount, endpoint=False)
+    ax = np.stack([ np.cos(around)[:, np.newaxis] + 0.1*np.sin(angle), np.repeat(np.sin(around)[:, np.newaxis], nodesCount, axis=1),
+        np.tile(0.2*angle, (linesCount, 1)) ], axis=2)
+    ad1 = np.gradient(ax, axis=1)*(1.0 + 0.2*np.cos(angle))[:, np.newaxis]
+    lx = ax.tolist()
+    ld1 = ad1.tolist()
+    return [
+        ( 'sampleCubicHermiteCurves arc length',
+            lambda: interp.sampleCubicHermiteCurves(nx, nd1, pointsCount, arcLengthDerivatives = True) ),
+        ( 'sampleCubicHermiteCurves',
+            lambda: interp.sampleCubicHermiteCurves(nx, nd1, pointsCount) ),
+        ( 'getCubicHermiteCurvesPointAtArcDistance per point',
+            lambda: [ interp.getCubicHermiteCurvesPointAtArcDistance(nx, nd1, arcDistance) for arcDistance in arcDistances ] ),
+        ( 'HermiteCurveArcLengthIndex.getPointsAtArcDistances',
+            lambda: interp.HermiteCurveArcLengthIndex(nx, nd1).getPointsAtArcDistances(arcDistances) ),
+        ( 'sampleCubicHermiteCurvesSmooth',
+            lambda: interp.sampleCubicHermiteCurvesSmooth(nx, nd1, pointsCount, 0.5/pointsCount, 0.5/pointsCount) ),
+        ( 'computeCubicHermiteArcLength per element',
+            lambda: [ interp.computeCubicHermiteArcLength(nx[e], nd1[e], nx[e + 1], nd1[e + 1], True) for e in range(nodesCount - 1) ] ),
+        ( 'computeCubicHermiteDerivativeScaling per element',
+            lambda: [ interp.computeCubicHermiteDerivativeScaling(nx[e], nd1[e], nx[e + 1], nd1[e + 1]) for e in range(nodesCount - 1) ] ),
+        ( 'smoothCubicHermiteDerivativesLine per line',
+            lambda: [ interp.smoothCubicHermiteDerivativesLine(lx[n], ld1[n], fixStartDerivative = True, fixEndDerivative = True) for n in range(linesCount) ] ),
+        ( 'smoothCubicHermiteDerivativesLineArray',
+            lambda: interp.smoothCubicHermiteDerivativesLineArray(ax, ad1, fixStartDerivative = True, fixEndDerivative = True) ),
+        ( 'interpolateSampleCubicHermite',
+            lambda: interp.interpolateSampleCubicHermite(nv, nd, pe, pxi, psf) ) ]
+
+
+def getSmallSampleCases():
+    '''
+    :return: List of (name, function) sampling helix curves of few nodes into few elements as scaffolds
+    commonly do, and getting a single point along them.
+    '''
+    cases = []
+    for nodesCount, elementsCountOut in ((2, 1), (2, 4), (3, 4), (5, 8), (10, 20), (50, 200)):
+        angle = np.linspace(0.0, 0.1*(nodesCount - 1), nodesCount)
+        nx = np.stack([ np.cos(angle), np.sin(angle), 0.5*angle ], axis=1).tolist()
+        nd1 = (0.1*np.stack([ -np.sin(angle), np.cos(angle), np.full(nodesCount, 0.5) ], axis=1)).tolist()
+        arcDistance = 0.6*interp.HermiteCurveArcLengthIndex(nx, nd1).getLength()
+        name = '{0} nodes {1} elements out'.format(nodesCount, elementsCountOut)
+        cases += [
+            ( 'sampleCubicHermiteCurves ' + name,
+                lambda nx=nx, nd1=nd1, elementsCountOut=elementsCountOut: interp.sampleCubicHermiteCurves(nx, nd1, elementsCountOut) ),
+            ( 'sampleCubicHermiteCurves arc length ' + name,
+                lambda nx=nx, nd1=nd1, elementsCountOut=elementsCountOut:
+                    interp.sampleCubicHermiteCurves(nx, nd1, elementsCountOut, arcLengthDerivatives = True) ),
+            ( 'sampleCubicHermiteCurvesSmooth ' + name,
+                lambda nx=nx, nd1=nd1, elementsCountOut=elementsCountOut:
+                    interp.sampleCubicHermiteCurvesSmooth(nx, nd1, elementsCountOut, 0.05, 0.05) ),
+            ( 'getCubicHermiteCurvesPointAtArcDistance {0} nodes'.format(nodesCount),
+                lambda nx=nx, nd1=nd1, arcDistance=arcDistance: interp.getCubicHermiteCurvesPointAtArcDistance(nx, nd1, arcDistance) ) ]
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark array versus list cubic Hermite interpolation.')
+    parser.add_argument('--points', type=int, nargs='+', default=[ 10, 100, 1000, 10000 ], help='Numbers of points to evaluate.')
+    parser.add_argument('--repeats', type=int, default=5, help='Number of repeats to take minimum time of.')
+    args = parser.parse_args()
+    print('small curves')
+    for name, function in getSmallSampleCases():
+        print('  {0:70s} {1:10.1f} us'.format(name, 1.0E6*timeCall(function, max(args.repeats, 100))))
+    for pointsCount in args.points:
+        print('{0} points'.format(pointsCount))
+        for name, listFunction, arrayFunction in getKernelCases(pointsCount):
+            listTime = timeCall(listFunction, args.repeats)
+            arrayTime = timeCall(arrayFunction, args.repeats)
+            print('  {0:50s} list {1:10.6f} s  array {2:10.6f} s  x{3:.1f}'.format(name, listTime, arrayTime, listTime/arrayTime))
+        for name, function in getSampleCases(pointsCount):
+            print('  {0:50s}      {1:10.6f} s'.format(name, timeCall(function, args.repeats)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+'''
+Benchmark of merging refined node coordinates with the Octree and SpatialGrid.
+Points are the exterior lattice points of elements of a refined spherical shell,
+added per element as MeshRefinement does. Optionally also times refining the
+default 289 element heart scaffold 4x4x4, which needs Zinc, with one or more processes.
+Run from the repository root, e.g.:
+    python benchmarks/benchmark_node_merge.py --elements-around 16 --refine 4 --heart --processes 1 4
+'''
+
+import argparse
+import math
+import time
+import numpy as np
+from scaffoldmaker.utils.octree import Octree
+from scaffoldmaker.utils.spatialgrid import SpatialGrid
+
+
+def getElementExteriorPoints(elementsCountAround, elementsCountUp, refineCount):
+    '''
+    :return: List over elements of array (N, 3) of exterior refined points on a spherical shell.
+    '''
+    n = refineCount
+    xi = np.linspace(0.0, 1.0, n + 1)
+    xi3, xi2, xi1 = np.meshgrid(xi, xi, xi, indexing='ij')
+    exterior = (xi1 == 0.0) | (xi1 == 1.0) | (xi2 == 0.0) | (xi2 == 1.0) | (xi3 == 0.0) | (xi3 == 1.0)
+    elementsPoints = []
+    for e2 in range(elementsCountUp):
+        for e1 in range(elementsCountAround):
+            theta = (e1 + xi1[exterior])*2.0*math.pi/elementsCountAround
+            phi = (e2 + xi2[exterior])*math.pi/elementsCountUp
+            radius = 1.0 + 0.1*xi3[exterior]
+            elementsPoints.append(np.stack([ radius*np.sin(phi)*np.cos(theta),
+                radius*np.sin(phi)*np.sin(theta), radius*np.cos(phi) ], axis=1))
+    return elementsPoints
+
+
+def mergeOctree(elementsPoints):
+    octree = Octree([ -2.0, -2.0, -2.0 ], [ 2.0, 2.0, 2.0 ])
+    nodeIdentifier = 1
+    for points in elementsPoints:
+        for x in points.tolist():
+            if octree.findObjectByCoordinates(x) is None:
+                octree.addObjectAtCoordinates(x, nodeIdentifier)
+                nodeIdentifier += 1
+    return nodeIdentifier - 1
+
+
+def mergeSpatialGrid(elementsPoints):
+    grid = SpatialGrid([ -2.0, -2.0, -2.0 ], [ 2.0, 2.0, 2.0 ])
+    nodeIdentifier = 1
+    for points in elementsPoints:
+        found = grid.findObjectsByCoordinates(points)
+        newPoints = points[found < 0]
+        # merge coincident points within element e.g. at poles
+        distances = np.linalg.norm(newPoints[:, np.newaxis, :] - newPoints[np.newaxis, :, :], axis=2)
+        unique = newPoints[~np.any(np.tril(distances < grid._tolerance, -1), axis=1)]
+        grid.addObjectsAtCoordinates(unique, np.arange(nodeIdentifier, nodeIdentifier + unique.shape[0]))
+        nodeIdentifier += unique.shape[0]
+    return nodeIdentifier - 1
+
+
+def timeHeartRefinement(refineCount, processesCount):
+    from opencmiss.zinc.context import Context
+    from scaffoldmaker.meshtypes.meshtype_3d_heart1 import MeshType_3d_heart1
+    from scaffoldmaker.utils.meshrefinement import MeshRefinement
+    MeshRefinement.defaultProcessesCount = processesCount
+    options = MeshType_3d_heart1.getDefaultOptions()
+    options['Refine'] = True
+    options['Refine number of elements surface'] = refineCount
+    options['Refine number of elements through LV wall'] = refineCount
+    options['Refine number of elements through wall'] = refineCount
+    context = Context('benchmark')
+    region = context.getDefaultRegion()
+    start = time.perf_counter()
+    MeshType_3d_heart1.generateMesh(region, options)
+    elapsed = time.perf_counter() - start
+    mesh = region.getFieldmodule().findMeshByDimension(3)
+    return elapsed, mesh.getSize()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Octree and SpatialGrid node merging.')
+    parser.add_argument('--elements-around', type=int, default=16)
+    parser.add_argument('--refine', type=int, default=4)
+    parser.add_argument('--heart', action='store_true', help='Also time refining heart scaffold (needs Zinc).')
+    parser.add_argument('--processes', type=int, nargs='+', default=[ 1 ], help='Numbers of processes to refine heart with.')
+    args = parser.parse_args()
+    elementsPoints = getElementExteriorPoints(args.elements_around, args.elements_around//2, args.refine)
+    pointsCount = sum(points.shape[0] for points in elementsPoints)
+    print('Merging', pointsCount, 'exterior points from', len(elementsPoints), 'elements')
+    for label, merge in [ ('Octree', mergeOctree), ('SpatialGrid', mergeSpatialGrid) ]:
+        start = time.perf_counter()
+        nodesCount = merge(elementsPoints)
+        print('{0:12s} {1:8.4f} s  {2} nodes'.format(label, time.perf_counter() - start, nodesCount))
+    if args.heart:
+        for processesCount in args.processes:
+            elapsed, elementsCount = timeHeartRefinement(args.refine, processesCount)
+            print('Heart refined {0}x{0}x{0} with {1} processes: {2:8.4f} s  {3} elements'.format(
+                args.refine, processesCount, elapsed, elementsCount))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+'''
+Benchmark of regenerating refined scaffolds when only refinement options change, with and
+without caching of base meshes.
+Run from the repository root, e.g.:
+    python benchmarks/benchmark_refine_incremental.py --refine 2 3 4
+'''
+
+import argparse
+import time
+from opencmiss.zinc.context import Context
+from scaffoldmaker.meshtypes.meshtype_3d_colon1 import MeshType_3d_colon1
+from scaffoldmaker.meshtypes.meshtype_3d_heart1 import MeshType_3d_heart1
+from scaffoldmaker.meshtypes.meshtype_3d_smallintestine1 import MeshType_3d_smallintestine1
+from scaffoldmaker.meshtypes.meshtype_3d_sphereshell1 import MeshType_3d_sphereshell1
+from scaffoldmaker.utils.basemeshcache import getBaseMeshCacheCounts, setBaseMeshCacheSize
+
+
+def timeRefinements(scaffoldType, refineCounts):
+    '''
+    :return: Total time to generate scaffold refined by each of refineCounts in all directions.
+    '''
+    options = scaffoldType.getDefaultOptions()
+    options['Refine'] = True
+    elapsed = 0.0
+    for refineCount in refineCounts:
+        for key in options:
+            if key.startswith('Refine number of elements'):
+                options[key] = refineCount
+        context = Context('benchmark')
+        region = context.getDefaultRegion()
+        start = time.perf_counter()
+        scaffoldType.generateMesh(region, options)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark regenerating refined scaffolds with base mesh cache.')
+    parser.add_argument('--refine', type=int, nargs='+', default=[ 2, 3, 4 ], help='Sequence of refine counts.')
+    args = parser.parse_args()
+    for scaffoldType in [ MeshType_3d_heart1, MeshType_3d_colon1, MeshType_3d_sphereshell1, MeshType_3d_smallintestine1 ]:
+        setBaseMeshCacheSize(0)
+        uncachedTime = timeRefinements(scaffoldType, args.refine)
+        setBaseMeshCacheSize(4)
+        cachedTime = timeRefinements(scaffoldType, args.refine)
+        print('{0:30s} uncached {1:8.4f} s  cached {2:8.4f} s  hits, misses {3}'.format(
+            scaffoldType.getName(), uncachedTime, cachedTime, getBaseMeshCacheCounts()))
+    setBaseMeshCacheSize(0)
+
+
+if __name__ == '__main__':
+    main()
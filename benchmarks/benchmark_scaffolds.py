@@ -0,0 +1,197 @@
+'''
+Benchmark suite generating every registered scaffold type with each of its parameter sets,
+as base meshes with element counts scaled by each resolution factor, and as default meshes
+refined by each resolution factor. Records wall time, peak memory and node and element counts.
+Each case is run in a fresh worker process so peak memory is per case and one failing or
+slow scaffold does not affect the others.
+Run from the repository root, e.g.:
+    python benchmarks/benchmark_scaffolds.py --output results.json
+    python benchmarks/benchmark_scaffolds.py --scaffolds "3D Heart 1" --compare results.json
+Results are written with the git commit they were made on; pass a previous results file to
+--compare to report cases which are slower than it by more than the tolerance.
+'''
+
+import argparse
+import json
+import multiprocessing
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows: peak memory is not recorded
+    resource = None
+
+# name, scale factor for element counts or refinement
+RESOLUTIONS = [ ( 'small', 1 ), ( 'medium', 2 ), ( 'large', 3 ) ]
+
+
+def getPeakMemory():
+    '''
+    :return: Peak resident memory of this process in MB, or None if unknown.
+    '''
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return maxrss / (1048576.0 if (sys.platform == 'darwin') else 1024.0)
+
+
+def getCaseOptions(scaffoldType, parameterSetName, mode, scale):
+    '''
+    :param mode: 'base' to multiply element count options by scale, or 'refine' to refine the
+    default mesh by scale in all directions.
+    :return: Options dict for case, or None if scaffold type does not support the mode.
+    '''
+    options = scaffoldType.getDefaultOptions(parameterSetName)
+    if mode == 'base':
+        for key, value in options.items():
+            if key.startswith('Number of elements') and isinstance(value, int) and not isinstance(value, bool):
+                options[key] = value*scale
+    else:
+        if 'Refine' not in options:
+            return None
+        options['Refine'] = True
+        for key in options:
+            if key.startswith('Refine number of elements'):
+                options[key] = scale
+    scaffoldType.checkOptions(options)
+    return options
+
+
+def runCase(case):
+    '''
+    Generate one benchmark case. Called in a fresh worker process.
+    :param case: Tuple of scaffold type name, parameter set name, mode, resolution name, scale.
+    :return: Result dict.
+    '''
+    from opencmiss.zinc.context import Context
+    from opencmiss.zinc.field import Field
+    from scaffoldmaker.scaffolds import Scaffolds
+    scaffoldTypeName, parameterSetName, mode, resolutionName, scale = case
+    result = { 'scaffold' : scaffoldTypeName, 'parameterSet' : parameterSetName, 'mode' : mode,
+        'resolution' : resolutionName }
+    scaffoldType = Scaffolds().findScaffoldTypeByName(scaffoldTypeName)
+    options = getCaseOptions(scaffoldType, parameterSetName, mode, scale)
+    if options is None:
+        result['status'] = 'skipped'
+        return result
+    context = Context('benchmark')
+    region = context.getDefaultRegion()
+    memoryBefore = getPeakMemory()
+    start = time.perf_counter()
+    try:
+        scaffoldType.generateMesh(region, options)
+    except Exception as e:
+        result['status'] = 'error'
+        result['message'] = repr(e)
+        return result
+    result['time'] = time.perf_counter() - start
+    result['status'] = 'ok'
+    result['peakMemory'] = getPeakMemory()
+    result['baseMemory'] = memoryBefore
+    fieldmodule = region.getFieldmodule()
+    result['nodesCount'] = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES).getSize()
+    for dimension in range(3, 0, -1):
+        result['elementsCount'] = fieldmodule.findMeshByDimension(dimension).getSize()
+        if result['elementsCount'] > 0:
+            break
+    return result
+
+
+def getCases(scaffoldTypeNames, modes, resolutions):
+    from scaffoldmaker.scaffolds import Scaffolds
+    cases = []
+    for scaffoldType in Scaffolds().getScaffoldTypes():
+        if scaffoldTypeNames and (scaffoldType.getName() not in scaffoldTypeNames):
+            continue
+        for parameterSetName in scaffoldType.getParameterSetNames():
+            for mode in modes:
+                for resolutionName, scale in resolutions:
+                    cases.append(( scaffoldType.getName(), parameterSetName, mode, resolutionName, scale ))
+    return cases
+
+
+def getCaseKey(result):
+    return ( result['scaffold'], result['parameterSet'], result['mode'], result['resolution'] )
+
+
+def getGitCommit():
+    try:
+        return subprocess.check_output([ 'git', 'rev-parse', '--short', 'HEAD' ], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def printResult(result, baselineResult=None, tolerance=0.0):
+    label = '{0} / {1} / {2} {3}'.format(result['scaffold'], result['parameterSet'], result['mode'], result['resolution'])
+    if result['status'] != 'ok':
+        print('{0:70s} {1} {2}'.format(label, result['status'], result.get('message', '')))
+        return False
+    line = '{0:70s} {1:9.4f} s  {2:8d} nodes  {3:8d} elements'.format(label, result['time'], result['nodesCount'], result['elementsCount'])
+    if result['peakMemory'] is not None:
+        line += '  {0:8.1f} MB'.format(result['peakMemory'])
+    regression = False
+    if baselineResult and (baselineResult['status'] == 'ok'):
+        ratio = result['time']/baselineResult['time'] if (baselineResult['time'] > 0.0) else 1.0
+        line += '  x{0:.2f}'.format(ratio)
+        if ratio > (1.0 + tolerance):
+            line += '  SLOWER'
+            regression = True
+        if (result['nodesCount'] != baselineResult['nodesCount']) or (result['elementsCount'] != baselineResult['elementsCount']):
+            line += '  COUNTS CHANGED'
+    print(line)
+    return regression
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark generation of all scaffolds and parameter sets at several resolutions.')
+    parser.add_argument('--scaffolds', nargs='+', default=None, help='Names of scaffold types to benchmark. Default all.')
+    parser.add_argument('--modes', nargs='+', choices=[ 'base', 'refine' ], default=[ 'base', 'refine' ], help='Modes to benchmark.')
+    parser.add_argument('--resolutions', nargs='+', choices=[ name for name, scale in RESOLUTIONS ],
+        default=[ name for name, scale in RESOLUTIONS ], help='Resolutions to benchmark.')
+    parser.add_argument('--timeout', type=float, default=600.0, help='Maximum time in seconds for each case.')
+    parser.add_argument('--output', default=None, help='JSON file to write results to.')
+    parser.add_argument('--compare', default=None, help='JSON results file from a previous run to compare times with.')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Relative slow down reported as a regression.')
+    args = parser.parse_args()
+    resolutions = [ resolution for resolution in RESOLUTIONS if resolution[0] in args.resolutions ]
+    baselineResults = {}
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baselineResults = { getCaseKey(result) : result for result in json.load(f)['results'] }
+    results = []
+    regressionsCount = 0
+    # new process for each case to measure its peak memory
+    pool = multiprocessing.Pool(processes=1, maxtasksperchild=1)
+    try:
+        for case in getCases(args.scaffolds, args.modes, resolutions):
+            asyncResult = pool.apply_async(runCase, ( case, ))
+            try:
+                result = asyncResult.get(args.timeout)
+            except multiprocessing.TimeoutError:
+                # worker is still busy: replace the pool
+                pool.terminate()
+                pool = multiprocessing.Pool(processes=1, maxtasksperchild=1)
+                result = { 'scaffold' : case[0], 'parameterSet' : case[1], 'mode' : case[2], 'resolution' : case[3], 'status' : 'timeout' }
+            except Exception as e:
+                result = { 'scaffold' : case[0], 'parameterSet' : case[1], 'mode' : case[2], 'resolution' : case[3], 'status' : 'error',
+                    'message' : repr(e) }
+            results.append(result)
+            if result['status'] != 'skipped':
+                if printResult(result, baselineResults.get(getCaseKey(result)), args.tolerance):
+                    regressionsCount += 1
+    finally:
+        pool.close()
+        pool.join()
+    if args.compare:
+        print('{0} cases slower than {1} by more than {2:.0%}'.format(regressionsCount, args.compare, args.tolerance))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({ 'commit' : getGitCommit(), 'python' : sys.version, 'results' : results }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+'''
+Benchmark of loading the human stomach host mesh from its binary arrays,
+compared with parsing the equivalent EX text model as was previously done.
+Run from the repository root, e.g.:
+    python benchmarks/benchmark_stomach_host.py --repeat 10
+'''
+
+import argparse
+import statistics
+import timeit
+import numpy as np
+from opencmiss.utils.zinc.field import findOrCreateFieldCoordinates, findOrCreateFieldFibres
+from opencmiss.zinc.context import Context
+from opencmiss.zinc.element import Element, Elementbasis
+from opencmiss.zinc.field import Field
+from opencmiss.zinc.node import Node
+from scaffoldmaker.meshtypes.meshtype_3d_stomachhuman1 import hostCoordinatesValueLabels, hostMeshFileName
+from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubichermite
+
+
+def loadArrays():
+    with np.load(hostMeshFileName) as hostMeshArrays:
+        return { name : hostMeshArrays[name] for name in hostMeshArrays.files }
+
+
+def createHostMesh(region, hostMesh):
+    '''
+    Define host mesh nodes, elements, coordinates and fibres in region directly from arrays,
+    avoiding parsing a text EX model.
+    Coordinates are tricubic Hermite with cross derivatives; fibres are trilinear Lagrange,
+    with the fibre angle optionally from node version 2 for some local nodes.
+    All host mesh scale factors are unit so none are defined.
+    :param region: Empty Zinc region to create host mesh in.
+    :param hostMesh: Dict of host mesh arrays, see Stomach.getHostElementParameters().
+    :return: Dict of element identifier to Zinc element.
+    '''
+    fieldModule = region.getFieldmodule()
+    fieldModule.beginChange()
+    coordinates = findOrCreateFieldCoordinates(fieldModule)
+    fibres = findOrCreateFieldFibres(fieldModule)
+
+    nodeset = fieldModule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+    nodetemplates = []
+    for fibreAngleVersionsCount in range(1, 3):
+        nodetemplate = nodeset.createNodetemplate()
+        nodetemplate.defineField(coordinates)
+        for valueLabel in hostCoordinatesValueLabels:
+            nodetemplate.setValueNumberOfVersions(coordinates, -1, valueLabel, 1)
+        nodetemplate.defineField(fibres)
+        nodetemplate.setValueNumberOfVersions(fibres, 1, Node.VALUE_LABEL_VALUE, fibreAngleVersionsCount)
+        nodetemplates.append(nodetemplate)
+    fieldCache = fieldModule.createFieldcache()
+    nodeCoordinates = hostMesh['nodeCoordinates'].tolist()
+    nodeFibres = hostMesh['nodeFibres'].tolist()
+    nodeFibreAngleVersionsCount = hostMesh['nodeFibreAngleVersionsCount'].tolist()
+    nodeFibreAngleVersion2 = hostMesh['nodeFibreAngleVersion2'].tolist()
+    for n, nodeIdentifier in enumerate(hostMesh['nodeIdentifiers'].tolist()):
+        node = nodeset.createNode(nodeIdentifier, nodetemplates[nodeFibreAngleVersionsCount[n] - 1])
+        fieldCache.setNode(node)
+        for v, valueLabel in enumerate(hostCoordinatesValueLabels):
+            coordinates.setNodeParameters(fieldCache, -1, valueLabel, 1, nodeCoordinates[n][v])
+        fibres.setNodeParameters(fieldCache, -1, Node.VALUE_LABEL_VALUE, 1, nodeFibres[n])
+        if nodeFibreAngleVersionsCount[n] > 1:
+            fibres.setNodeParameters(fieldCache, 1, Node.VALUE_LABEL_VALUE, 2, [ nodeFibreAngleVersion2[n] ])
+
+    mesh = fieldModule.findMeshByDimension(3)
+    tricubichermite = eftfactory_tricubichermite(mesh, True)
+    coordinatesEft = tricubichermite.createEftBasic()
+    linearBasis = fieldModule.createElementbasis(3, Elementbasis.FUNCTION_TYPE_LINEAR_LAGRANGE)
+    fibresEft = mesh.createElementfieldtemplate(linearBasis)
+    # element template and efts for each distinct set of local node fibre angle versions
+    elementtemplatesEfts = dict()
+    elements = dict()
+    elementNodeIdentifiers = hostMesh['elementNodeIdentifiers'].tolist()
+    elementFibreAngleVersions = hostMesh['elementFibreAngleVersions'].tolist()
+    for e, elementIdentifier in enumerate(hostMesh['elementIdentifiers'].tolist()):
+        fibreAngleVersions = tuple(elementFibreAngleVersions[e])
+        elementtemplateEfts = elementtemplatesEfts.get(fibreAngleVersions)
+        if not elementtemplateEfts:
+            elementtemplate = mesh.createElementtemplate()
+            elementtemplate.setElementShapeType(Element.SHAPE_TYPE_CUBE)
+            elementtemplate.defineField(coordinates, -1, coordinatesEft)
+            efts = [ coordinatesEft, fibresEft ]
+            if max(fibreAngleVersions) > 1:
+                fibreAngleEft = mesh.createElementfieldtemplate(linearBasis)
+                for n in range(8):
+                    fibreAngleEft.setTermNodeParameter(n + 1, 1, n + 1, Node.VALUE_LABEL_VALUE, fibreAngleVersions[n])
+                elementtemplate.defineField(fibres, 1, fibreAngleEft)
+                elementtemplate.defineField(fibres, 2, fibresEft)
+                elementtemplate.defineField(fibres, 3, fibresEft)
+                efts.append(fibreAngleEft)
+            else:
+                elementtemplate.defineField(fibres, -1, fibresEft)
+            elementtemplateEfts = elementtemplatesEfts[fibreAngleVersions] = ( elementtemplate, efts )
+        elementtemplate, efts = elementtemplateEfts
+        element = mesh.createElement(elementIdentifier, elementtemplate)
+        for eft in efts:
+            element.setNodesByIdentifier(eft, elementNodeIdentifiers[e])
+        elements[elementIdentifier] = element
+    fieldModule.endChange()
+    return elements
+
+
+def loadFromArrays():
+    '''
+    Read host mesh arrays and build a Zinc region from them.
+    '''
+    context = Context('benchmark')
+    createHostMesh(context.getDefaultRegion(), loadArrays())
+    return context
+
+
+def getHostMeshText():
+    '''
+    :return: Host mesh serialised as EX text, as previously embedded in the module.
+    '''
+    context = loadFromArrays()
+    region = context.getDefaultRegion()
+    sir = region.createStreaminformationRegion()
+    srm = sir.createStreamresourceMemory()
+    region.write(sir)
+    result, text = srm.getBuffer()
+    return text
+
+
+def loadFromText(text):
+    context = Context('benchmark')
+    region = context.getDefaultRegion()
+    sir = region.createStreaminformationRegion()
+    sir.createStreamresourceMemoryBuffer(text)
+    region.read(sir)
+    return context
+
+
+def printTimes(label, times):
+    print('{0:40s} min {1:8.4f} s  median {2:8.4f} s  max {3:8.4f} s'.format(
+        label, min(times), statistics.median(times), max(times)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark stomach host mesh load from arrays and EX text.')
+    parser.add_argument('--repeat', type=int, default=10, help='Number of timed loads of each kind.')
+    args = parser.parse_args()
+    text = getHostMeshText()
+    printTimes('load arrays only', timeit.repeat(loadArrays, number=1, repeat=args.repeat))
+    printTimes('load arrays and build region', timeit.repeat(loadFromArrays, number=1, repeat=args.repeat))
+    printTimes('parse EX text (' + str(len(text)) + ' bytes)',
+        timeit.repeat(lambda: loadFromText(text), number=1, repeat=args.repeat))
+
+
+if __name__ == '__main__':
+    main()
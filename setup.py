@@ -43,7 +43,9 @@ setup(
     license="Apache Software License",
     packages=find_packages("src"),
     package_dir={"": "src"},
+    package_data={"scaffoldmaker": ["meshtypes/data/*.npz"]},
     include_package_data=True,
     zip_safe=False,
     install_requires=requires,
+    entry_points={"console_scripts": ["scaffoldmaker-batch = scaffoldmaker.batch:main"]},
     )
@@ -3,6 +3,7 @@ Describes subdomains of a scaffold with attached names and terms.
 """
 
 from opencmiss.zinc.field import FieldGroup
+from scaffoldmaker.utils.profiling import profiled
 
 class AnnotationGroup(object):
     '''
@@ -76,6 +77,7 @@ class AnnotationGroup(object):
         '''
         return self.getFieldNodeGroup(nodeset).getNodesetGroup()
 
+    @profiled()
     def addSubelements(self):
         '''
         Call after group is complete and faces have been defined to add faces and
@@ -0,0 +1,167 @@
+"""
+Generate batches of scaffolds e.g. parameter sweeps in a pool of processes.
+Jobs are dicts with keys:
+    scaffoldTypeName: Name of scaffold type, as returned by its getName().
+    scaffoldSettings: Optional dict of options to change from defaults of the parameter set.
+    parameterSetName: Optional parameter set name to get default options from, default 'Default'.
+    meshEdits: Optional Zinc model file string of node edits as for ScaffoldPackage.
+    name: Optional name of output file, without extension. Default 'job<number>'.
+Can be run from the command line with a JSON file containing a list of jobs:
+    python -m scaffoldmaker.batch jobs.json --output-directory out --processes 4 --timeout 600
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import signal
+import statistics
+import time
+from opencmiss.zinc.context import Context
+from opencmiss.zinc.field import Field
+from scaffoldmaker.scaffoldpackage import ScaffoldPackage
+from scaffoldmaker.scaffolds import Scaffolds, Scaffolds_decodeJSON, Scaffolds_JSONEncoder
+from scaffoldmaker.utils.profiling import GenerationProfiler
+
+# per worker process Zinc context and scaffolds, created by _initialiseWorker
+_workerContext = None
+_workerScaffolds = None
+
+
+class JobTimeoutError(Exception):
+    pass
+
+
+def _initialiseWorker():
+    global _workerContext, _workerScaffolds
+    _workerContext = Context('scaffoldmaker batch')
+    _workerScaffolds = Scaffolds()
+
+
+def _raiseJobTimeout(signum, frame):
+    raise JobTimeoutError()
+
+
+def runJob(job, outputFileName, timeout=None, profile=False):
+    '''
+    Generate scaffold for job and write it to a Zinc model file. Called in worker process.
+    :param job: Job dict as described for module.
+    :param outputFileName: Name of Zinc model file to write.
+    :param timeout: Maximum time in seconds for job, or None for no limit. Only enforced on
+    platforms supporting SIGALRM.
+    :param profile: If True, write stage timings and Zinc call counts for generation to
+    JSON file with the same name as outputFileName plus .profile.json.
+    :return: Dict with status 'ok', 'timeout' or 'error', elapsed time in seconds, elements count
+    or error message.
+    '''
+    if _workerContext is None:
+        _initialiseWorker()
+    start = time.perf_counter()
+    useAlarm = bool(timeout) and hasattr(signal, 'setitimer')
+    if useAlarm:
+        signal.signal(signal.SIGALRM, _raiseJobTimeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    region = None
+    try:
+        scaffoldType = _workerScaffolds.findScaffoldTypeByName(job['scaffoldTypeName'])
+        if scaffoldType is None:
+            raise ValueError('Unknown scaffold type ' + job['scaffoldTypeName'])
+        scaffoldPackage = ScaffoldPackage(scaffoldType, job, job.get('parameterSetName', 'Default'))
+        region = _workerContext.getDefaultRegion().createRegion()
+        if profile:
+            with GenerationProfiler(job['scaffoldTypeName']) as profiler:
+                scaffoldPackage.generate(region)
+            profiler.writeFile(os.path.splitext(outputFileName)[0] + '.profile.json')
+        else:
+            scaffoldPackage.generate(region)
+        if useAlarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        region.writeFile(outputFileName)
+        fieldmodule = region.getFieldmodule()
+        elementsCount = 0
+        for dimension in range(3, 0, -1):
+            elementsCount = fieldmodule.findMeshByDimension(dimension).getSize()
+            if elementsCount > 0:
+                break
+        result = { 'status' : 'ok', 'elementsCount' : elementsCount,
+            'nodesCount' : fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES).getSize() }
+    except JobTimeoutError:
+        result = { 'status' : 'timeout' }
+    except Exception as e:
+        result = { 'status' : 'error', 'message' : repr(e) }
+    finally:
+        if useAlarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    result['elapsed'] = time.perf_counter() - start
+    return result
+
+
+def runBatch(jobs, outputDirectory, processesCount=None, timeout=None, profile=False):
+    '''
+    Generate scaffolds for all jobs in a pool of processes, each with its own Zinc context,
+    writing each to a Zinc model file in outputDirectory.
+    :param jobs: List of job dicts as described for module.
+    :param outputDirectory: Directory to write model files to, created if needed.
+    :param processesCount: Number of worker processes, or None for number of CPUs.
+    :param timeout: Maximum time in seconds for each job, or None for no limit.
+    :param profile: If True, write profile of each job to <name>.profile.json. See runJob().
+    :return: List of result dicts for jobs in order. See runJob(); also have name and fileName.
+    '''
+    os.makedirs(outputDirectory, exist_ok=True)
+    names = [ job.get('name', 'job' + str(j + 1)) for j, job in enumerate(jobs) ]
+    assert len(set(names)) == len(names), 'runBatch:  Job names are not unique'
+    fileNames = [ os.path.join(outputDirectory, name + '.exf') for name in names ]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processesCount, initializer=_initialiseWorker) as executor:
+        futures = [ executor.submit(runJob, job, fileName, timeout, profile) for job, fileName in zip(jobs, fileNames) ]
+        results = []
+        for future in futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                # e.g. worker process died
+                result = { 'status' : 'error', 'message' : repr(e), 'elapsed' : 0.0 }
+            results.append(result)
+    for result, name, fileName in zip(results, names, fileNames):
+        result['name'] = name
+        result['fileName'] = fileName if (result['status'] == 'ok') else None
+    return results
+
+
+def getTimingSummary(results):
+    '''
+    :param results: List of results from runBatch().
+    :return: Multi-line string summarising status counts and timings.
+    '''
+    lines = []
+    for status in [ 'ok', 'timeout', 'error' ]:
+        times = [ result['elapsed'] for result in results if result['status'] == status ]
+        if times:
+            lines.append('{0:8s} {1:6d} jobs  total {2:10.3f} s  min {3:8.3f} s  median {4:8.3f} s  max {5:8.3f} s'.format(
+                status, len(times), sum(times), min(times), statistics.median(times), max(times)))
+    for result in results:
+        if result['status'] == 'error':
+            lines.append(result['name'] + ': ' + result['message'])
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a batch of scaffolds in a pool of processes.')
+    parser.add_argument('jobs', help='JSON file containing list of jobs.')
+    parser.add_argument('--output-directory', default='.', help='Directory to write model files and summary.json to.')
+    parser.add_argument('--processes', type=int, default=None, help='Number of worker processes. Default is number of CPUs.')
+    parser.add_argument('--timeout', type=float, default=None, help='Maximum time in seconds for each job.')
+    parser.add_argument('--profile', action='store_true', help='Write stage timings of each job to <name>.profile.json.')
+    args = parser.parse_args()
+    with open(args.jobs, 'r') as f:
+        jobs = json.load(f, object_hook=Scaffolds_decodeJSON)
+    start = time.perf_counter()
+    results = runBatch(jobs, args.output_directory, args.processes, args.timeout, args.profile)
+    elapsed = time.perf_counter() - start
+    with open(os.path.join(args.output_directory, 'summary.json'), 'w') as f:
+        json.dump(results, f, indent=2, cls=Scaffolds_JSONEncoder)
+    print(getTimingSummary(results))
+    print('{0} jobs in {1:.3f} s'.format(len(jobs), elapsed))
+
+
+if __name__ == '__main__':
+    main()
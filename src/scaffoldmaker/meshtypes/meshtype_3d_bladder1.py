@@ -5,6 +5,7 @@ Generates a 3-D bladder mesh with variable numbers of elements around and up.
 from __future__ import division
 import math
 import copy
+import numpy as np
 from opencmiss.utils.zinc.field import findOrCreateFieldCoordinates
 from opencmiss.zinc.element import Element
 from opencmiss.zinc.field import Field
@@ -20,6 +21,7 @@ from scaffoldmaker.utils.interpolation import getCubicHermiteBasis, smoothCubicH
 from scaffoldmaker.utils import vector
 from scaffoldmaker.utils.meshrefinement import MeshRefinement
 from scaffoldmaker.utils.tracksurface import TrackSurface, TrackSurfacePosition, calculate_surface_axes
+from scaffoldmaker.utils.zinc_utils import createNodesFromArrays
 
 
 class MeshType_3d_bladder1(Scaffold_base):
@@ -253,6 +255,7 @@ class MeshType_3d_bladder1(Scaffold_base):
             nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D2_DS1DS2, 1)
         else:
             nodetemplate = nodetemplateApex
+        valueLabels = [ Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2 ]
 
         mesh = fm.findMeshByDimension(3)
         eftfactory = eftfactory_bicubichermitelinear(mesh, useCrossDerivatives)
@@ -262,8 +265,6 @@ class MeshType_3d_bladder1(Scaffold_base):
         elementtemplate.setElementShapeType(Element.SHAPE_TYPE_CUBE)
         elementtemplate.defineField(coordinates, -1, eft)
 
-        cache = fm.createFieldcache()
-
         neckGroup = AnnotationGroup(region, 'neck of bladder', FMANumber='unknown', lyphID='unknown')
         bodyGroup = AnnotationGroup(region, 'body of bladder', FMANumber='unknown', lyphID='unknown')
         annotationGroups = [neckGroup, bodyGroup]
@@ -513,15 +514,11 @@ class MeshType_3d_bladder1(Scaffold_base):
         for n2 in range(len(listTotalOuter_x)):
             if (n2 != (ostiumElementPositionUp + 1) * elementsCountAround + ostiumElementPositionAround + 1) and\
                     (n2 != (ostiumElementPositionUp + 1) * elementsCountAround + elementsCountAround - ostiumElementPositionAround - 1):
-                node = nodes.createNode(nodeIdentifier, nodetemplate)
-                cache.setNode(node)
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, listTotalOuter_x[n2])
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, listTotalOuter_d1[n2])
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, listTotalOuter_d2[n2])
-                nodeIdentifier += 1
                 outerLayer_x.append(listTotalOuter_x[n2])
                 outerLayer_d1.append(listTotalOuter_d1[n2])
                 outerLayer_d2.append(listTotalOuter_d2[n2])
+        nodeIdentifier = createNodesFromArrays(nodes, nodetemplate, [ ( coordinates, valueLabels,
+            np.stack([ outerLayer_x, outerLayer_d1, outerLayer_d2 ], axis=1) ) ], nodeIdentifier)
 
         # create and set nodes of inner layer of the bladder
         listTotalInner_x = []
@@ -559,13 +556,6 @@ class MeshType_3d_bladder1(Scaffold_base):
         for n2 in range(len(listTotalInner_x)):
             if (n2 != (ostiumElementPositionUp + 1) * elementsCountAround + ostiumElementPositionAround + 1) and \
                     (n2 != (ostiumElementPositionUp + 1) * elementsCountAround + elementsCountAround - ostiumElementPositionAround - 1):
-                node = nodes.createNode(nodeIdentifier, nodetemplate)
-                cache.setNode(node)
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, listTotalInner_x[n2])
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, listTotalInner_d1[n2])
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, listTotalInner_d2[n2])
-                nodeIdentifier += 1
-
                 innerLayer_x.append(listTotalInner_x[n2])
                 innerLayer_d1.append(listTotalInner_d1[n2])
                 innerLayer_d2.append(listTotalInner_d2[n2])
@@ -574,18 +564,15 @@ class MeshType_3d_bladder1(Scaffold_base):
         x = [0.0, 0.0, height - bladderWallThickness]
         dx_ds1 = [height*radiansPerElementUpBody/2, 0.0, 0.0]
         dx_ds2 = [0.0, height*radiansPerElementUpBody/2, 0.0]
-        node = nodes.createNode(nodeIdentifier, nodetemplate)
-        cache.setNode(node)
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, x)
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, dx_ds1)
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, dx_ds2)
         listTotalInner_x.append(x)
         listTotalInner_d1.append(dx_ds1)
         listTotalInner_d2.append(dx_ds2)
         innerLayer_x.append(x)
         innerLayer_d1.append(dx_ds1)
         innerLayer_d2.append(dx_ds2)
-        nodeIdentifier += 1
+        # create nodes of inner layer including apex
+        nodeIdentifier = createNodesFromArrays(nodes, nodetemplate, [ ( coordinates, valueLabels,
+            np.stack([ innerLayer_x, innerLayer_d1, innerLayer_d2 ], axis=1) ) ], nodeIdentifier)
 
         # create ureters on the surface
         elementIdentifier = 1
@@ -9,6 +9,7 @@ from scaffoldmaker.meshtypes.meshtype_1d_path1 import MeshType_1d_path1, extract
 from scaffoldmaker.meshtypes.meshtype_3d_colonsegment1 import MeshType_3d_colonsegment1, ColonSegmentTubeMeshInnerPoints, getTeniaColi, createFlatAndTextureCoordinatesTeniaColi, createNodesAndElementsTeniaColi
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
 from scaffoldmaker.scaffoldpackage import ScaffoldPackage
+from scaffoldmaker.utils.basemeshcache import generateBaseMeshForRefinement
 from scaffoldmaker.utils.meshrefinement import MeshRefinement
 from scaffoldmaker.utils import interpolation as interp
 from scaffoldmaker.utils import tubemesh
@@ -394,14 +395,9 @@ class MeshType_3d_colon1(Scaffold_base):
         del tmpRegion
 
         # find arclength of colon
-        length = 0.0
-        elementsCountIn = len(cx) - 1
         sd1 = interp.smoothCubicHermiteDerivativesLine(cx, cd1, fixAllDirections = True,
             magnitudeScalingMode = interp.DerivativeScalingMode.HARMONIC_MEAN)
-        for e in range(elementsCountIn):
-            arcLength = interp.getCubicHermiteArcLength(cx[e], sd1[e], cx[e + 1], sd1[e + 1])
-            # print(e+1, arcLength)
-            length += arcLength
+        length = interp.HermiteCurveArcLengthIndex(cx, sd1).getLength()
         segmentLength = length / segmentCount
         # print('Length = ', length)
 
@@ -511,8 +507,7 @@ class MeshType_3d_colon1(Scaffold_base):
         refineElementsCountAlong = options['Refine number of elements along']
         refineElementsCountThroughWall = options['Refine number of elements through wall']
 
-        baseRegion = region.createRegion()
-        baseAnnotationGroups = cls.generateBaseMesh(baseRegion, options)
+        baseRegion, baseAnnotationGroups = generateBaseMeshForRefinement(cls, region, options)
 
         meshrefinement = MeshRefinement(baseRegion, region, baseAnnotationGroups)
         meshrefinement.refineAllElementsCubeStandard3d(refineElementsCountAround, refineElementsCountAlong, refineElementsCountThroughWall)
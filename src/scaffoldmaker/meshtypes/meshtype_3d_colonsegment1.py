@@ -7,10 +7,10 @@ and thickness along.
 
 import copy
 import math
+import numpy as np
 from opencmiss.utils.zinc.field import findOrCreateFieldCoordinates, findOrCreateFieldTextureCoordinates
 from opencmiss.zinc.element import Element
 from opencmiss.zinc.field import Field
-from opencmiss.zinc.node import Node
 from scaffoldmaker.annotation.annotationgroup import AnnotationGroup
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
 from scaffoldmaker.utils.eftfactory_bicubichermitelinear import eftfactory_bicubichermitelinear
@@ -937,9 +937,10 @@ def findEdgeOfTeniaColi(nx, nd1, tcWidth, arcStart, arcEnd):
     :return: arc distance covered by tenia coli.
     """
     xTol = 1.0E-6
+    arcLengthIndex = interp.HermiteCurveArcLengthIndex(nx, nd1)
     for iter in range(100):
         arcDistance = (arcStart + arcEnd)*0.5
-        x, d1, _, _ = interp.getCubicHermiteCurvesPointAtArcDistance(nx, nd1, arcDistance)
+        x, d1, _, _ = arcLengthIndex.getPointAtArcDistance(arcDistance)
         diff = x[1] - tcWidth*0.5
         if abs(diff) > xTol:
             if diff < 0.0:
@@ -969,9 +970,9 @@ def sampleTeniaColi(nx, nd1, arcDistanceTCEdge, elementsCountAroundTC):
     xTC = []
     d1TC = []
     arcDistancePerElementTC = arcDistanceTCEdge / (elementsCountAroundTC*0.5)
-    for e in range(int(elementsCountAroundTC*0.5)+1):
-        arcDistance = arcDistancePerElementTC * e
-        x, d1, _, _ = interp.getCubicHermiteCurvesPointAtArcDistance(nx, nd1, arcDistance)
+    arcDistances = [ arcDistancePerElementTC * e for e in range(int(elementsCountAroundTC*0.5)+1) ]
+    px, pd1, _, _ = interp.HermiteCurveArcLengthIndex(nx, nd1).getPointsAtArcDistances(arcDistances)
+    for x, d1 in zip(px.tolist(), pd1.tolist()):
         d1Scaled = vector.setMagnitude(d1, arcDistancePerElementTC)
         xTC.append(x)
         d1TC.append(d1Scaled)
@@ -1019,9 +1020,12 @@ def sampleHaustrum(nx, nd1, xTCLast, d1TCLast, arcLength, arcDistanceTCEdge,
     d1Scaled = vector.setMagnitude(d1TCLast, elementLengths[0])
     d1Haustrum.append(d1Scaled)
 
+    arcDistances = []
     for e in range(elementsCountOut):
         arcDistance = arcDistance + elementLengths[e]
-        x, d1, _, _ = interp.getCubicHermiteCurvesPointAtArcDistance(nx, nd1, arcDistance)
+        arcDistances.append(arcDistance)
+    px, pd1, _, _ = interp.HermiteCurveArcLengthIndex(nx, nd1).getPointsAtArcDistances(arcDistances)
+    for e, x, d1 in zip(range(elementsCountOut), px.tolist(), pd1.tolist()):
         d1Scaled = vector.setMagnitude(d1, elementLengths[e] if e > 0 else elementLengths[e+1])
         xHaustrum.append(x)
         d1Haustrum.append(d1Scaled)
@@ -1517,27 +1521,13 @@ def createNodesAndElementsTeniaColi(region,
     elementIdentifier = firstElementIdentifier
     elementsCountAround = (elementsCountAroundTC + elementsCountAroundHaustrum )*tcCount
 
-    # Create coordinates field
-    zero = [ 0.0, 0.0, 0.0 ]
+    # Create coordinates, flat coordinates and texture coordinates fields
     fm = region.getFieldmodule()
     fm.beginChange()
-    cache = fm.createFieldcache()
     coordinates = findOrCreateFieldCoordinates(fm)
-
+    flatCoordinates = findOrCreateFieldCoordinates(fm, name="flat coordinates")
+    textureCoordinates = findOrCreateFieldTextureCoordinates(fm)
     nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
-    nodetemplate = nodes.createNodetemplate()
-    nodetemplate.defineField(coordinates)
-    nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_VALUE, 1)
-    nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS1, 1)
-    nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS2, 1)
-    if useCrossDerivatives:
-        nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D2_DS1DS2, 1)
-    if useCubicHermiteThroughWall:
-        nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS3, 1)
-        if useCrossDerivatives:
-            nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D2_DS1DS3, 1)
-            nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D2_DS2DS3, 1)
-            nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D3_DS1DS2DS3, 1)
 
     mesh = fm.findMeshByDimension(3)
 
@@ -1562,24 +1552,7 @@ def createNodesAndElementsTeniaColi(region,
     eft2 = eftfactory.createEftWedgeXi1Zero()
     elementtemplate2.defineField(coordinates, -1, eft2)
 
-    # Create flat coordinates field
-    flatCoordinates = findOrCreateFieldCoordinates(fm, name="flat coordinates")
-    flatNodetemplate1 = nodes.createNodetemplate()
-    flatNodetemplate1.defineField(flatCoordinates)
-    flatNodetemplate1.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_VALUE, 1)
-    flatNodetemplate1.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_D_DS1, 1)
-    flatNodetemplate1.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_D_DS2, 1)
-    if useCrossDerivatives:
-        flatNodetemplate1.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_D2_DS1DS2, 1)
-
-    flatNodetemplate2 = nodes.createNodetemplate()
-    flatNodetemplate2.defineField(flatCoordinates)
-    flatNodetemplate2.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_VALUE, 2)
-    flatNodetemplate2.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_D_DS1, 2)
-    flatNodetemplate2.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_D_DS2, 2)
-    if useCrossDerivatives:
-        flatNodetemplate2.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_D2_DS1DS2, 2)
-
+    # Flat coordinates elements
     bicubichermitelinear = eftfactory_bicubichermitelinear(mesh, useCrossDerivatives)
     eftTexture3 = bicubichermitelinear.createEftBasic()
     eftTexture4 = bicubichermitelinear.createEftOpenTube()
@@ -1607,24 +1580,7 @@ def createNodesAndElementsTeniaColi(region,
     flatElementtemplate5.setElementShapeType(Element.SHAPE_TYPE_CUBE)
     flatElementtemplate5.defineField(flatCoordinates, -1, eftTexture7)
 
-    # Create texture coordinates field
-    textureCoordinates = findOrCreateFieldTextureCoordinates(fm)
-    textureNodetemplate1 = nodes.createNodetemplate()
-    textureNodetemplate1.defineField(textureCoordinates)
-    textureNodetemplate1.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_VALUE, 1)
-    textureNodetemplate1.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_D_DS1, 1)
-    textureNodetemplate1.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_D_DS2, 1)
-    if useCrossDerivatives:
-        textureNodetemplate1.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_D2_DS1DS2, 1)
-
-    textureNodetemplate2 = nodes.createNodetemplate()
-    textureNodetemplate2.defineField(textureCoordinates)
-    textureNodetemplate2.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_VALUE, 2)
-    textureNodetemplate2.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_D_DS1, 2)
-    textureNodetemplate2.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_D_DS2, 2)
-    if useCrossDerivatives:
-        textureNodetemplate2.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_D2_DS1DS2, 2)
-
+    # Texture coordinates elements
     textureElementtemplate1 = mesh.createElementtemplate()
     textureElementtemplate1.setElementShapeType(Element.SHAPE_TYPE_CUBE)
     textureElementtemplate1.defineField(textureCoordinates, -1, eftTexture3)
@@ -1645,82 +1601,24 @@ def createNodesAndElementsTeniaColi(region,
     textureElementtemplate5.setElementShapeType(Element.SHAPE_TYPE_CUBE)
     textureElementtemplate5.defineField(textureCoordinates, -1, eftTexture7)
 
-    # create nodes for coordinates field
-    for n in range(len(x)):
-        node = nodes.createNode(nodeIdentifier, nodetemplate)
-        cache.setNode(node)
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, x[n])
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1[n])
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, d2[n])
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS3, 1, d3[n])
-        if useCrossDerivatives:
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS3, 1, zero)
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS2DS3, 1, zero)
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D3_DS1DS2DS3, 1, zero)
-        # print('NodeIdentifier = ', nodeIdentifier, xList[n])
-        nodeIdentifier = nodeIdentifier + 1
-
-    # Create nodes for flat coordinates field
-    nodeIdentifier = firstNodeIdentifier
-    for n2 in range(elementsCountAlong + 1):
-        for n3 in range(elementsCountThroughWall + 1):
-            for n1 in range(elementsCountAround):
-                i = n2*(elementsCountAround + 1)*(elementsCountThroughWall + 1) + (elementsCountAround + 1)*n3 + n1 + n2*((elementsCountAroundTC - 1)*tcCount + 1)
-                node = nodes.findNodeByIdentifier(nodeIdentifier)
-                node.merge(flatNodetemplate2 if n1 == 0 else flatNodetemplate1)
-                node.merge(textureNodetemplate2 if n1 == 0 else textureNodetemplate1)
-                cache.setNode(node)
-                # print('NodeIdentifier', nodeIdentifier, 'version 1', xFlatList[i])
-                flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, xFlat[i])
-                flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1Flat[i])
-                flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, d2Flat[i])
-                textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, xTexture[i])
-                textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1Texture[i])
-                textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, d2Texture[i])
-                if useCrossDerivatives:
-                    flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
-                    textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
-                if n1 == 0:
-                    # print('NodeIdentifier', nodeIdentifier, 'version 2', xFlatList[i+elementsCountAround])
-                    flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 2, xFlat[i+elementsCountAround])
-                    flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 2, d1Flat[i+elementsCountAround])
-                    flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 2, d2Flat[i+elementsCountAround])
-                    textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 2, xTexture[i+elementsCountAround])
-                    textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 2, d1Texture[i+elementsCountAround])
-                    textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 2, d2Texture[i+elementsCountAround])
-                    if useCrossDerivatives:
-                        flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 2, zero)
-                        textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 2, zero)
-                nodeIdentifier = nodeIdentifier + 1
-
-        # Create flat coordinates nodes for tenia coli
-        for nTC in range((elementsCountAroundTC - 1)*tcCount):
-            j = i + 2 + nTC
-            node = nodes.findNodeByIdentifier(nodeIdentifier)
-            node.merge(flatNodetemplate2 if nTC == 0 else flatNodetemplate1)
-            node.merge(textureNodetemplate2 if nTC == 0 else textureNodetemplate1)
-            cache.setNode(node)
-            flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, xFlat[j])
-            flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1Flat[j])
-            flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, d2Flat[j])
-            textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, xTexture[j])
-            textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1Texture[j])
-            textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, d2Texture[j])
-            if useCrossDerivatives:
-                flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
-                textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
-            if nTC == 0:
-                flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 2, xFlat[j+(elementsCountAroundTC-1)*tcCount])
-                flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 2, d1Flat[j+(elementsCountAroundTC-1)*tcCount])
-                flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 2, d2Flat[j+(elementsCountAroundTC-1)*tcCount])
-                textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 2, xTexture[j+(elementsCountAroundTC-1)*tcCount])
-                textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 2, d1Texture[j+(elementsCountAroundTC-1)*tcCount])
-                textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 2, d2Texture[j+(elementsCountAroundTC-1)*tcCount])
-                if useCrossDerivatives:
-                    flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 2, zero)
-                    textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 2, zero)
-            nodeIdentifier = nodeIdentifier + 1
+    # Create nodes: in each layer along, nodes around then through wall followed by tenia coli nodes.
+    # 2 versions of flat and texture coordinates on the first node around and first tenia coli node
+    tcNodesCount = (elementsCountAroundTC - 1)*tcCount
+    wallNodesCount = elementsCountAround*(elementsCountThroughWall + 1)
+    layerNodesCount = wallNodesCount + tcNodesCount
+    layerFlatCount = (elementsCountAround + 1)*(elementsCountThroughWall + 1) + tcNodesCount + 1
+    n = np.arange(layerNodesCount)
+    nTC = n - wallNodesCount
+    layerFlatIndexes = np.where(nTC < 0, (n // elementsCountAround)*(elementsCountAround + 1) + n % elementsCountAround,
+        (elementsCountAround + 1)*(elementsCountThroughWall + 1) + nTC)
+    layerFlatVersion2Offsets = np.where(nTC < 0, np.where(n % elementsCountAround == 0, elementsCountAround, 0),
+        np.where(nTC == 0, tcNodesCount, 0))
+    layersCount = len(x) // layerNodesCount
+    flatIndexes = (np.arange(layersCount)*layerFlatCount)[:, np.newaxis] + layerFlatIndexes
+    flatVersion2Offsets = np.tile(layerFlatVersion2Offsets, layersCount)
+    nodeIdentifier = tubemesh.createNodesWithFlatAndTextureCoordinates(nodes, coordinates, flatCoordinates, textureCoordinates,
+        x, d1, d2, d3, xFlat, d1Flat, d2Flat, xTexture, d1Texture, d2Texture, flatIndexes.flatten(), flatVersion2Offsets,
+        firstNodeIdentifier, useCubicHermiteThroughWall, useCrossDerivatives)
 
     # create elements
     now = elementsCountAround*(elementsCountThroughWall+1) 
@@ -16,6 +16,7 @@ from scaffoldmaker.meshtypes.meshtype_3d_heartatria1 import MeshType_3d_heartatr
 from scaffoldmaker.meshtypes.meshtype_3d_heartventriclesbase1 import MeshType_3d_heartventriclesbase1
 from scaffoldmaker.utils.eft_utils import remapEftLocalNodes, remapEftNodeValueLabel, scaleEftNodeValueLabels, setEftScaleFactorIds
 from scaffoldmaker.utils.eftfactory_bicubichermitelinear import eftfactory_bicubichermitelinear
+from scaffoldmaker.utils.basemeshcache import generateBaseMeshForRefinement
 from scaffoldmaker.utils.meshrefinement import MeshRefinement
 
 class MeshType_3d_heart1(Scaffold_base):
@@ -456,8 +457,9 @@ class MeshType_3d_heart1(Scaffold_base):
         """
         if not options['Refine']:
             return cls.generateBaseMesh(region, options)
-        baseRegion = region.createRegion()
-        baseAnnotationGroups = cls.generateBaseMesh(baseRegion, options)
+        baseRegion, baseAnnotationGroups = generateBaseMeshForRefinement(cls, region, options)
         meshrefinement = MeshRefinement(baseRegion, region, baseAnnotationGroups)
+        meshrefinement.beginRefineBatch()
         cls.refineMesh(meshrefinement, options)
+        meshrefinement.endRefineBatch()
         return meshrefinement.getAnnotationGroups()
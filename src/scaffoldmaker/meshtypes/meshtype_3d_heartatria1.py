@@ -3271,7 +3271,9 @@ class MeshType_3d_heartatria1(Scaffold_base):
         baseRegion = region.createRegion()
         baseAnnotationGroups = cls.generateBaseMesh(baseRegion, options)
         meshrefinement = MeshRefinement(baseRegion, region, baseAnnotationGroups)
+        meshrefinement.beginRefineBatch()
         cls.refineMesh(meshrefinement, options)
+        meshrefinement.endRefineBatch()
         return meshrefinement.getAnnotationGroups()
 
 
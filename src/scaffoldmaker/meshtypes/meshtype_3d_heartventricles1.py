@@ -711,15 +711,13 @@ class MeshType_3d_heartventricles1(Scaffold_base):
         rvMeshGroup = rvGroup.getMeshGroup(mesh)
         vSeptumMeshGroup = vSeptumGroup.getMeshGroup(mesh)
 
-        tricubichermite = eftfactory_tricubichermite(mesh, useCrossDerivatives)
+        # memoize to share EFTs and element templates between elements with identical remaps
+        tricubichermite = eftfactory_tricubichermite(mesh, useCrossDerivatives, memoize=True)
         tricubicHermiteBasis = fm.createElementbasis(3, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE)
         eft = tricubichermite.createEftNoCrossDerivatives()
 
         elementIdentifier = 1
 
-        elementtemplate1 = mesh.createElementtemplate()
-        elementtemplate1.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-
         norl = elementsCountAroundLV
         nowl = 2 + elementsCountAroundRVFreeWall + elementsCountAroundLV*elementsCountUpLV + elementsCountAroundVSeptum*2*elementsCountUpRV
         norr = 2*elementsCountAroundRVFreeWall
@@ -764,14 +762,14 @@ class MeshType_3d_heartventricles1(Scaffold_base):
                         nids = [ bni1        + va, bni1        + vb, bni1        + norl + va, bni1        + norl + vb,
                                  bni1 + nowl + va, bni1 + nowl + vb, bni1 + nowl + norl + va, bni1 + nowl + norl + vb ]
 
-                    result1 = elementtemplate1.defineField(coordinates, -1, eft1)
+                    eft1, elementtemplate1 = tricubichermite.getElementtemplate(eft1, coordinates)
                     element = mesh.createElement(elementIdentifier, elementtemplate1)
                     result2 = element.setNodesByIdentifier(eft1, nids)
                     if scalefactors:
                         result3 = element.setScaleFactors(eft1, scalefactors)
                     else:
                         result3 = 7
-                    #print('create element lv apex', elementIdentifier, result1, result2, result3, nids)
+                    #print('create element lv apex', elementIdentifier, result2, result3, nids)
                     elementIdentifier = elementIdentifier + 1
 
                     for meshGroup in meshGroups:
@@ -818,7 +816,7 @@ class MeshType_3d_heartventricles1(Scaffold_base):
                         ln_map = [ 1, 2, 3, 4, 5, 5, 6, 6 ]
                         remapEftLocalNodes(eft1, 6, ln_map)
 
-                    result1 = elementtemplate1.defineField(coordinates, -1, eft1)
+                    eft1, elementtemplate1 = tricubichermite.getElementtemplate(eft1, coordinates)
 
                     element = mesh.createElement(elementIdentifier, elementtemplate1)
                     result2 = element.setNodesByIdentifier(eft1, nids)
@@ -826,7 +824,7 @@ class MeshType_3d_heartventricles1(Scaffold_base):
                         result3 = element.setScaleFactors(eft1, scalefactors)
                     else:
                         result3 = 7
-                    #print('create element lv', elementIdentifier, result1, result2, result3, nids)
+                    #print('create element lv', elementIdentifier, result2, result3, nids)
                     elementIdentifier = elementIdentifier + 1
 
                     for meshGroup in meshGroups:
@@ -921,9 +919,9 @@ class MeshType_3d_heartventricles1(Scaffold_base):
                     elif e1 == (elementsCountAroundRVFreeWall - 1):
                         # general linear map d3 adjacent to collapsed anterior interventricular sulcus
                         eft1 = tricubichermite.createEftNoCrossDerivatives()
-                        setEftScaleFactorIds(eft1, [1], [])
-                        scalefactors = [ -1.0 ]
                         if e2 == elementsCountUpLVApex:
+                            setEftScaleFactorIds(eft1, [1], [])
+                            scalefactors = [ -1.0 ]
                             # collapsed RV corner uses outside d/dxi2 = d1
                             remapEftNodeValueLabel(eft1, [ 2 ], Node.VALUE_LABEL_D_DS2, [ ( Node.VALUE_LABEL_D_DS1, [] ) ])
                             remapEftNodeValueLabel(eft1, [ 5 ], Node.VALUE_LABEL_D_DS3, [ ( Node.VALUE_LABEL_D_DS2, [1] ), ( Node.VALUE_LABEL_D_DS3, []) ])
@@ -937,7 +935,7 @@ class MeshType_3d_heartventricles1(Scaffold_base):
                         scalefactors = [ -1.0 ]
                         remapEftNodeValueLabel(eft1, [ 5, 6 ], Node.VALUE_LABEL_D_DS3, [ ( Node.VALUE_LABEL_D_DS2, [1] ), ( Node.VALUE_LABEL_D_DS3, []) ])
 
-                    result1 = elementtemplate1.defineField(coordinates, -1, eft1)
+                    eft1, elementtemplate1 = tricubichermite.getElementtemplate(eft1, coordinates)
 
                     element = mesh.createElement(elementIdentifier, elementtemplate1)
                     result2 = element.setNodesByIdentifier(eft1, nids)
@@ -945,7 +943,7 @@ class MeshType_3d_heartventricles1(Scaffold_base):
                         result3 = element.setScaleFactors(eft1, scalefactors)
                     else:
                         result3 = 7
-                    #print('create element rv', elementIdentifier, result1, result2, result3, nids)
+                    #print('create element rv', elementIdentifier, result2, result3, nids)
                     elementIdentifier = elementIdentifier + 1
 
                     for meshGroup in meshGroups:
@@ -1021,7 +1019,7 @@ class MeshType_3d_heartventricles1(Scaffold_base):
                         else:
                             scaleEftNodeValueLabels(eft1, [ 5, 6, 7, 8 ], [ Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS3 ], [ 1 ])
 
-                    result1 = elementtemplate1.defineField(coordinates, -1, eft1)
+                    eft1, elementtemplate1 = tricubichermite.getElementtemplate(eft1, coordinates)
 
                     element = mesh.createElement(elementIdentifier, elementtemplate1)
                     result2 = element.setNodesByIdentifier(eft1, nids)
@@ -1029,7 +1027,7 @@ class MeshType_3d_heartventricles1(Scaffold_base):
                         result3 = element.setScaleFactors(eft1, scalefactors)
                     else:
                         result3 = 7
-                    #print('create element septum', elementIdentifier, result1, result2, result3, nids)
+                    #print('create element septum', elementIdentifier, result2, result3, nids)
                     elementIdentifier = elementIdentifier + 1
 
                     for meshGroup in meshGroups:
@@ -1147,7 +1145,9 @@ class MeshType_3d_heartventricles1(Scaffold_base):
         baseRegion = region.createRegion()
         baseAnnotationGroups = cls.generateBaseMesh(baseRegion, options)
         meshrefinement = MeshRefinement(baseRegion, region, baseAnnotationGroups)
+        meshrefinement.beginRefineBatch()
         cls.refineMesh(meshrefinement, options)
+        meshrefinement.endRefineBatch()
         return meshrefinement.getAnnotationGroups()
 
 
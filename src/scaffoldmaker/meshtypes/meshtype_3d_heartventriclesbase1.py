@@ -1474,5 +1474,7 @@ class MeshType_3d_heartventriclesbase1(Scaffold_base):
         baseRegion = region.createRegion()
         baseAnnotationGroups = cls.generateBaseMesh(baseRegion, options)
         meshrefinement = MeshRefinement(baseRegion, region, baseAnnotationGroups)
+        meshrefinement.beginRefineBatch()
         cls.refineMesh(meshrefinement, options)
+        meshrefinement.endRefineBatch()
         return meshrefinement.getAnnotationGroups()
@@ -331,8 +331,7 @@ def generateOstiumMesh(region, options, trackSurface, centrePosition, axis1, sta
             od3[0].append(copy.copy(opd3))
             od3[1].append(opd3)
         distance += elementLength
-    for n3 in range(2):
-        od1[n3] = interp.smoothCubicHermiteDerivativesLoop(ox[n3], od1[n3], fixAllDirections = True)
+    od1 = interp.smoothCubicHermiteDerivativesLoopArray(ox, od1, fixAllDirections = True).tolist()
 
     xx  = []
     xd1 = []
@@ -5,6 +5,7 @@ around, up the central axis, and radially.
 
 from __future__ import division
 import math
+import numpy as np
 from opencmiss.utils.zinc.field import findOrCreateFieldCoordinates
 from opencmiss.zinc.element import Element, Elementbasis, Elementfieldtemplate
 from opencmiss.zinc.field import Field
@@ -14,6 +15,7 @@ from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubiche
 from scaffoldmaker.utils import interpolation as interp
 from scaffoldmaker.utils.meshrefinement import MeshRefinement
 from scaffoldmaker.utils import vector
+from scaffoldmaker.utils.zinc_utils import createNodesFromArrays
 
 class MeshType_3d_solidsphere1(Scaffold_base):
     '''
@@ -221,6 +223,8 @@ class MeshType_3d_solidsphere1(Scaffold_base):
                 # Calculate radiansUp for each point wrt arcOrigin
                 radiansUpArcOriginList[n2] = math.acos(x[2]/RC)
 
+            # parameters of nodes in this radial layer, created together
+            layerParameters = []
             for n2 in range(1,elementsCountUp):
                 radiansUp = n2*radiansPerElementUp
                 cosRadiansUp = math.cos(radiansUp)
@@ -275,18 +279,11 @@ class MeshType_3d_solidsphere1(Scaffold_base):
                     dx_ds3 = vector.normalise(dx_ds3)
                     dx_ds3 = [d*cubicArcLength/elementsCountRadial for d in dx_ds3]
 
-                    node = nodes.createNode(nodeIdentifier, nodetemplate)
-                    cache.setNode(node)
-                    coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, x)
-                    coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, dx_ds1)
-                    coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, dx_ds2)
-                    coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS3, 1, dx_ds3)
-                    if useCrossDerivatives:
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS3, 1, zero)
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS2DS3, 1, zero)
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D3_DS1DS2DS3, 1, zero)
-                    nodeIdentifier = nodeIdentifier + 1
+                    layerParameters.append([ x, dx_ds1, dx_ds2, dx_ds3 ])
+
+            nodeIdentifier = createNodesFromArrays(nodes, nodetemplate, [ ( coordinates,
+                [ Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D_DS3 ],
+                np.array(layerParameters) ) ], nodeIdentifier)
 
         #################
         # Create elements
@@ -5,6 +5,7 @@ around, up and through the thickness.
 
 from __future__ import division
 import math
+import numpy as np
 from opencmiss.utils.zinc.field import findOrCreateFieldCoordinates
 from opencmiss.zinc.element import Element, Elementbasis, Elementfieldtemplate
 from opencmiss.zinc.field import Field
@@ -12,7 +13,9 @@ from opencmiss.zinc.node import Node
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
 from scaffoldmaker.utils.eftfactory_bicubichermitelinear import eftfactory_bicubichermitelinear
 from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubichermite
+from scaffoldmaker.utils.basemeshcache import generateBaseMeshForRefinement
 from scaffoldmaker.utils.meshrefinement import MeshRefinement
+from scaffoldmaker.utils.zinc_utils import createNodesFromArrays
 
 class MeshType_3d_sphereshell1(Scaffold_base):
     '''
@@ -155,11 +158,12 @@ class MeshType_3d_sphereshell1(Scaffold_base):
         # create nodes
         nodeIdentifier = 1
         radiansPerElementAround = 2.0*math.pi/elementsCountAround
-        x = [ 0.0, 0.0, 0.0 ]
-        dx_ds1 = [ 0.0, 0.0, 0.0 ]
-        dx_ds2 = [ 0.0, 0.0, 0.0 ]
-        dx_ds3 = [ 0.0, 0.0, 0.0 ]
-        zero = [ 0.0, 0.0, 0.0 ]
+        radiansAround = np.arange(elementsCountAround)*radiansPerElementAround
+        cosRadiansAround = np.cos(radiansAround)
+        sinRadiansAround = np.sin(radiansAround)
+        valueLabels = [ Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2 ]
+        if useCubicHermiteThroughWall:
+            valueLabels.append(Node.VALUE_LABEL_D_DS3)
 
         # pre-calculate positions and tangent/normal vectors up (elementsCountUp + 1) node layers
         outerWidth = 0.5
@@ -247,44 +251,20 @@ class MeshType_3d_sphereshell1(Scaffold_base):
 
                 elif n2 < elementsCountUp:
                     # create regular rows between apexes
-                    for n1 in range(elementsCountAround):
-                        radiansAround = n1*radiansPerElementAround
-                        cosRadiansAround = math.cos(radiansAround)
-                        sinRadiansAround = math.sin(radiansAround)
-                        x = [
-                            position[0]*cosRadiansAround,
-                            position[0]*sinRadiansAround,
-                            position[1]
-                        ]
-                        dx_ds1 = [
-                            position[0]*-sinRadiansAround*radiansPerElementAround,
-                            position[0]*cosRadiansAround*radiansPerElementAround,
-                            0.0
-                        ]
-                        dx_ds2 = [
-                            vector2[0]*cosRadiansAround,
-                            vector2[0]*sinRadiansAround,
-                            vector2[1]
-                        ]
-                        dx_ds3 = [
-                            vector3[0]*cosRadiansAround,
-                            vector3[0]*sinRadiansAround,
-                            vector3[1]
-                        ]
-                        node = nodes.createNode(nodeIdentifier, nodetemplate)
-                        cache.setNode(node)
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, x)
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, dx_ds1)
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, dx_ds2)
-                        if useCubicHermiteThroughWall:
-                            coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS3, 1, dx_ds3)
-                        if useCrossDerivatives:
-                            coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
-                            if useCubicHermiteThroughWall:
-                                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS3, 1, zero)
-                                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS2DS3, 1, zero)
-                                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D3_DS1DS2DS3, 1, zero)
-                        nodeIdentifier = nodeIdentifier + 1
+                    values = np.zeros((elementsCountAround, len(valueLabels), 3))
+                    values[:, 0, 0] = position[0]*cosRadiansAround
+                    values[:, 0, 1] = position[0]*sinRadiansAround
+                    values[:, 0, 2] = position[1]
+                    values[:, 1, 0] = position[0]*-sinRadiansAround*radiansPerElementAround
+                    values[:, 1, 1] = position[0]*cosRadiansAround*radiansPerElementAround
+                    values[:, 2, 0] = vector2[0]*cosRadiansAround
+                    values[:, 2, 1] = vector2[0]*sinRadiansAround
+                    values[:, 2, 2] = vector2[1]
+                    if useCubicHermiteThroughWall:
+                        values[:, 3, 0] = vector3[0]*cosRadiansAround
+                        values[:, 3, 1] = vector3[0]*sinRadiansAround
+                        values[:, 3, 2] = vector3[1]
+                    nodeIdentifier = createNodesFromArrays(nodes, nodetemplate, [ ( coordinates, valueLabels, values ) ], nodeIdentifier)
 
                 else:
                     # create top apex node
@@ -423,8 +403,7 @@ class MeshType_3d_sphereshell1(Scaffold_base):
         refineElementsCountUp = options['Refine number of elements up']
         refineElementsCountThroughWall = options['Refine number of elements through wall']
 
-        baseRegion = region.createRegion()
-        cls.generateBaseMesh(baseRegion, options)
+        baseRegion, baseAnnotationGroups = generateBaseMeshForRefinement(cls, region, options)
 
         meshrefinement = MeshRefinement(baseRegion, region)
         meshrefinement.refineAllElementsCubeStandard3d(refineElementsCountAround, refineElementsCountUp, refineElementsCountThroughWall)
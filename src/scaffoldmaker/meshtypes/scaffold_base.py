@@ -3,12 +3,24 @@ Scaffold abstract base class.
 Describes methods each scaffold must or may override.
 """
 
+from scaffoldmaker.utils.profiling import profiled
+
 class Scaffold_base:
     '''
     Base class for scaffolds / mesh generator scripts.
     Not intended to be instantiated. Most methods must be overridden by actual scaffolds.
     '''
 
+    def __init_subclass__(cls, **kwargs):
+        '''
+        Time generation methods defined by derived scaffolds as stages when profiling.
+        '''
+        super().__init_subclass__(**kwargs)
+        for methodName in [ 'generateMesh', 'generateBaseMesh', 'refineMesh' ]:
+            method = cls.__dict__.get(methodName)
+            if isinstance(method, (classmethod, staticmethod)):
+                setattr(cls, methodName, type(method)(profiled(cls.__name__ + '.' + methodName)(method.__func__)))
+
     @staticmethod
     def getName():
         '''
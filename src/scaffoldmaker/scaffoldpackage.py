@@ -4,7 +4,64 @@ Supports serialisation to/from JSON. Can be used as a scaffold option.
 """
 
 import copy
+import hashlib
+import json
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
+from scaffoldmaker.utils.profiling import profiled, profileStage
+
+
+def getTextFingerprint(text):
+    '''
+    :param text: String or bytes, or None.
+    :return: Hexadecimal SHA-256 hash of text, or None if text is None.
+    '''
+    if text is None:
+        return None
+    return hashlib.sha256(text.encode('utf-8') if isinstance(text, str) else text).hexdigest()
+
+
+class ScaffoldSettings(dict):
+    '''
+    Dictionary of scaffold options counting modifications so fingerprints can be cached.
+    Modifications within mutable option values are not counted.
+    '''
+
+    _modifiedCount = 0
+
+    def getModifiedCount(self):
+        return self._modifiedCount
+
+    def _modified(self):
+        self._modifiedCount = self._modifiedCount + 1
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._modified()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._modified()
+
+    def clear(self):
+        dict.clear(self)
+        self._modified()
+
+    def pop(self, *args):
+        self._modified()
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self._modified()
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        self._modified()
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self._modified()
+
 
 class ScaffoldPackage:
     '''
@@ -23,12 +80,15 @@ class ScaffoldPackage:
         assert issubclass(scaffoldType, Scaffold_base), 'ScaffoldPackage:  Invalid scaffold type'
         self._scaffoldType = scaffoldType
         # merge with defaults to ensure new options for scaffold type are present
-        self._scaffoldSettings = scaffoldType.getDefaultOptions(defaultParameterSetName)
+        self._scaffoldSettings = ScaffoldSettings(scaffoldType.getDefaultOptions(defaultParameterSetName))
         scaffoldSettings = dct.get('scaffoldSettings')
         if scaffoldSettings:
             # remove obsolete options? If so, deepcopy first?
             self._scaffoldSettings.update(scaffoldSettings)
         self._meshEdits = copy.deepcopy(dct.get('meshEdits'))
+        self._meshEditsFingerprint = getTextFingerprint(self._meshEdits)
+        self._fingerprint = None
+        self._fingerprintState = None
 
     def deepcopy(self, other):
         '''
@@ -37,17 +97,52 @@ class ScaffoldPackage:
         self._scaffoldType = other._scaffoldType
         self._scaffoldSettings = copy.deepcopy(other._scaffoldSettings)
         self._meshEdits = copy.deepcopy(other._meshEdits)
+        self._meshEditsFingerprint = other._meshEditsFingerprint
+        self._fingerprint = None
+        self._fingerprintState = None
 
     def __eq__(self, other):
         '''
         Need equality operator to determine if custom options are in use.
+        Identical cached fingerprints are fast to compare and imply equality, otherwise
+        settings are compared as dicts so e.g. 1 and 1.0 are equal option values.
         '''
         if isinstance(other, ScaffoldPackage):
-            return (self._scaffoldType == other._scaffoldType) \
-                and (self._scaffoldSettings == other._scaffoldSettings) \
-                and (self._meshEdits == other._meshEdits)
+            if self is other:
+                return True
+            if (self._scaffoldType != other._scaffoldType) or (self._meshEditsFingerprint != other._meshEditsFingerprint):
+                return False
+            return (self.getFingerprint() == other.getFingerprint()) or (self._scaffoldSettings == other._scaffoldSettings)
         return NotImplemented
 
+    def getFingerprint(self):
+        '''
+        Get hash of scaffold type, settings and mesh edits, using fingerprints of nested
+        scaffold packages in settings. Cached until settings change, or until mesh edits
+        or the fingerprint of a nested scaffold package change, so is fast to call often.
+        Option values hashing differently, e.g. 1 and 1.0, give different fingerprints.
+        :return: Fingerprint as hexadecimal string.
+        '''
+        if self._fingerprint is not None:
+            settings, modifiedCount, nestedKeys, nestedFingerprints, meshEditsFingerprint = self._fingerprintState
+            if (settings is self._scaffoldSettings) and (modifiedCount == settings.getModifiedCount()) \
+                    and (meshEditsFingerprint == self._meshEditsFingerprint) \
+                    and (nestedFingerprints == [ settings[key].getFingerprint() for key in nestedKeys ]):
+                return self._fingerprint
+        settings = self._scaffoldSettings
+        nestedKeys = [ key for key, value in settings.items() if isinstance(value, ScaffoldPackage) ]
+        nestedFingerprints = [ settings[key].getFingerprint() for key in nestedKeys ]
+        def encode(obj):
+            if isinstance(obj, ScaffoldPackage):
+                return { '_ScaffoldPackage' : obj.getFingerprint() }
+            if isinstance(obj, bytes):
+                return obj.decode('utf-8')
+            raise TypeError('ScaffoldPackage.getFingerprint:  Cannot encode ' + type(obj).__name__)
+        text = json.dumps([ self._scaffoldType.getName(), settings, self._meshEditsFingerprint ], sort_keys=True, default=encode)
+        self._fingerprint = getTextFingerprint(text)
+        self._fingerprintState = ( settings, settings.getModifiedCount(), nestedKeys, nestedFingerprints, self._meshEditsFingerprint )
+        return self._fingerprint
+
     def toDict(self):
         '''
         Encodes object into a dictionary for JSON serialisation.
@@ -68,6 +163,7 @@ class ScaffoldPackage:
 
     def setMeshEdits(self, meshEdits):
         self._meshEdits = meshEdits
+        self._meshEditsFingerprint = getTextFingerprint(meshEdits)
 
     def getScaffoldSettings(self):
         return self._scaffoldSettings
@@ -75,12 +171,30 @@ class ScaffoldPackage:
     def getScaffoldType(self):
         return self._scaffoldType
 
-    def generate(self, region):
+    @profiled()
+    def generate(self, region, generationCache=None):
+        '''
+        Generate scaffold with mesh edits applied in region.
+        :param region: Zinc region to generate model in. Must be empty.
+        :param generationCache: Optional GenerationCache to load an identical model from if
+        previously generated, or to store the generated model in otherwise.
+        :return: List of AnnotationGroup for model.
+        '''
         #print('\nScaffoldPackage.generate: ', self.toDict())
+        if generationCache:
+            with profileStage('GenerationCache.load'):
+                key = generationCache.getKey(self)
+                annotationGroups = generationCache.load(key, region)
+            if annotationGroups is not None:
+                return annotationGroups
         annotationGroups = self._scaffoldType.generateMesh(region, self._scaffoldSettings)
         if self._meshEdits:
             # apply mesh edits, a Zinc-readable model file containing node edits
-            sir = region.createStreaminformationRegion()
-            srm = sir.createStreamresourceMemoryBuffer(self._meshEdits)
-            region.read(sir)
+            with profileStage('ScaffoldPackage.meshEdits'):
+                sir = region.createStreaminformationRegion()
+                srm = sir.createStreamresourceMemoryBuffer(self._meshEdits)
+                region.read(sir)
+        if generationCache:
+            with profileStage('GenerationCache.save'):
+                generationCache.save(key, region, annotationGroups)
         return annotationGroups
@@ -2,77 +2,110 @@
 Class for listing and accessing all mesh type scripts supported by scaffoldmaker.
 """
 
+import importlib
 import json
-from scaffoldmaker.meshtypes.meshtype_1d_path1 import MeshType_1d_path1
-from scaffoldmaker.meshtypes.meshtype_2d_plate1 import MeshType_2d_plate1
-from scaffoldmaker.meshtypes.meshtype_2d_platehole1 import MeshType_2d_platehole1
-from scaffoldmaker.meshtypes.meshtype_2d_sphere1 import MeshType_2d_sphere1
-from scaffoldmaker.meshtypes.meshtype_2d_tube1 import MeshType_2d_tube1
-from scaffoldmaker.meshtypes.meshtype_3d_bladder1 import MeshType_3d_bladder1
-from scaffoldmaker.meshtypes.meshtype_3d_box1 import MeshType_3d_box1
-from scaffoldmaker.meshtypes.meshtype_3d_boxhole1 import MeshType_3d_boxhole1
-from scaffoldmaker.meshtypes.meshtype_3d_colon1 import MeshType_3d_colon1
-from scaffoldmaker.meshtypes.meshtype_3d_colonsegment1 import MeshType_3d_colonsegment1
-from scaffoldmaker.meshtypes.meshtype_3d_heart1 import MeshType_3d_heart1
-from scaffoldmaker.meshtypes.meshtype_3d_heart2 import MeshType_3d_heart2
-from scaffoldmaker.meshtypes.meshtype_3d_heartarterialroot1 import MeshType_3d_heartarterialroot1
-from scaffoldmaker.meshtypes.meshtype_3d_heartatria1 import MeshType_3d_heartatria1
-from scaffoldmaker.meshtypes.meshtype_3d_heartatria2 import MeshType_3d_heartatria2
-from scaffoldmaker.meshtypes.meshtype_3d_heartventricles1 import MeshType_3d_heartventricles1
-from scaffoldmaker.meshtypes.meshtype_3d_heartventricles2 import MeshType_3d_heartventricles2
-from scaffoldmaker.meshtypes.meshtype_3d_heartventriclesbase1 import MeshType_3d_heartventriclesbase1
-from scaffoldmaker.meshtypes.meshtype_3d_heartventriclesbase2 import MeshType_3d_heartventriclesbase2
-from scaffoldmaker.meshtypes.meshtype_3d_lens1 import MeshType_3d_lens1
-from scaffoldmaker.meshtypes.meshtype_3d_ostium1 import MeshType_3d_ostium1
-from scaffoldmaker.meshtypes.meshtype_3d_smallintestine1 import MeshType_3d_smallintestine1
-from scaffoldmaker.meshtypes.meshtype_3d_solidsphere1 import MeshType_3d_solidsphere1
-from scaffoldmaker.meshtypes.meshtype_3d_sphereshell1 import MeshType_3d_sphereshell1
-from scaffoldmaker.meshtypes.meshtype_3d_sphereshellseptum1 import MeshType_3d_sphereshellseptum1
-from scaffoldmaker.meshtypes.meshtype_3d_stomachhuman1 import MeshType_3d_stomachhuman1
-from scaffoldmaker.meshtypes.meshtype_3d_tube1 import MeshType_3d_tube1
-from scaffoldmaker.meshtypes.meshtype_3d_tubeseptum1 import MeshType_3d_tubeseptum1
 from scaffoldmaker.scaffoldpackage import ScaffoldPackage
 
+# registry of all scaffold types: name, module, class name; modules are imported on first use
+_scaffoldTypeRegistry = [
+    ( '1D Path 1', 'scaffoldmaker.meshtypes.meshtype_1d_path1', 'MeshType_1d_path1' ),
+    ( '2D Plate 1', 'scaffoldmaker.meshtypes.meshtype_2d_plate1', 'MeshType_2d_plate1' ),
+    ( '2D Plate Hole 1', 'scaffoldmaker.meshtypes.meshtype_2d_platehole1', 'MeshType_2d_platehole1' ),
+    ( '2D Sphere 1', 'scaffoldmaker.meshtypes.meshtype_2d_sphere1', 'MeshType_2d_sphere1' ),
+    ( '2D Tube 1', 'scaffoldmaker.meshtypes.meshtype_2d_tube1', 'MeshType_2d_tube1' ),
+    ( '3D Bladder 1', 'scaffoldmaker.meshtypes.meshtype_3d_bladder1', 'MeshType_3d_bladder1' ),
+    ( '3D Box 1', 'scaffoldmaker.meshtypes.meshtype_3d_box1', 'MeshType_3d_box1' ),
+    ( '3D Box Hole 1', 'scaffoldmaker.meshtypes.meshtype_3d_boxhole1', 'MeshType_3d_boxhole1' ),
+    ( '3D Colon 1', 'scaffoldmaker.meshtypes.meshtype_3d_colon1', 'MeshType_3d_colon1' ),
+    ( '3D Colon Segment 1', 'scaffoldmaker.meshtypes.meshtype_3d_colonsegment1', 'MeshType_3d_colonsegment1' ),
+    ( '3D Heart 1', 'scaffoldmaker.meshtypes.meshtype_3d_heart1', 'MeshType_3d_heart1' ),
+    ( '3D Heart 2', 'scaffoldmaker.meshtypes.meshtype_3d_heart2', 'MeshType_3d_heart2' ),
+    ( '3D Heart Arterial Root 1', 'scaffoldmaker.meshtypes.meshtype_3d_heartarterialroot1', 'MeshType_3d_heartarterialroot1' ),
+    ( '3D Heart Atria 1', 'scaffoldmaker.meshtypes.meshtype_3d_heartatria1', 'MeshType_3d_heartatria1' ),
+    ( '3D Heart Atria 2', 'scaffoldmaker.meshtypes.meshtype_3d_heartatria2', 'MeshType_3d_heartatria2' ),
+    ( '3D Heart Ventricles 1', 'scaffoldmaker.meshtypes.meshtype_3d_heartventricles1', 'MeshType_3d_heartventricles1' ),
+    ( '3D Heart Ventricles 2', 'scaffoldmaker.meshtypes.meshtype_3d_heartventricles2', 'MeshType_3d_heartventricles2' ),
+    ( '3D Heart Ventricles with Base 1', 'scaffoldmaker.meshtypes.meshtype_3d_heartventriclesbase1', 'MeshType_3d_heartventriclesbase1' ),
+    ( '3D Heart Ventricles with Base 2', 'scaffoldmaker.meshtypes.meshtype_3d_heartventriclesbase2', 'MeshType_3d_heartventriclesbase2' ),
+    ( '3D Lens 1', 'scaffoldmaker.meshtypes.meshtype_3d_lens1', 'MeshType_3d_lens1' ),
+    ( '3D Ostium 1', 'scaffoldmaker.meshtypes.meshtype_3d_ostium1', 'MeshType_3d_ostium1' ),
+    ( '3D Small Intestine 1', 'scaffoldmaker.meshtypes.meshtype_3d_smallintestine1', 'MeshType_3d_smallintestine1' ),
+    ( '3D Solid Sphere 1', 'scaffoldmaker.meshtypes.meshtype_3d_solidsphere1', 'MeshType_3d_solidsphere1' ),
+    ( '3D Sphere Shell 1', 'scaffoldmaker.meshtypes.meshtype_3d_sphereshell1', 'MeshType_3d_sphereshell1' ),
+    ( '3D Sphere Shell Septum 1', 'scaffoldmaker.meshtypes.meshtype_3d_sphereshellseptum1', 'MeshType_3d_sphereshellseptum1' ),
+    ( '3D Stomach Human 1', 'scaffoldmaker.meshtypes.meshtype_3d_stomachhuman1', 'MeshType_3d_stomachhuman1' ),
+    ( '3D Tube 1', 'scaffoldmaker.meshtypes.meshtype_3d_tube1', 'MeshType_3d_tube1' ),
+    ( '3D Tube Septum 1', 'scaffoldmaker.meshtypes.meshtype_3d_tubeseptum1', 'MeshType_3d_tubeseptum1' ) ]
+
+# map from name to (module name, class name)
+_scaffoldTypeLocations = { name : ( moduleName, className ) for name, moduleName, className in _scaffoldTypeRegistry }
+# map from class name to name, for module attribute access
+_scaffoldTypeClassNames = { className : name for name, moduleName, className in _scaffoldTypeRegistry }
+# map from name to imported scaffold type
+_scaffoldTypes = {}
+
+
+def _getScaffoldType(name):
+    '''
+    Get registered scaffold type by name, importing its module if not yet loaded.
+    :return: Scaffold type class, or None if name is not registered.
+    '''
+    scaffoldType = _scaffoldTypes.get(name)
+    if scaffoldType is None:
+        location = _scaffoldTypeLocations.get(name)
+        if location is None:
+            return None
+        moduleName, className = location
+        scaffoldType = _scaffoldTypes[name] = getattr(importlib.import_module(moduleName), className)
+    return scaffoldType
+
+
+def __getattr__(attributeName):
+    '''
+    Lazily supply scaffold type classes formerly imported into this module, e.g. MeshType_3d_box1.
+    '''
+    name = _scaffoldTypeClassNames.get(attributeName)
+    if name is None:
+        raise AttributeError('module ' + repr(__name__) + ' has no attribute ' + repr(attributeName))
+    return _getScaffoldType(name)
+
 
 class Scaffolds(object):
+    '''
+    Registry of all scaffold types. Scaffold type modules are only imported when needed.
+    '''
 
     def __init__(self):
-        self._allScaffoldTypes = [
-            MeshType_1d_path1,
-            MeshType_2d_plate1,
-            MeshType_2d_platehole1,
-            MeshType_2d_sphere1,
-            MeshType_2d_tube1,
-            MeshType_3d_bladder1,
-            MeshType_3d_box1,
-            MeshType_3d_boxhole1,
-            MeshType_3d_colon1,
-            MeshType_3d_colonsegment1,
-            MeshType_3d_heart1,
-            MeshType_3d_heart2,
-            MeshType_3d_heartarterialroot1,
-            MeshType_3d_heartatria1,
-            MeshType_3d_heartatria2,
-            MeshType_3d_heartventricles1,
-            MeshType_3d_heartventricles2,
-            MeshType_3d_heartventriclesbase1,
-            MeshType_3d_heartventriclesbase2,
-            MeshType_3d_lens1,
-            MeshType_3d_ostium1,
-            MeshType_3d_smallintestine1,
-            MeshType_3d_solidsphere1,
-            MeshType_3d_sphereshell1,
-            MeshType_3d_sphereshellseptum1,
-            MeshType_3d_stomachhuman1,
-            MeshType_3d_tube1,
-            MeshType_3d_tubeseptum1
-            ]
+        # list of all scaffold types for this instance, built on first use; callers may modify it
+        self._scaffoldTypesList = None
 
     def findScaffoldTypeByName(self, name):
-        for scaffoldType in self._allScaffoldTypes:
-            if scaffoldType.getName() == name:
-                return scaffoldType
-        return None
+        '''
+        :return: Scaffold type with name, or None if not found. Only its module is imported
+        unless the list of all scaffold types has been built.
+        '''
+        if self._scaffoldTypesList is not None:
+            for scaffoldType in self._scaffoldTypesList:
+                if scaffoldType.getName() == name:
+                    return scaffoldType
+            return None
+        return _getScaffoldType(name)
+
+    @property
+    def _allScaffoldTypes(self):
+        '''
+        Deprecated: use getScaffoldTypes()
+        '''
+        return self.getScaffoldTypes()
+
+    def getScaffoldTypeNames(self):
+        '''
+        :return: List of names of all scaffold types, in order, without importing them
+        unless the list of all scaffold types has been built.
+        '''
+        if self._scaffoldTypesList is not None:
+            return [ scaffoldType.getName() for scaffoldType in self._scaffoldTypesList ]
+        return [ name for name, moduleName, className in _scaffoldTypeRegistry ]
 
     def getDefaultMeshType(self):
         '''
@@ -81,7 +114,7 @@ class Scaffolds(object):
         return self.getDefaultScaffoldType()
 
     def getDefaultScaffoldType(self):
-        return MeshType_3d_box1
+        return _getScaffoldType('3D Box 1')
 
     def getMeshTypes(self):
         '''
@@ -90,7 +123,15 @@ class Scaffolds(object):
         return self.getScaffoldTypes()
 
     def getScaffoldTypes(self):
-        return self._allScaffoldTypes
+        '''
+        Get the list of all scaffold types for this instance, importing all scaffold type modules
+        the first time. The same list is returned on each call, so scaffold types added to it or
+        removed from it are seen by the other methods of this instance.
+        :return: List of all scaffold types, in order.
+        '''
+        if self._scaffoldTypesList is None:
+            self._scaffoldTypesList = [ _getScaffoldType(name) for name, moduleName, className in _scaffoldTypeRegistry ]
+        return self._scaffoldTypesList
 
 
 class Scaffolds_JSONEncoder(json.JSONEncoder):
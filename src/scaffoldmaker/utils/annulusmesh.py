@@ -4,6 +4,7 @@ Utility functions for generating annulus mesh between start and end loops of poi
 from __future__ import division
 import copy
 import math
+import numpy as np
 from opencmiss.utils.zinc.field import findOrCreateFieldCoordinates
 from opencmiss.zinc.element import Element
 from opencmiss.zinc.field import Field
@@ -13,6 +14,7 @@ from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubiche
 from scaffoldmaker.utils.eft_utils import remapEftNodeValueLabel, setEftScaleFactorIds
 from scaffoldmaker.utils import interpolation as interp
 from scaffoldmaker.utils import vector
+from scaffoldmaker.utils.profiling import profiled
 
 
 def derivativeSignsToExpressionTerms(valueLabels, signs):
@@ -29,6 +31,7 @@ def derivativeSignsToExpressionTerms(valueLabels, signs):
             expressionTerms.append( ( valueLabels[i], [1] ) )
     return expressionTerms
 
+@profiled()
 def createAnnulusMesh3d(nodes, mesh, nextNodeIdentifier, nextElementIdentifier,
     startPointsx, startPointsd1, startPointsd2, startPointsd3, startNodeId, startDerivativesMap,
     endPointsx, endPointsd1, endPointsd2, endPointsd3, endNodeId, endDerivativesMap,
@@ -225,29 +228,37 @@ def createAnnulusMesh3d(nodes, mesh, nextNodeIdentifier, nextElementIdentifier,
             # first smooth derivative 1 around outer loop
             pd1[1][n2] = interp.smoothCubicHermiteDerivativesLoop(px[1][n2], pd1[1][n2], magnitudeScalingMode = interp.DerivativeScalingMode.HARMONIC_MEAN)
 
-            for n1 in range(nodesCountAround):
-                normal = vector.normalise(vector.crossproduct3(pd1[1][n2][n1], pd2[1][n2][n1]))
-                thickness = thicknesses[n2][n1]
-                d3 = [ d*thickness for d in normal ]
-                px [0][n2][n1] = [ (px [1][n2][n1][c] - d3[c]) for c in range(3) ]
-                # calculate inner d1 from curvature around
-                n1m = n1 - 1
-                n1p = (n1 + 1)%nodesCountAround
-                curvature = 0.5*(
-                    interp.getCubicHermiteCurvature(px[1][n2][n1m], pd1[1][n2][n1m], px[1][n2][n1 ], pd1[1][n2][n1 ], normal, 1.0) +
-                    interp.getCubicHermiteCurvature(px[1][n2][n1 ], pd1[1][n2][n1 ], px[1][n2][n1p], pd1[1][n2][n1p], normal, 0.0))
-                factor = 1.0 + curvature*thickness
-                pd1[0][n2][n1] = [ factor*d for d in pd1[1][n2][n1] ]
-                # calculate inner d2 from curvature radially
-                n2m = n2 - 1
-                n2p = n2 + 1
-                curvature = 0.5*(
-                    interp.getCubicHermiteCurvature(px[1][n2m][n1], pd2[1][n2m][n1], px[1][n2 ][n1], pd2[1][n2 ][n1], normal, 1.0) +
-                    interp.getCubicHermiteCurvature(px[1][n2 ][n1], pd2[1][n2 ][n1], px[1][n2p][n1], pd2[1][n2p][n1], normal, 0.0))
-                factor = 1.0 + curvature*thickness
-                pd2[0][n2][n1] = [ factor*d for d in pd2[1][n2][n1] ]
-                if not midLinearXi3:
-                    pd3[0][n2][n1] = pd3[1][n2][n1] = d3
+            # evaluate all points around at once; rolled arrays give points n1 - 1 and n1 + 1 around loop
+            x = np.array(px[1][n2])
+            d1 = np.array(pd1[1][n2])
+            d2 = np.array(pd2[1][n2])
+            normal = np.cross(d1, d2)
+            normal = normal/np.sqrt(np.sum(normal*normal, axis=1))[:, np.newaxis]
+            thickness = np.array(thicknesses[n2])
+            d3 = normal*thickness[:, np.newaxis]
+            px [0][n2] = (x - d3).tolist()
+            # calculate inner d1 from curvature around
+            xm = np.roll(x, 1, axis=0)
+            d1m = np.roll(d1, 1, axis=0)
+            xp = np.roll(x, -1, axis=0)
+            d1p = np.roll(d1, -1, axis=0)
+            curvature = 0.5*(
+                interp.getCubicHermiteCurvatureArray(xm, d1m, x, d1, normal, 1.0) +
+                interp.getCubicHermiteCurvatureArray(x, d1, xp, d1p, normal, 0.0))
+            factor = 1.0 + curvature*thickness
+            pd1[0][n2] = (factor[:, np.newaxis]*d1).tolist()
+            # calculate inner d2 from curvature radially
+            n2m = n2 - 1
+            n2p = n2 + 1
+            curvature = 0.5*(
+                interp.getCubicHermiteCurvatureArray(np.array(px[1][n2m]), np.array(pd2[1][n2m]), x, d2, normal, 1.0) +
+                interp.getCubicHermiteCurvatureArray(x, d2, np.array(px[1][n2p]), np.array(pd2[1][n2p]), normal, 0.0))
+            factor = 1.0 + curvature*thickness
+            pd2[0][n2] = (factor[:, np.newaxis]*d2).tolist()
+            if not midLinearXi3:
+                d3 = d3.tolist()
+                for n1 in range(nodesCountAround):
+                    pd3[0][n2][n1] = pd3[1][n2][n1] = d3[n1]
 
             # smooth derivative 1 around inner loop
             pd1[0][n2] = interp.smoothCubicHermiteDerivativesLoop(px[0][n2], pd1[0][n2], magnitudeScalingMode = interp.DerivativeScalingMode.HARMONIC_MEAN)
@@ -0,0 +1,79 @@
+'''
+Cache of scaffold base meshes, so refined meshes can be regenerated without rebuilding the
+base mesh when only refinement options change.
+'''
+
+from collections import OrderedDict
+import json
+from opencmiss.zinc.context import Context
+
+# map from key to (context, base region, base annotation groups), least recently used first
+_baseMeshes = OrderedDict()
+_maximumSize = 0
+_hitsCount = 0
+_missesCount = 0
+
+
+def setBaseMeshCacheSize(maximumSize):
+    '''
+    Enable incremental generation of refined scaffolds by caching base meshes. Disabled by default.
+    :param maximumSize: Maximum number of base meshes to keep, or 0 to disable and clear cache.
+    '''
+    global _maximumSize
+    assert maximumSize >= 0, 'setBaseMeshCacheSize:  Invalid maximumSize'
+    _maximumSize = maximumSize
+    while len(_baseMeshes) > _maximumSize:
+        _baseMeshes.popitem(last=False)
+
+
+def getBaseMeshCacheCounts():
+    '''
+    :return: Number of base mesh cache hits, misses.
+    '''
+    return _hitsCount, _missesCount
+
+
+def getBaseMeshKey(scaffoldType, options):
+    '''
+    :return: Key for scaffold type and options excluding refinement options, whose names start
+    with 'Refine'. Nested scaffold packages are represented by their fingerprints.
+    '''
+    def encode(obj):
+        if hasattr(obj, 'getFingerprint'):
+            return { '_ScaffoldPackage' : obj.getFingerprint() }
+        if isinstance(obj, bytes):
+            return obj.decode('utf-8')
+        raise TypeError('getBaseMeshKey:  Cannot encode ' + type(obj).__name__)
+    baseOptions = { key : value for key, value in options.items() if not key.startswith('Refine') }
+    return scaffoldType.getName() + json.dumps(baseOptions, sort_keys=True, default=encode)
+
+
+def generateBaseMeshForRefinement(scaffoldType, region, options):
+    '''
+    Get base mesh of scaffold to refine into region. If the cache is enabled and a base mesh
+    was generated with the same options apart from refinement options, it is reused.
+    Cached base meshes are in their own Zinc context, and must not be modified.
+    :param scaffoldType: Scaffold type with generateBaseMesh(region, options) method.
+    :param region: Region refined mesh will be generated in.
+    :param options: Dict containing scaffold options.
+    :return: Base region, list of base AnnotationGroup or None.
+    '''
+    global _hitsCount, _missesCount
+    if _maximumSize == 0:
+        baseRegion = region.createRegion()
+        return baseRegion, scaffoldType.generateBaseMesh(baseRegion, options)
+    key = getBaseMeshKey(scaffoldType, options)
+    baseMesh = _baseMeshes.get(key)
+    if baseMesh:
+        _baseMeshes.move_to_end(key)
+        _hitsCount += 1
+    else:
+        _missesCount += 1
+        context = Context('base mesh')
+        baseRegion = context.getDefaultRegion()
+        baseAnnotationGroups = scaffoldType.generateBaseMesh(baseRegion, options)
+        baseMesh = ( context, baseRegion, baseAnnotationGroups )
+        _baseMeshes[key] = baseMesh
+        while len(_baseMeshes) > _maximumSize:
+            _baseMeshes.popitem(last=False)
+    return baseMesh[1], baseMesh[2]
@@ -1,7 +1,8 @@
 '''
 Utility functions for element field templates shared by mesh generators.
 '''
-from opencmiss.zinc.element import Elementfieldtemplate
+from opencmiss.zinc.element import Element, Elementfieldtemplate
+from opencmiss.zinc.result import RESULT_OK
 
 def getEftTermScaling(eft, functionIndex, termIndex):
     '''
@@ -131,3 +132,120 @@ def setEftScaleFactorIds(eft, generalScaleFactorIds, nodeScaleFactorIds):
         eft.setScaleFactorType(s, Elementfieldtemplate.SCALE_FACTOR_TYPE_NODE_GENERAL)
         eft.setScaleFactorIdentifier(s, id)
         s += 1
+
+def getEftSignature(eft):
+    '''
+    Get a hashable description of the complete content of eft: basis, parameter mapping mode,
+    local nodes, scale factor types and identifiers and the terms of every function.
+    EFTs with identical remaps and scale factor layouts have equal signatures.
+    :return: Tuple.
+    '''
+    basis = eft.getElementbasis()
+    signature = [
+        tuple(basis.getFunctionType(xi) for xi in range(1, basis.getDimension() + 1)),
+        eft.getParameterMappingMode(),
+        eft.getNumberOfLocalNodes(),
+        tuple((eft.getScaleFactorType(s), eft.getScaleFactorIdentifier(s)) for s in range(1, eft.getNumberOfLocalScaleFactors() + 1)) ]
+    for f in range(1, eft.getNumberOfFunctions() + 1):
+        signature.append(tuple((eft.getTermLocalNodeIndex(f, t), eft.getTermNodeValueLabel(f, t), eft.getTermNodeVersion(f, t),
+            tuple(getEftTermScaling(eft, f, t))) for t in range(1, eft.getFunctionNumberOfTerms(f) + 1)))
+    return tuple(signature)
+
+def createCubeElementtemplate(mesh, eft, field):
+    '''
+    Create cube element template defining field with eft.
+    :param mesh: Zinc mesh to create element template in.
+    :param eft: Fully remapped element field template.
+    :param field: Field to define on element template, usually coordinates.
+    :return: Element template.
+    '''
+    elementtemplate = mesh.createElementtemplate()
+    elementtemplate.setElementShapeType(Element.SHAPE_TYPE_CUBE)
+    result = elementtemplate.defineField(field, -1, eft)
+    assert result == RESULT_OK, 'createCubeElementtemplate:  Failed to define field ' + field.getName() + \
+        ' with element field template, result ' + str(result) + '. Check it is valid with eft.validate().'
+    return elementtemplate
+
+
+class SharedEftCache:
+    '''
+    Cache of element field templates and cube element templates for one mesh, returning a
+    single shared instance for each distinct EFT content. Shared EFTs must not be modified.
+    '''
+
+    def __init__(self, mesh):
+        '''
+        :param mesh: Zinc mesh EFTs are created in.
+        '''
+        self._mesh = mesh
+        # map from EFT signature to shared EFT
+        self._efts = {}
+        # map from (EFT signature, field name) to (shared EFT, element template)
+        self._elementtemplates = {}
+        self._requestsCount = 0
+
+    def getCounts(self):
+        '''
+        :return: Number of shared EFTs, number of element templates, number of requests.
+        '''
+        return len(self._efts), len(self._elementtemplates), self._requestsCount
+
+    def getSharedEft(self, eft):
+        '''
+        :param eft: Fully remapped element field template, not to be modified afterwards.
+        :return: Previously supplied EFT with identical content, otherwise eft.
+        '''
+        self._requestsCount += 1
+        return self._efts.setdefault(getEftSignature(eft), eft)
+
+    def getElementtemplate(self, eft, field):
+        '''
+        Get cube element template defining field with the shared EFT identical to eft.
+        :param eft: Fully remapped element field template, not to be modified afterwards.
+        :param field: Field to define on element template, usually coordinates.
+        :return: Shared EFT, element template. Use the shared EFT to set element nodes and scale factors.
+        '''
+        self._requestsCount += 1
+        signature = getEftSignature(eft)
+        key = ( signature, field.getName() )
+        sharedEftElementtemplate = self._elementtemplates.get(key)
+        if sharedEftElementtemplate is None:
+            sharedEft = self._efts.get(signature, eft)
+            elementtemplate = createCubeElementtemplate(self._mesh, sharedEft, field)
+            self._efts[signature] = sharedEft
+            sharedEftElementtemplate = self._elementtemplates[key] = ( sharedEft, elementtemplate )
+        return sharedEftElementtemplate
+
+
+class SharedEftFactoryMixin:
+    '''
+    Mixin for EFT factory classes giving getSharedEft() and getElementtemplate().
+    The factory must set self._mesh to the Zinc mesh and self._sharedEftCache to a
+    SharedEftCache in memoize mode, otherwise None.
+    Only the EFTs and element templates are shared; callers still create each EFT before
+    its shared instance is found, so element creation is not made cheaper.
+    '''
+
+    def getSharedEft(self, eft):
+        '''
+        In memoize mode, get shared EFT with identical remaps and scale factor layout to eft,
+        which must not be modified afterwards. Otherwise return eft.
+        :param eft: Fully remapped element field template.
+        :return: Element field template
+        '''
+        if self._sharedEftCache is not None:
+            return self._sharedEftCache.getSharedEft(eft)
+        return eft
+
+    def getElementtemplate(self, eft, field):
+        '''
+        Get cube element template defining field with eft. In memoize mode, the EFT and element
+        template are shared by all calls with identical remaps and scale factor layouts, and must
+        not be modified afterwards. Otherwise a new element template is created.
+        :param eft: Fully remapped element field template.
+        :param field: Field to define on element template, usually coordinates.
+        :return: Element field template to use for setting element nodes and scale factors, element template
+        '''
+        if self._sharedEftCache is not None:
+            return self._sharedEftCache.getElementtemplate(eft, field)
+        return eft, createCubeElementtemplate(self._mesh, eft, field)
@@ -1,24 +1,26 @@
 '''
 Definitions of standard element field templates using bicubic Hermite x linear Lagrange basis.
 '''
-from scaffoldmaker.utils.eft_utils import remapEftLocalNodes, remapEftNodeValueLabel, setEftScaleFactorIds
+from scaffoldmaker.utils.eft_utils import remapEftLocalNodes, remapEftNodeValueLabel, setEftScaleFactorIds, SharedEftCache, SharedEftFactoryMixin
 from opencmiss.zinc.element import Elementbasis, Elementfieldtemplate
 from opencmiss.zinc.node import Node
 from opencmiss.zinc.status import OK as ZINC_OK
 
-class eftfactory_bicubichermitelinear:
+class eftfactory_bicubichermitelinear(SharedEftFactoryMixin):
     '''
     Factory class for creating element field templates for a 3-D mesh using bicubic Hermite x linear Lagrange basis.
     '''
 
     def __init__(self, mesh, useCrossDerivatives, linearAxis = 3,
-            d_ds1 = Node.VALUE_LABEL_D_DS1, d_ds2 = Node.VALUE_LABEL_D_DS2):
+            d_ds1 = Node.VALUE_LABEL_D_DS1, d_ds2 = Node.VALUE_LABEL_D_DS2, memoize = False):
         '''
         :param mesh:  Zinc mesh to create element field templates in.
         :param useCrossDerivatives: Set to True if you want cross derivative terms.
         :param linearAxis: 1, 2, or 3.
         :param d_ds1: Node derivative to use in Hermite axis 1: Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2.
         :param d_ds2: Node derivative to use in Hermite axis 2, > d_ds1: Node.VALUE_LABEL_D_DS2 or Node.VALUE_LABEL_D_DS3.
+        :param memoize: Set to True to share element field templates and element templates
+        with identical content from getSharedEft() and getElementtemplate().
         '''
         assert mesh.getDimension() == 3, 'eftfactory_bicubichermitelinear: not a 3-D Zinc mesh'
         assert linearAxis in [ 1, 2, 3 ], 'eftfactory_bicubichermitelinear: linearAxis must be 1, 2 or 3'
@@ -35,6 +37,7 @@ class eftfactory_bicubichermitelinear:
         self._fieldmodule = mesh.getFieldmodule()
         self._basis = self._fieldmodule.createElementbasis(3, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE)
         self._basis.setFunctionType(linearAxis, Elementbasis.FUNCTION_TYPE_LINEAR_LAGRANGE)
+        self._sharedEftCache = SharedEftCache(mesh) if memoize else None
 
     def _remapDefaultNodeDerivatives(self, eft):
         '''
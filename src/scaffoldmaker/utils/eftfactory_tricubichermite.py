@@ -8,26 +8,30 @@ from opencmiss.zinc.element import Element, Elementbasis, Elementfieldtemplate
 from opencmiss.zinc.field import Field
 from opencmiss.zinc.node import Node
 from opencmiss.zinc.status import OK as ZINC_OK
-from scaffoldmaker.utils.eft_utils import mapEftFunction1Node1Term, remapEftLocalNodes, remapEftNodeValueLabel, scaleEftNodeValueLabels, setEftScaleFactorIds
+from scaffoldmaker.utils.eft_utils import mapEftFunction1Node1Term, remapEftLocalNodes, remapEftNodeValueLabel, scaleEftNodeValueLabels, setEftScaleFactorIds, \
+    SharedEftCache, SharedEftFactoryMixin
 from scaffoldmaker.utils import interpolation as interp
 from scaffoldmaker.utils import vector
 
 
-class eftfactory_tricubichermite:
+class eftfactory_tricubichermite(SharedEftFactoryMixin):
     '''
     Factory class for creating element field templates for a 3-D mesh using tricubic Hermite basis.
     '''
 
-    def __init__(self, mesh, useCrossDerivatives):
+    def __init__(self, mesh, useCrossDerivatives, memoize=False):
         '''
         :param mesh:  Zinc mesh to create element field templates in.
         :param useCrossDerivatives: Set to True if you want cross derivative terms.
+        :param memoize: Set to True to share element field templates and element templates
+        with identical content from getSharedEft() and getElementtemplate().
         '''
         assert mesh.getDimension() == 3, 'eftfactory_tricubichermite: not a 3-D Zinc mesh'
         self._mesh = mesh
         self._useCrossDerivatives = useCrossDerivatives
         self._fieldmodule = mesh.getFieldmodule()
         self._tricubicHermiteBasis = self._fieldmodule.createElementbasis(3, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE)
+        self._sharedEftCache = SharedEftCache(mesh) if memoize else None
 
     def createEftBasic(self):
         '''
@@ -1,17 +1,20 @@
 '''
-Class for exporting a Scaffold from Zinc to legacy vtk text format.
+Class for exporting a Scaffold from Zinc to legacy vtk text or binary, or XML vtu format.
 '''
 
-import io
-from sys import version_info
+from xml.sax.saxutils import quoteattr
+import numpy as np
 from opencmiss.zinc.field import Field
 from opencmiss.utils.zinc.finiteelement import getElementNodeIdentifiersBasisOrder
 
 
 class ExportVtk:
     '''
-    Class for exporting a Scaffold from Zinc to legacy vtk text format.
+    Class for exporting a Scaffold from Zinc to legacy vtk text or binary, or XML vtu format.
     Limited to writing only 3-D hexahedral elements. Assumes all nodes have field defined.
+    Output is streamed in chunks of nodes and elements so memory use is bounded by the chunk size,
+    plus one integer per node if node identifiers are not consecutive, and one integer annotation
+    mask per element if there are annotation groups.
     '''
 
     def __init__(self, region, description, annotationGroups = None):
@@ -27,89 +30,308 @@ class ExportVtk:
             if self._mesh.getSize() > 0:
                 break
         self._coordinates = self._fieldmodule.findFieldByName('coordinates')
+        self._nodes = self._fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
         self._description = description
         self._annotationGroups = annotationGroups if annotationGroups else []
+        # following assumes all hex (3-D) or all quad (2-D) elements
+        if self._mesh.getDimension() == 2:
+            self._localNodeCount = 4
+            self._vtkIndexing = [ 0, 1, 3, 2 ]
+            self._cellType = 9
+        else:
+            self._localNodeCount = 8
+            self._vtkIndexing = [ 0, 1, 3, 2, 4, 5, 7, 6 ]
+            self._cellType = 12
 
 
-    def _write(self, outstream):
-        if version_info.major > 2:
-          assert isinstance(outstream, io.TextIOBase), 'ExportVtk.write:  Invalid outstream argument'
-        outstream.write('# vtk DataFile Version 2.0\n')
-        outstream.write(self._description + '\n')
-        outstream.write('ASCII\n')
-        outstream.write('DATASET UNSTRUCTURED_GRID\n')
-        nodeIdentifierToIndex = {}  # map needed since vtk points are zero index based, i.e. have no identifier
-        coordinates = self._coordinates
-        coordinatesCount = coordinates.getNumberOfComponents()
+    def _iterateNodeChunks(self, chunkSize):
+        '''
+        :return: Generator of arrays (chunkSize, coordinatesCount) of node coordinates in identifier order.
+        '''
+        coordinatesCount = self._coordinates.getNumberOfComponents()
         cache = self._fieldmodule.createFieldcache()
-
-        nodes = self._fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
-        pointCount = nodes.getSize()
-        outstream.write('POINTS ' + str(pointCount) + ' double\n')
-        nodeIter = nodes.createNodeiterator()
+        pointsList = []
+        nodeIter = self._nodes.createNodeiterator()
         node = nodeIter.next()
-        index = 0
         while node.isValid():
-            nodeIdentifierToIndex[node.getIdentifier()] = index
             cache.setNode(node)
             result, x = self._coordinates.evaluateReal(cache, coordinatesCount)
-            first = True
-            for s in x:
-                if not first:
-                    outstream.write(' ')
-                outstream.write(str(s))
-                first = False
-            outstream.write('\n')
-            index += 1
+            pointsList.append(x)
+            if len(pointsList) == chunkSize:
+                yield np.array(pointsList, dtype=np.float64).reshape((-1, coordinatesCount))
+                pointsList = []
             node = nodeIter.next()
+        if pointsList:
+            yield np.array(pointsList, dtype=np.float64).reshape((-1, coordinatesCount))
 
-        # following assumes all hex (3-D) or all quad (2-D) elements
-        if self._mesh.getDimension() == 2:
-            localNodeCount = 4
-            vtkIndexing = [ 0, 1, 3, 2 ]
-            cellTypeString = '9'
-        else:
-            localNodeCount = 8
-            vtkIndexing = [ 0, 1, 3, 2, 4, 5, 7, 6 ]
-            cellTypeString = '12'
-        localNodeCountStr = str(localNodeCount)
-        cellCount = self._mesh.getSize()
-        cellListSize = (1 + localNodeCount)*cellCount
-        outstream.write('CELLS ' + str(cellCount) + ' ' + str(cellListSize) + '\n')
+
+    def _getNodeIdentifiers(self):
+        '''
+        Get node identifiers in order so vtk point indexes, which are zero index based with no
+        identifier, can be found for them.
+        :return: First node identifier, array of all node identifiers or None if consecutive.
+        '''
+        nodeIter = self._nodes.createNodeiterator()
+        node = nodeIter.next()
+        firstNodeIdentifier = node.getIdentifier() if node.isValid() else 1
+        consecutiveCount = 0
+        nodeIdentifiers = None
+        while node.isValid():
+            nodeIdentifier = node.getIdentifier()
+            if nodeIdentifiers is not None:
+                nodeIdentifiers.append(nodeIdentifier)
+            elif nodeIdentifier == (firstNodeIdentifier + consecutiveCount):
+                consecutiveCount += 1
+            else:
+                nodeIdentifiers = list(range(firstNodeIdentifier, firstNodeIdentifier + consecutiveCount)) + [ nodeIdentifier ]
+            node = nodeIter.next()
+        if nodeIdentifiers is not None:
+            nodeIdentifiers = np.array(nodeIdentifiers, dtype=np.int64)
+        return firstNodeIdentifier, nodeIdentifiers
+
+
+    def _iterateCellChunks(self, chunkSize):
+        '''
+        :return: Generator of arrays (chunkSize, localNodeCount) of zero-based point indexes
+        of cells in vtk order. Raises KeyError for the first cell node identifier not in nodes,
+        e.g. -1 for a node not set in the element.
+        '''
+        firstNodeIdentifier, nodeIdentifiers = self._getNodeIdentifiers()
+        pointsCount = self._nodes.getSize()
+        elementNodeIdentifiers = []
+        elementIter = self._mesh.createElementiterator()
+        element = elementIter.next()
+        while True:
+            if element.isValid():
+                eft = element.getElementfieldtemplate(self._coordinates, -1)  # assumes all components same
+                elementNodeIdentifiers.append(getElementNodeIdentifiersBasisOrder(element, eft))
+                element = elementIter.next()
+            if elementNodeIdentifiers and ((len(elementNodeIdentifiers) == chunkSize) or not element.isValid()):
+                cellNodeIdentifiers = np.array(elementNodeIdentifiers, dtype=np.int64)[:, self._vtkIndexing]
+                if nodeIdentifiers is None:
+                    cells = cellNodeIdentifiers - firstNodeIdentifier
+                    valid = (cells >= 0) & (cells < pointsCount)
+                else:
+                    cells = np.searchsorted(nodeIdentifiers, cellNodeIdentifiers)
+                    valid = cells < pointsCount
+                    valid[valid] = nodeIdentifiers[cells[valid]] == cellNodeIdentifiers[valid]
+                if not valid.all():
+                    raise KeyError(int(cellNodeIdentifiers[~valid][0]))
+                yield cells
+                elementNodeIdentifiers = []
+            if not element.isValid():
+                break
+
+
+    def _getAnnotationMask(self):
+        '''
+        Get membership of all elements in all annotation groups in a single pass over the mesh
+        plus one pass over the elements of each group, matched by identifier.
+        :return: Integer array (cellCount) with bit g set if element is in annotation group g,
+        int32 for up to 31 annotation groups, otherwise int64.
+        '''
+        elementIdentifiers = []
         elementIter = self._mesh.createElementiterator()
         element = elementIter.next()
         while element.isValid():
-            eft = element.getElementfieldtemplate(coordinates, -1)  # assumes all components same
-            nodeIdentifiers = getElementNodeIdentifiersBasisOrder(element, eft)
-            outstream.write(localNodeCountStr)
-            for localIndex in vtkIndexing:
-                index = nodeIdentifierToIndex[nodeIdentifiers[localIndex]]
-                outstream.write(' ' + str(index))
-            outstream.write('\n')
+            elementIdentifiers.append(element.getIdentifier())
             element = elementIter.next()
-        outstream.write('CELL_TYPES ' + str(cellCount) + '\n')
-        for i in range(cellCount - 1):
-            outstream.write(cellTypeString + ' ')
-        outstream.write(cellTypeString + '\n')
-
-        if self._annotationGroups:
-            outstream.write('CELL_DATA ' + str(cellCount) + '\n')
-            for annotationGroup in self._annotationGroups:
-                safeName = annotationGroup.getName().replace(' ', '_')
-                outstream.write('SCALARS ' + safeName + ' int 1\n')
-                outstream.write('LOOKUP_TABLE default\n') 
-                meshGroup = annotationGroup.getMeshGroup(self._mesh)
-                elementIter = self._mesh.createElementiterator()
-                element = elementIter.next()
-                while element.isValid():
-                    outstream.write('1 ' if meshGroup.containsElement(element) else '0 ')
-                    element = elementIter.next()
-                outstream.write('\n')
+        elementIdentifiers = np.array(elementIdentifiers, dtype=np.int64)
+        assert len(self._annotationGroups) < 64, 'ExportVtk:  Too many annotation groups for annotation mask'
+        mask = np.zeros(elementIdentifiers.shape[0], dtype=np.int32 if (len(self._annotationGroups) < 32) else np.int64)
+        for g, annotationGroup in enumerate(self._annotationGroups):
+            groupElementIdentifiers = []
+            groupIter = annotationGroup.getMeshGroup(self._mesh).createElementiterator()
+            element = groupIter.next()
+            while element.isValid():
+                groupElementIdentifiers.append(element.getIdentifier())
+                element = groupIter.next()
+            mask[np.searchsorted(elementIdentifiers, np.array(groupElementIdentifiers, dtype=np.int64))] |= (1 << g)
+        return mask
+
+
+    def _getCellDataArrays(self, annotationMask):
+        '''
+        :param annotationMask: If True, get a single annotation_mask array with bit g set for cells in
+        annotation group g, otherwise get an array per annotation group with 1 for cells in it.
+        :return: List of (safe name, legacy vtk type, vtu type, numpy type without byte order,
+        function of mask returning values). Values must be converted to the numpy type with the
+        byte order of the format when written, as the mask may be int64 for any array.
+        '''
+        if not self._annotationGroups:
+            return []
+        if annotationMask:
+            if len(self._annotationGroups) < 32:
+                return [ ( 'annotation_mask', 'int', 'Int32', 'i4', lambda mask: mask ) ]
+            return [ ( 'annotation_mask', 'vtktypeint64', 'Int64', 'i8', lambda mask: mask ) ]
+        return [ ( self._getSafeGroupName(annotationGroup), 'int', 'Int32', 'i4',
+            lambda mask, g=g: (mask >> g) & 1 ) for g, annotationGroup in enumerate(self._annotationGroups) ]
+
+
+    def _getSafeGroupName(self, annotationGroup):
+        return annotationGroup.getName().replace(' ', '_')
+
+
+    def _generateText(self, chunkSize, annotationMask):
+        '''
+        Generate legacy vtk text format.
+        :return: Generator of bytes.
+        '''
+        pointsCount = self._nodes.getSize()
+        cellCount = self._mesh.getSize()
+        yield ('# vtk DataFile Version 2.0\n' + self._description + '\nASCII\nDATASET UNSTRUCTURED_GRID\n').encode()
+        yield ('POINTS ' + str(pointsCount) + ' double\n').encode()
+        for points in self._iterateNodeChunks(chunkSize):
+            yield ''.join((' '.join(str(s) for s in x) + '\n') for x in points.tolist()).encode()
+        localNodeCountStr = str(self._localNodeCount)
+        yield ('CELLS ' + str(cellCount) + ' ' + str((1 + self._localNodeCount)*cellCount) + '\n').encode()
+        for cells in self._iterateCellChunks(chunkSize):
+            yield ''.join((localNodeCountStr + ' ' + ' '.join(str(index) for index in indexes) + '\n')
+                for indexes in cells.tolist()).encode()
+        yield ('CELL_TYPES ' + str(cellCount) + '\n').encode()
+        cellTypeString = str(self._cellType)
+        for c in range(0, cellCount, chunkSize):
+            yield ((' ' if c else '') + ' '.join([ cellTypeString ]*min(chunkSize, cellCount - c))).encode()
+        yield b'\n'
+        cellDataArrays = self._getCellDataArrays(annotationMask)
+        if cellDataArrays:
+            mask = self._getAnnotationMask()
+            yield ('CELL_DATA ' + str(cellCount) + '\n').encode()
+            for safeName, vtkType, vtuType, numpyType, getValues in cellDataArrays:
+                yield ('SCALARS ' + safeName + ' ' + vtkType + ' 1\nLOOKUP_TABLE default\n').encode()
+                for c in range(0, cellCount, chunkSize):
+                    yield ''.join((str(value) + ' ') for value in getValues(mask[c:c + chunkSize]).tolist()).encode()
+                yield b'\n'
+
+
+    def _generateBinary(self, chunkSize, annotationMask):
+        '''
+        Generate legacy vtk binary format, with big-endian data as required by the format.
+        :return: Generator of bytes.
+        '''
+        pointsCount = self._nodes.getSize()
+        cellCount = self._mesh.getSize()
+        yield ('# vtk DataFile Version 2.0\n' + self._description + '\nBINARY\nDATASET UNSTRUCTURED_GRID\n').encode()
+        yield ('POINTS ' + str(pointsCount) + ' double\n').encode()
+        for points in self._iterateNodeChunks(chunkSize):
+            # legacy vtk points always have 3 components
+            points3d = np.zeros((points.shape[0], 3), dtype='>f8')
+            points3d[:, :points.shape[1]] = points
+            yield points3d.tobytes()
+        yield ('\nCELLS ' + str(cellCount) + ' ' + str((1 + self._localNodeCount)*cellCount) + '\n').encode()
+        for cells in self._iterateCellChunks(chunkSize):
+            cellList = np.empty((cells.shape[0], 1 + self._localNodeCount), dtype='>i4')
+            cellList[:, 0] = self._localNodeCount
+            cellList[:, 1:] = cells
+            yield cellList.tobytes()
+        yield ('\nCELL_TYPES ' + str(cellCount) + '\n').encode()
+        for c in range(0, cellCount, chunkSize):
+            yield np.full(min(chunkSize, cellCount - c), self._cellType, dtype='>i4').tobytes()
+        yield b'\n'
+        cellDataArrays = self._getCellDataArrays(annotationMask)
+        if cellDataArrays:
+            mask = self._getAnnotationMask()
+            yield ('CELL_DATA ' + str(cellCount) + '\n').encode()
+            for safeName, vtkType, vtuType, numpyType, getValues in cellDataArrays:
+                yield ('SCALARS ' + safeName + ' ' + vtkType + ' 1\nLOOKUP_TABLE default\n').encode()
+                for c in range(0, cellCount, chunkSize):
+                    yield getValues(mask[c:c + chunkSize]).astype('>' + numpyType).tobytes()
+                yield b'\n'
+
+
+    def _generateVtu(self, chunkSize, annotationMask):
+        '''
+        Generate XML vtu unstructured grid format with little-endian raw appended data.
+        Array sizes are known in advance from the numbers of nodes and elements, so offsets
+        are written in the header before the appended data is streamed.
+        :return: Generator of bytes.
+        '''
+        pointsCount = self._nodes.getSize()
+        cellCount = self._mesh.getSize()
+        # (attributes, size in bytes) for each appended data array, in order
+        dataArrays = [
+            ( 'type="Float64" NumberOfComponents="3"', pointsCount*3*8 ),
+            ( 'type="Int64" Name="connectivity"', cellCount*self._localNodeCount*8 ),
+            ( 'type="Int64" Name="offsets"', cellCount*8 ),
+            ( 'type="UInt8" Name="types"', cellCount ) ]
+        cellDataArrays = self._getCellDataArrays(annotationMask)
+        for safeName, vtkType, vtuType, numpyType, getValues in cellDataArrays:
+            dataArrays.append(( 'type="' + vtuType + '" Name=' + quoteattr(safeName), cellCount*np.dtype(numpyType).itemsize ))
+        offset = 0
+        elements = []
+        for attributes, nbytes in dataArrays:
+            elements.append('<DataArray ' + attributes + ' format="appended" offset="' + str(offset) + '"/>')
+            offset += 8 + nbytes
+        header = '<?xml version="1.0"?>\n' + \
+            '<!-- ' + self._description.replace('--', '- -') + ' -->\n' + \
+            '<VTKFile type="UnstructuredGrid" version="1.0" byte_order="LittleEndian" header_type="UInt64">\n' + \
+            '<UnstructuredGrid>\n' + \
+            '<Piece NumberOfPoints="' + str(pointsCount) + '" NumberOfCells="' + str(cellCount) + '">\n' + \
+            '<Points>\n' + elements[0] + '\n</Points>\n' + \
+            '<Cells>\n' + '\n'.join(elements[1:4]) + '\n</Cells>\n'
+        if cellDataArrays:
+            header += '<CellData>\n' + '\n'.join(elements[4:]) + '\n</CellData>\n'
+        header += '</Piece>\n</UnstructuredGrid>\n<AppendedData encoding="raw">\n_'
+        yield header.encode()
+        sizeHeaders = [ np.array([ nbytes ], dtype='<u8').tobytes() for attributes, nbytes in dataArrays ]
+        yield sizeHeaders[0]
+        for points in self._iterateNodeChunks(chunkSize):
+            points3d = np.zeros((points.shape[0], 3), dtype='<f8')
+            points3d[:, :points.shape[1]] = points
+            yield points3d.tobytes()
+        yield sizeHeaders[1]
+        for cells in self._iterateCellChunks(chunkSize):
+            yield cells.astype('<i8').tobytes()
+        yield sizeHeaders[2]
+        for c in range(0, cellCount, chunkSize):
+            yield (np.arange(c + 1, min(c + chunkSize, cellCount) + 1, dtype='<i8')*self._localNodeCount).tobytes()
+        yield sizeHeaders[3]
+        for c in range(0, cellCount, chunkSize):
+            yield np.full(min(chunkSize, cellCount - c), self._cellType, dtype='<u1').tobytes()
+        if cellDataArrays:
+            mask = self._getAnnotationMask()
+        for a, ( safeName, vtkType, vtuType, numpyType, getValues ) in enumerate(cellDataArrays):
+            yield sizeHeaders[4 + a]
+            for c in range(0, cellCount, chunkSize):
+                yield getValues(mask[c:c + chunkSize]).astype('<' + numpyType).tobytes()
+        yield b'\n</AppendedData>\n</VTKFile>\n'
+
+
+    def generate(self, binary = False, vtu = False, chunkSize = 10000, annotationMask = False):
+        '''
+        Generate vtk output in chunks, e.g. to stream to a network response without a temporary file.
+        :param binary: For legacy vtk format, set to True for binary data, otherwise text.
+        :param vtu: Set to True for XML vtu format with binary appended data, otherwise legacy vtk format.
+        :param chunkSize: Maximum number of nodes or elements to output in each chunk.
+        :param annotationMask: Set to True to output annotation groups as a single integer cell data
+        array annotation_mask with bit g set for cells in annotationGroups[g], otherwise output
+        an array per annotation group with 1 for cells in it, 0 otherwise.
+        :return: Generator of bytes objects.
+        '''
+        assert chunkSize > 0, 'ExportVtk.generate:  Invalid chunkSize'
+        if vtu:
+            return self._generateVtu(chunkSize, annotationMask)
+        if binary:
+            return self._generateBinary(chunkSize, annotationMask)
+        return self._generateText(chunkSize, annotationMask)
+
+
+    def write(self, outstream, binary = False, vtu = False, chunkSize = 10000, annotationMask = False):
+        '''
+        Export to binary file-like object. See generate() for parameters.
+        :param outstream: Object with write(bytes) method e.g. file opened in 'wb' mode, io.BytesIO.
+        '''
+        for chunk in self.generate(binary, vtu, chunkSize, annotationMask):
+            outstream.write(chunk)
 
 
-    def writeFile(self, filename):
+    def writeFile(self, filename, binary = False, annotationMask = False):
         '''
-        Export to legacy vtk file/
+        Export to vtk file. Writes XML vtu format with binary appended data if filename ends
+        in .vtu, otherwise legacy vtk format.
+        :param filename: Name of file to write.
+        :param binary: For legacy vtk format, set to True to write binary data, otherwise text.
+        :param annotationMask: Set to True to output single annotation_mask cell data. See generate().
         '''
-        with open(filename, 'w') as outstream:
-            self._write(outstream)
+        with open(filename, 'wb') as outstream:
+            self.write(outstream, binary, vtu=filename.lower().endswith('.vtu'), annotationMask=annotationMask)
@@ -0,0 +1,169 @@
+'''
+On-disk cache of generated scaffolds, keyed by a hash of scaffold type, settings and mesh edits.
+'''
+
+import hashlib
+from importlib.metadata import PackageNotFoundError, version
+import json
+import os
+import tempfile
+from opencmiss.zinc.result import RESULT_OK
+from scaffoldmaker.annotation.annotationgroup import AnnotationGroup
+
+# increment if the format of cache entries changes
+cacheFormatVersion = 1
+
+
+def _getPackageVersion():
+    try:
+        return version('scaffoldmaker')
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+class GenerationCache:
+    '''
+    Cache of generated scaffold models and their annotation groups in a directory.
+    Each entry is a Zinc model file plus a JSON file with annotation group metadata,
+    named by the key. Least recently used entries are removed when the total size of
+    the cache exceeds the maximum size.
+    '''
+
+    def __init__(self, directory, maximumSize = 1 << 30):
+        '''
+        :param directory: Path of directory to hold cache files, created if needed.
+        :param maximumSize: Maximum total size of cache files in bytes.
+        '''
+        assert maximumSize > 0, 'GenerationCache:  Invalid maximumSize'
+        self._directory = directory
+        self._maximumSize = maximumSize
+        self._hitsCount = 0
+        self._missesCount = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def getHitsCount(self):
+        return self._hitsCount
+
+    def getMissesCount(self):
+        return self._missesCount
+
+    def getKey(self, scaffoldPackage):
+        '''
+        Get stable key for generating scaffoldPackage, a hash of its fingerprint, which covers
+        scaffold type name, settings including nested scaffold packages and mesh edits, with the
+        cache format and scaffoldmaker versions.
+        :param scaffoldPackage: ScaffoldPackage to get key for.
+        :return: Key as hexadecimal string.
+        '''
+        text = json.dumps([ scaffoldPackage.getFingerprint(), cacheFormatVersion, _getPackageVersion() ])
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _getFileNames(self, key):
+        '''
+        :return: Model file name, annotation groups file name for key.
+        '''
+        return os.path.join(self._directory, key + '.exf'), os.path.join(self._directory, key + '.json')
+
+    def load(self, key, region):
+        '''
+        Read cached model for key into region and count hit or miss.
+        An entry which cannot be read is removed and counted as a miss.
+        :param key: Key from getKey().
+        :param region: Empty Zinc region to read model into. Unchanged if not in cache.
+        :return: List of AnnotationGroup, or None if not in cache.
+        '''
+        modelFileName, annotationFileName = self._getFileNames(key)
+        try:
+            with open(annotationFileName, 'r') as f:
+                annotationGroupsMetadata = json.load(f)
+            with open(modelFileName, 'rb') as f:
+                model = f.read()
+        except (OSError, ValueError):
+            self._missesCount += 1
+            return None
+        sir = region.createStreaminformationRegion()
+        sir.createStreamresourceMemoryBuffer(model)
+        # Zinc only merges the model into region if it is read successfully
+        if region.read(sir) != RESULT_OK:
+            self._remove(key)
+            self._missesCount += 1
+            return None
+        annotationGroups = [ AnnotationGroup(region, metadata['name'], metadata['FMANumber'], metadata['lyphID'])
+            for metadata in annotationGroupsMetadata ]
+        # mark as recently used
+        for fileName in (modelFileName, annotationFileName):
+            os.utime(fileName)
+        self._hitsCount += 1
+        return annotationGroups
+
+    def save(self, key, region, annotationGroups):
+        '''
+        Store model in region and its annotation groups for key, then remove least recently
+        used entries until cache is within maximum size.
+        :param key: Key from getKey().
+        :param region: Zinc region containing generated model.
+        :param annotationGroups: List of AnnotationGroup for model, or None.
+        '''
+        sir = region.createStreaminformationRegion()
+        srm = sir.createStreamresourceMemory()
+        region.write(sir)
+        result, model = srm.getBuffer()
+        if isinstance(model, str):
+            model = model.encode('utf-8')
+        annotationGroupsMetadata = [ { 'name' : annotationGroup.getName(), 'FMANumber' : annotationGroup.getFMANumber(),
+            'lyphID' : annotationGroup.getLyphID() } for annotationGroup in (annotationGroups if annotationGroups else []) ]
+        modelFileName, annotationFileName = self._getFileNames(key)
+        # write to uniquely named temporary files then rename so concurrent readers and writers
+        # in any thread or process never see partial entries
+        for fileName, mode, data in ((modelFileName, 'wb', model), (annotationFileName, 'w', json.dumps(annotationGroupsMetadata))):
+            fd, temporaryFileName = tempfile.mkstemp(suffix='.tmp', dir=self._directory)
+            try:
+                with os.fdopen(fd, mode) as f:
+                    f.write(data)
+                os.replace(temporaryFileName, fileName)
+            except Exception:
+                os.remove(temporaryFileName)
+                raise
+        self._evict()
+
+    def _remove(self, key):
+        '''
+        Remove files for key from cache, if present.
+        '''
+        for fileName in self._getFileNames(key):
+            try:
+                os.remove(fileName)
+            except OSError:
+                pass
+
+    def _evict(self):
+        '''
+        Remove least recently used entries until total size is within maximum size.
+        '''
+        entries = {}
+        for fileName in os.listdir(self._directory):
+            key, extension = os.path.splitext(fileName)
+            if extension not in ('.exf', '.json'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self._directory, fileName))
+            except OSError:
+                continue
+            size, accessTime = entries.get(key, (0, 0.0))
+            entries[key] = (size + stat.st_size, max(accessTime, stat.st_mtime))
+        totalSize = sum(size for size, accessTime in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k][1]):
+            if totalSize <= self._maximumSize:
+                break
+            self._remove(key)
+            totalSize -= entries[key][0]
+
+    def clear(self):
+        '''
+        Remove all entries from cache and reset hit and miss counts.
+        '''
+        for fileName in os.listdir(self._directory):
+            if os.path.splitext(fileName)[1] in ('.exf', '.json'):
+                os.remove(os.path.join(self._directory, fileName))
+        self._hitsCount = 0
+        self._missesCount = 0
@@ -3,18 +3,37 @@ Interpolation functions shared by mesh generators.
 '''
 
 from __future__ import division
+import bisect
 import collections
 import copy
 from enum import Enum
 import math
+import numpy as np
 from scaffoldmaker.utils import vector
 
 gaussXi3 = ( (-math.sqrt(0.6)+1.0)/2.0, 0.5, (+math.sqrt(0.6)+1.0)/2.0 )
 gaussWt3 = ( 5.0/18.0, 4.0/9.0, 5.0/18.0 )
 
+# 15 point Gauss-Kronrod rule on [0, 1] with weights for the 7 point Gauss rule at its odd points
+_kronrodX = np.array([ 0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926, 0.741531185599394439863864773280788, 0.586087235467691130294144845693013,
+    0.405845151377397166906606412076961, 0.207784955007898467600689403773245 ])
+_kronrodW = np.array([ 0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518, 0.140653259715525918745189590510238, 0.169004726639267902826583426598550,
+    0.190350578064785409913256402421014, 0.204432940075298892414161999234649 ])
+_gaussW = np.array([ 0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975 ])
+kronrodXi15 = 0.5*np.concatenate([ -_kronrodX, [ 0.0 ], _kronrodX[::-1] ]) + 0.5
+kronrodWt15 = 0.5*np.concatenate([ _kronrodW, [ 0.209482141084727828012999174891714 ], _kronrodW[::-1] ])
+gaussWt7 = 0.5*np.concatenate([ _gaussW, [ 0.417959183673469387755102040816327 ], _gaussW[::-1] ])
+# sampling functions use python loops, which are faster than numpy arrays for fewer elements in and out than these
+_sampleArraysMinimumElementsIn = 32
+_sampleArraysMinimumElementsOut = 10
+
 
 def getCubicHermiteBasis(xi):
     """
+    :param xi: Scalar xi, or numpy array of xi values to evaluate all at once.
     :return: 4 basis functions for x1, d1, x2, d2
     """
     xi2 = xi*xi
@@ -43,6 +62,7 @@ def interpolateCubicHermite(v1, d1, v2, d2, xi):
 
 def getCubicHermiteBasisDerivatives(xi):
     """
+    :param xi: Scalar xi, or numpy array of xi values to evaluate all at once.
     :return: 4 derivatives of basis functions for x1, d1, x2, d2
     """
     xi2 = xi*xi
@@ -81,64 +101,215 @@ def interpolateCubicHermiteSecondDerivative(v1, d1, v2, d2, xi):
     f4 = -2.0 +  6.0*xi
     return [ (f1*v1[i] + f2*d1[i] + f3*v2[i] + f4*d2[i]) for i in range(len(v1)) ]
 
-def computeCubicHermiteArcLength(v1, d1, v2, d2, rescaleDerivatives):
+def _getXiArray(xi):
+    """
+    :return: xi as float numpy array with a trailing axis to broadcast over components.
+    """
+    return np.asarray(xi, dtype=float)[..., np.newaxis]
+
+def interpolateCubicHermiteArray(v1, d1, v2, d2, xi):
+    """
+    Get values of cubic Hermite interpolated from v1, d1 to v2, d2 at many points in one call.
+    Array counterpart of interpolateCubicHermite.
+    :param v1, v2: Values at xi = 0.0 and xi = 1.0, respectively. Array of shape (N, components)
+    for N curves, or (components) for a single curve.
+    :param d1, d2: Derivatives w.r.t. xi at xi = 0.0 and xi = 1.0, respectively. Shape as for v1, v2.
+    :param xi: Positions in curves. Array of shape (N) for one position per curve, or (M) for M
+    positions on a single curve.
+    :return: numpy array of interpolated values at xi, shape (N or M, components).
+    """
+    f1, f2, f3, f4 = getCubicHermiteBasis(_getXiArray(xi))
+    return f1*v1 + f2*d1 + f3*v2 + f4*d2
+
+def interpolateCubicHermiteDerivativeArray(v1, d1, v2, d2, xi):
+    """
+    Get derivatives of cubic Hermite interpolated from v1, d1 to v2, d2 at many points in one call.
+    Array counterpart of interpolateCubicHermiteDerivative; arguments as for interpolateCubicHermiteArray.
+    :return: numpy array of interpolated derivatives at xi, shape (N or M, components).
+    """
+    f1, f2, f3, f4 = getCubicHermiteBasisDerivatives(_getXiArray(xi))
+    return f1*v1 + f2*d1 + f3*v2 + f4*d2
+
+def interpolateCubicHermiteSecondDerivativeArray(v1, d1, v2, d2, xi):
+    """
+    Get second derivatives of cubic Hermite interpolated from v1, d1 to v2, d2 at many points in one call.
+    Array counterpart of interpolateCubicHermiteSecondDerivative; arguments as for interpolateCubicHermiteArray.
+    :return: numpy array of interpolated second derivatives at xi, shape (N or M, components).
+    """
+    xi = _getXiArray(xi)
+    f1 = -6.0 + 12.0*xi
+    f2 = -4.0 +  6.0*xi
+    f3 =  6.0 - 12.0*xi
+    f4 = -2.0 +  6.0*xi
+    return f1*v1 + f2*d1 + f3*v2 + f4*d2
+
+def computeCubicHermiteArcLength(v1, d1, v2, d2, rescaleDerivatives, tolerance = None):
     """
     Compute arc length between v1 and v2, scaling unit d1 and d2.
-    Iterative; not optimised.
+    Solved by Newton iteration.
     :param d1: Initial derivative at v1.
     :param d2: Initial derivative at v2.
     :param rescaleDerivatives: If True, rescale initial d1 and d2 to |v2 - v|
+    :param tolerance: Optional relative tolerance for adaptive arc length quadrature.
+    See getCubicHermiteArcLength.
     :return: Arc length.
     """
     if rescaleDerivatives:
-        lastArcLength = math.sqrt(sum((v2[i] - v1[i])*(v2[i] - v1[i]) for i in range(len(v1))))
+        arcLength = math.sqrt(sum((v2[i] - v1[i])*(v2[i] - v1[i]) for i in range(len(v1))))
     else:
-        lastArcLength = getCubicHermiteArcLength(v1, d1, v2, d2)
+        arcLength = getCubicHermiteArcLength(v1, d1, v2, d2)
     d1 = vector.normalise(d1)
     d2 = vector.normalise(d2)
-    tol = 1.0E-6
-    for iters in range(100):
-        #print('iter',iters,'=',lastArcLength)
-        d1s = [lastArcLength*d for d in d1]
-        d2s = [lastArcLength*d for d in d2]
-        arcLength = getCubicHermiteArcLength(v1, d1s, v2, d2s)
-        if iters > 9:
-            arcLength = 0.8*arcLength + 0.2*lastArcLength
-        if math.fabs(arcLength - lastArcLength) < tol*arcLength:
-            #print('computeCubicHermiteArcLength converged at iter',iters,'=',arcLength,', closeness', math.fabs(arcLength - lastArcLength))
-            return arcLength
-        lastArcLength = arcLength
-    print('computeCubicHermiteArcLength:  Max iters reached:',iters,'=',arcLength,', closeness', math.fabs(arcLength - lastArcLength))
-    return arcLength
+    return _solveCubicHermiteDerivativeScaling(v1, d1, v2, d2, 1.0, arcLength, tolerance, 'computeCubicHermiteArcLength')
 
-def computeCubicHermiteDerivativeScaling(v1, d1, v2, d2):
+def computeCubicHermiteDerivativeScaling(v1, d1, v2, d2, tolerance = None):
     '''
     Compute scaling for d1, d2 which makes their sum twice the arc length.
+    Solved by Newton iteration.
+    :param tolerance: Optional relative tolerance for adaptive arc length quadrature.
+    See getCubicHermiteArcLength.
     :return: Scale factor to multiply d1, d2
     '''
     origMag = 0.5*(vector.magnitude(d1) + vector.magnitude(d2))
-    scaling = 1.0
-    for iters in range(100):
-        mag = origMag*scaling
-        arcLength = getCubicHermiteArcLength(v1, [ d*scaling for d in d1 ], v2, [ d*scaling for d in d2 ])
-        if math.fabs(arcLength - mag) < 0.000001*arcLength:
-            #print('compute scaling', v1, d1, v2, d2, '\n  --> scaling',scaling)
+    return _solveCubicHermiteDerivativeScaling(v1, d1, v2, d2, origMag, 1.0, tolerance, 'computeCubicHermiteDerivativeScaling')
+
+def _solveCubicHermiteDerivativeScaling(v1, d1, v2, d2, magnitude, scaling, tolerance, name):
+    '''
+    Newton solve for scaling of d1, d2 at which the arc length equals scaling*magnitude.
+    The derivative at each quadrature point is p + scaling*q for p from v1, v2 and q from
+    d1, d2, so the arc length and its derivative w.r.t. scaling are evaluated directly.
+    The residual is convex in scaling so Newton converges from any start if there is a
+    solution; otherwise the fixed point update scaling = arcLength/magnitude is used.
+    With a tolerance, the adaptive quadrature intervals are chosen for the derivatives at
+    the current scaling, and are chosen again and solved from there until the converged
+    arc length agrees with getCubicHermiteArcLength with that tolerance.
+    :param magnitude: Magnitude of d1, d2 to multiply by scaling.
+    :param scaling: Initial scaling.
+    :param tolerance: Relative tolerance for adaptive quadrature, or None for 3 point Gauss.
+    :param name: Name of calling function for warning.
+    :return: Scaling.
+    '''
+    components = range(len(v1))
+    for intervalsIters in range(10):
+        if tolerance is None:
+            xis = gaussXi3
+            wts = gaussWt3
+        else:
+            xiStart, width = _getCubicHermiteArcLengthIntervals(
+                np.array([ v1 ], dtype=float), scaling*np.array([ d1 ], dtype=float),
+                np.array([ v2 ], dtype=float), scaling*np.array([ d2 ], dtype=float), tolerance)[2:]
+            xis = (xiStart[:, np.newaxis] + width[:, np.newaxis]*kronrodXi15).ravel().tolist()
+            wts = (width[:, np.newaxis]*kronrodWt15).ravel().tolist()
+        pqw = []
+        for xi, wt in zip(xis, wts):
+            f1, f2, f3, f4 = getCubicHermiteBasisDerivatives(xi)
+            pqw.append(( [ (f1*v1[c] + f3*v2[c]) for c in components ], [ (f2*d1[c] + f4*d2[c]) for c in components ], wt ))
+        for iters in range(100):
+            arcLength = 0.0
+            dArcLength = 0.0
+            for p, q, wt in pqw:
+                d = [ (p[c] + scaling*q[c]) for c in components ]
+                mag = math.sqrt(sum(s*s for s in d))
+                arcLength += wt*mag
+                if mag > 0.0:
+                    dArcLength += wt*sum(d[c]*q[c] for c in components)/mag
+            residual = arcLength - scaling*magnitude
+            if math.fabs(residual) <= 1.0E-10*arcLength:
+                break
+            dResidual = dArcLength - magnitude
+            if dResidual < 0.0:
+                scaling -= residual/dResidual
+            else:
+                scaling = arcLength/magnitude
+        else:
+            print(name + ':  Max iters reached:', iters, ' mag', scaling*magnitude, 'arc', arcLength)
+            return scaling
+        if tolerance is None:
             return scaling
-        scaling *= arcLength/mag
-    print('computeCubicHermiteDerivativeScaling:  Max iters reached:', iters, ' mag', mag, 'arc', arcLength)
+        arcLength = getCubicHermiteArcLength(v1, [ scaling*d for d in d1 ], v2, [ scaling*d for d in d2 ], tolerance)
+        if math.fabs(arcLength - scaling*magnitude) <= tolerance*arcLength:
+            return scaling
+    print(name + ':  Max quadrature interval iters reached:', intervalsIters, ' mag', scaling*magnitude, 'arc', arcLength)
     return scaling
 
-def getCubicHermiteArcLength(v1, d1, v2, d2):
+def getCubicHermiteArcLength(v1, d1, v2, d2, tolerance = None):
     '''
     Note this is approximate.
-    :return: Arc length of cubic curve using 3 point Gaussian quadrature.
+    :param tolerance: Optional relative tolerance for adaptive Gauss-Kronrod quadrature.
+    See getCubicHermiteArcLengthArray.
+    :return: Arc length of cubic curve using 3 point Gaussian quadrature, or adaptive
+    quadrature if tolerance is specified.
     '''
+    if tolerance is not None:
+        return getCubicHermiteArcLengthArray([ v1 ], [ d1 ], [ v2 ], [ d2 ], tolerance)[0].item()
     arcLength = 0.0
     for i in range(3):
         dm = interpolateCubicHermiteDerivative(v1, d1, v2, d2, gaussXi3[i])
         arcLength += gaussWt3[i]*math.sqrt(sum(d*d for d in dm))
     return arcLength
 
+def getCubicHermiteArcLengthArray(v1, d1, v2, d2, tolerance = None, maxLevels = 20):
+    '''
+    Get arc lengths of many cubic Hermite curves in one call.
+    :param v1, d1, v2, d2: Arrays of shape (N, components) for N curves, as for
+    interpolateCubicHermiteArray.
+    :param tolerance: Relative tolerance on each arc length for adaptive quadrature, which
+    halves intervals until the difference between their 15 point Gauss-Kronrod and embedded
+    7 point Gauss estimates is within their share of the tolerance. If None, use the
+    3 point Gaussian quadrature of getCubicHermiteArcLength.
+    :param maxLevels: Maximum number of times intervals are halved with adaptive quadrature.
+    :return: numpy array of N arc lengths.
+    '''
+    v1 = np.asarray(v1, dtype=float)
+    d1 = np.asarray(d1, dtype=float)
+    v2 = np.asarray(v2, dtype=float)
+    d2 = np.asarray(d2, dtype=float)
+    if tolerance is None:
+        arcLengths = np.zeros(len(v1))
+        for i in range(3):
+            dm = interpolateCubicHermiteDerivativeArray(v1, d1, v2, d2, gaussXi3[i])
+            arcLengths += gaussWt3[i]*np.sqrt(np.sum(dm*dm, axis=1))
+        return arcLengths
+    return _getCubicHermiteArcLengthIntervals(v1, d1, v2, d2, tolerance, maxLevels)[0]
+
+def _getCubicHermiteArcLengthIntervals(v1, d1, v2, d2, tolerance, maxLevels = 20):
+    '''
+    Adaptive Gauss-Kronrod arc length quadrature for getCubicHermiteArcLengthArray.
+    All intervals not yet converged are evaluated together at each level.
+    :return: Arc lengths array, and arrays of curve index, xi start and xi width of
+    converged intervals.
+    '''
+    curvesCount = len(v1)
+    arcLengths = np.zeros(curvesCount)
+    curve = np.arange(curvesCount)
+    xiStart = np.zeros(curvesCount)
+    width = np.ones(curvesCount)
+    estimates = None
+    converged = []
+    for level in range(maxLevels + 1):
+        xi = xiStart[:, np.newaxis] + width[:, np.newaxis]*kronrodXi15
+        dm = interpolateCubicHermiteDerivativeArray(v1[curve, np.newaxis], d1[curve, np.newaxis],
+            v2[curve, np.newaxis], d2[curve, np.newaxis], xi)
+        speed = np.sqrt(np.sum(dm*dm, axis=2))
+        kronrod = width*np.dot(speed, kronrodWt15)
+        gauss = width*np.dot(speed[:, 1::2], gaussWt7)
+        if estimates is None:
+            estimates = kronrod
+        done = np.abs(kronrod - gauss) <= tolerance*width*estimates[curve]
+        if level == maxLevels:
+            done[:] = True
+        np.add.at(arcLengths, curve[done], kronrod[done])
+        converged.append(( curve[done], xiStart[done], width[done] ))
+        split = ~done
+        if not split.any():
+            break
+        halfWidth = 0.5*width[split]
+        curve = np.repeat(curve[split], 2)
+        xiStart = np.stack([ xiStart[split], xiStart[split] + halfWidth ], axis=1).ravel()
+        width = np.repeat(halfWidth, 2)
+    curve, xiStart, width = [ np.concatenate(arrays) for arrays in zip(*converged) ]
+    return arcLengths, curve, xiStart, width
+
 def getCubicHermiteArcLengthToXi(v1, d1, v2, d2, xi):
     '''
     Note this is approximate.
@@ -168,6 +339,20 @@ def getCubicHermiteCurvature(v1, d1, v2, d2, radialVector, xi):
 
     return curvature
 
+def getCubicHermiteCurvatureArray(v1, d1, v2, d2, radialVector, xi):
+    """
+    Array counterpart of getCubicHermiteCurvature evaluating many curves or points in one call.
+    Arguments are as for interpolateCubicHermiteArray.
+    :param radialVector: Radial directions, assumed unit normal to curve tangents at points.
+    Array of shape (N or M, components), or (components) for the same direction at all points.
+    :return: numpy array of scalar curvatures (1/R), shape (N or M).
+    """
+    tangent = interpolateCubicHermiteDerivativeArray(v1, d1, v2, d2, xi)
+    dTangent = interpolateCubicHermiteSecondDerivativeArray(v1, d1, v2, d2, xi)
+    radialCurvature = np.sum(dTangent*radialVector, axis=-1)
+    magTangent = np.sqrt(np.sum(tangent*tangent, axis=-1))
+    return radialCurvature/(magTangent*magTangent)
+
 def getCubicHermiteCurvatureSimple(v1, d1, v2, d2, xi):
     """
     :param v1, v2: Values at xi = 0.0 and xi = 1.0, respectively.
@@ -294,19 +479,25 @@ def sampleCubicHermiteCurves(nx, nd1, elementsCountOut,
     elementsCountIn = len(nx) - 1
     assert (elementsCountIn > 0) and (len(nd1) == (elementsCountIn + 1)) and \
         (elementsCountOut > 0), 'sampleCubicHermiteCurves.  Invalid arguments'
+    useArrays = (elementsCountIn >= _sampleArraysMinimumElementsIn) or (elementsCountOut >= _sampleArraysMinimumElementsOut)
     lengths = [ 0.0 ]
     nd1a = []
     nd1b = []
     length = 0.0
-    for e in range(elementsCountIn):
-        if arcLengthDerivatives:
+    if arcLengthDerivatives:
+        for e in range(elementsCountIn):
             arcLength = computeCubicHermiteArcLength(nx[e], nd1[e], nx[e + 1], nd1[e + 1], rescaleDerivatives = True)
             nd1a.append(vector.setMagnitude(nd1[e], arcLength))
             nd1b.append(vector.setMagnitude(nd1[e + 1], arcLength))
-        else:
-            arcLength = getCubicHermiteArcLength(nx[e], nd1[e], nx[e + 1], nd1[e + 1])
-        length += arcLength
-        lengths.append(length)
+            length += arcLength
+            lengths.append(length)
+    elif useArrays:
+        arcLengthIndex = HermiteCurveArcLengthIndex(nx, nd1)
+        lengths = arcLengthIndex.getCumulativeLengths()
+        length = lengths[-1]
+    else:
+        lengths = _getCubicHermiteCurvesCumulativeLengths(nx, nd1)
+        length = lengths[-1]
     proportionEnd = 2.0/(elementLengthStartEndRatio + 1)
     proportionStart = elementLengthStartEndRatio*proportionEnd
     if elementsCountOut == 1:
@@ -345,28 +536,53 @@ def sampleCubicHermiteCurves(nx, nd1, elementsCountOut,
     pd1 = []
     pe = []
     pxi = []
-    psf = []
+    nodeDistances = []
     distance = 0.0
-    e = 0
     for eOut in range(elementsCountOut):
-        while e < elementsCountIn:
-            if distance < lengths[e + 1]:
-                partDistance = distance - lengths[e]
-                if arcLengthDerivatives:
-                    xi = partDistance/(lengths[e + 1] - lengths[e])
-                    x = interpolateCubicHermite(nx[e], nd1a[e], nx[e + 1], nd1b[e], xi)
-                    d1 = interpolateCubicHermiteDerivative(nx[e], nd1a[e], nx[e + 1], nd1b[e], xi)
-                else:
-                    x, d1, _eIn, xi = getCubicHermiteCurvesPointAtArcDistance(nx[e:e + 2], nd1[e:e + 2], partDistance)
-                sf = nodeDerivativeMagnitudes[eOut]/vector.magnitude(d1)
-                px.append(x)
-                pd1.append([ sf*d for d in d1 ])
+        nodeDistances.append(distance)
+        distance += elementLengths[eOut]
+    # points at or beyond the end of the curves from rounding are omitted
+    peOut = [ eOut for eOut in range(elementsCountOut) if nodeDistances[eOut] < length ]
+    psf = []
+    if peOut and not useArrays:
+        distances = [ nodeDistances[eOut] for eOut in peOut ]
+        if arcLengthDerivatives:
+            e = 0
+            pd = []
+            for distance in distances:
+                while (e < (elementsCountIn - 1)) and (distance >= lengths[e + 1]):
+                    e += 1
+                xi = (distance - lengths[e])/(lengths[e + 1] - lengths[e])
+                px.append(interpolateCubicHermite(nx[e], nd1a[e], nx[e + 1], nd1b[e], xi))
+                pd.append(interpolateCubicHermiteDerivative(nx[e], nd1a[e], nx[e + 1], nd1b[e], xi))
                 pe.append(e)
                 pxi.append(xi)
-                psf.append(sf)
-                break
-            e += 1
-        distance += elementLengths[eOut]
+        else:
+            px, pd, pe, pxi = _getCubicHermiteCurvesPointsAtArcDistances(nx, nd1, lengths, distances)
+        psf = [ nodeDerivativeMagnitudes[eOut]/vector.magnitude(d) for eOut, d in zip(peOut, pd) ]
+        pd1 = [ [ sf*c for c in d ] for sf, d in zip(psf, pd) ]
+    elif peOut:
+        distances = np.array(nodeDistances)[peOut]
+        if arcLengthDerivatives:
+            # interpolate all points in arc length scaled elements at once
+            alengths = np.array(lengths)
+            ae = np.maximum(np.searchsorted(alengths, distances, side='right') - 1, 0)
+            axi = (distances - alengths[ae])/(alengths[ae + 1] - alengths[ae])
+            ax = np.array(nx)
+            ax1 = ax[ae]
+            ad1 = np.array(nd1a)[ae]
+            ax2 = ax[ae + 1]
+            ad2 = np.array(nd1b)[ae]
+            px = interpolateCubicHermiteArray(ax1, ad1, ax2, ad2, axi).tolist()
+            ad = interpolateCubicHermiteDerivativeArray(ax1, ad1, ax2, ad2, axi)
+        else:
+            ax, ad, ae, axi = arcLengthIndex.getPointsAtArcDistances(distances)
+            px = ax.tolist()
+        pe = ae.tolist()
+        pxi = axi.tolist()
+        asf = np.array(nodeDerivativeMagnitudes)[peOut]/np.sqrt(np.sum(ad*ad, axis=1))
+        pd1 = (asf[:, np.newaxis]*ad).tolist()
+        psf = asf.tolist()
     e = elementsCountIn
     eOut = elementsCountOut
     xi = 1.0
@@ -397,48 +613,54 @@ def sampleCubicHermiteCurvesSmooth(nx, nd1, elementsCountOut,
     elementsCountIn = len(nx) - 1
     assert (elementsCountIn > 0) and (len(nd1) == (elementsCountIn + 1)) and (elementsCountOut > 0), \
         'sampleCubicHermiteCurvesSmooth.  Invalid arguments'
-    lengths = [ 0.0 ]
-    length = 0.0
-    for e in range(elementsCountIn):
-        length += getCubicHermiteArcLength(nx[e], nd1[e], nx[e + 1], nd1[e + 1])
-        lengths.append(length)
+    useArrays = (elementsCountIn >= _sampleArraysMinimumElementsIn) or (elementsCountOut >= _sampleArraysMinimumElementsOut)
+    if useArrays:
+        arcLengthIndex = HermiteCurveArcLengthIndex(nx, nd1)
+        length = arcLengthIndex.getLength()
+    else:
+        lengths = _getCubicHermiteCurvesCumulativeLengths(nx, nd1)
+        length = lengths[-1]
     # sample over length to get distances to elements boundaries
     x1 = 0.0
     d1 = derivativeMagnitudeStart*elementsCountOut
     x2 = length
     d2 = derivativeMagnitudeEnd*elementsCountOut
-    nodeDistances = []
-    nodeDerivativeMagnitudes = []
-    for n in range(elementsCountOut + 1):
-        xi = n/elementsCountOut
+    if useArrays:
+        xi = np.arange(elementsCountOut + 1)/elementsCountOut
         f1, f2, f3, f4 = getCubicHermiteBasis(xi)
-        distance = f1*x1 + f2*d1 + f3*x2 + f4*d2
-        nodeDistances.append(distance)
+        nodeDistances = (f1*x1 + f2*d1 + f3*x2 + f4*d2).tolist()
         f1, f2, f3, f4 = getCubicHermiteBasisDerivatives(xi)
-        derivative = f1*x1 + f2*d1 + f3*x2 + f4*d2
-        nodeDerivativeMagnitudes.append(derivative/elementsCountOut)
+        nodeDerivativeMagnitudes = ((f1*x1 + f2*d1 + f3*x2 + f4*d2)/elementsCountOut).tolist()
+    else:
+        nodeDistances = []
+        nodeDerivativeMagnitudes = []
+        for n in range(elementsCountOut + 1):
+            xi = n/elementsCountOut
+            f1, f2, f3, f4 = getCubicHermiteBasis(xi)
+            nodeDistances.append(f1*x1 + f2*d1 + f3*x2 + f4*d2)
+            f1, f2, f3, f4 = getCubicHermiteBasisDerivatives(xi)
+            nodeDerivativeMagnitudes.append((f1*x1 + f2*d1 + f3*x2 + f4*d2)/elementsCountOut)
     #print('nodeDerivativeMagnitudesIn ', [ vector.magnitude(d1) for d1 in nd1 ])
     #print('nodeDerivativeMagnitudesOut', nodeDerivativeMagnitudes)
     px = []
     pd1 = []
     pe = []
     pxi = []
+    # points at or beyond the end of the curves from rounding are omitted
+    peOut = [ eOut for eOut in range(elementsCountOut) if nodeDistances[eOut] < length ]
     psf = []
-    e = 0
-    for eOut in range(elementsCountOut):
-        distance = nodeDistances[eOut]
-        while e < elementsCountIn:
-            if distance < lengths[e + 1]:
-                partDistance = distance - lengths[e]
-                x, d1, _, xi = getCubicHermiteCurvesPointAtArcDistance(nx[e:e + 2], nd1[e:e + 2], partDistance)
-                sf = nodeDerivativeMagnitudes[eOut]/vector.magnitude(d1)
-                px.append(x)
-                pd1.append([ sf*d for d in d1 ])
-                pe.append(e)
-                pxi.append(xi)
-                psf.append(sf)
-                break
-            e += 1
+    if peOut and not useArrays:
+        px, pd, pe, pxi = _getCubicHermiteCurvesPointsAtArcDistances(nx, nd1, lengths, [ nodeDistances[eOut] for eOut in peOut ])
+        psf = [ nodeDerivativeMagnitudes[eOut]/vector.magnitude(d) for eOut, d in zip(peOut, pd) ]
+        pd1 = [ [ sf*c for c in d ] for sf, d in zip(psf, pd) ]
+    elif peOut:
+        ax, ad, ae, axi = arcLengthIndex.getPointsAtArcDistances(np.array(nodeDistances)[peOut])
+        px = ax.tolist()
+        pe = ae.tolist()
+        pxi = axi.tolist()
+        asf = np.array(nodeDerivativeMagnitudes)[peOut]/np.sqrt(np.sum(ad*ad, axis=1))
+        pd1 = (asf[:, np.newaxis]*ad).tolist()
+        psf = asf.tolist()
     e = elementsCountIn
     eOut = elementsCountOut
     xi = 1.0
@@ -451,6 +673,45 @@ def sampleCubicHermiteCurvesSmooth(nx, nd1, elementsCountOut,
     psf.append(sf)
     return px, pd1, pe, pxi, psf
 
+def _getCubicHermiteCurvesCumulativeLengths(nx, nd1):
+    """
+    Python equivalent of HermiteCurveArcLengthIndex.getCumulativeLengths, faster for few elements.
+    :return: List of arc distances to each node, starting with 0.0.
+    """
+    lengths = [ 0.0 ]
+    length = 0.0
+    for e in range(len(nx) - 1):
+        length += getCubicHermiteArcLength(nx[e], nd1[e], nx[e + 1], nd1[e + 1])
+        lengths.append(length)
+    return lengths
+
+def _getCubicHermiteCurvesPointsAtArcDistances(nx, nd1, lengths, arcDistances):
+    """
+    Python equivalent of HermiteCurveArcLengthIndex.getPointsAtArcDistances, faster for few points.
+    :param lengths: Cumulative lengths from _getCubicHermiteCurvesCumulativeLengths.
+    :param arcDistances: Increasing arc distances within curves.
+    :return: lists of coordinates, derivatives, element indexes, xi.
+    """
+    elementsCount = len(nx) - 1
+    px = []
+    pd = []
+    pe = []
+    pxi = []
+    e = 0
+    for arcDistance in arcDistances:
+        while (e < (elementsCount - 1)) and (arcDistance >= lengths[e + 1]):
+            e += 1
+        v1 = nx[e]
+        d1 = nd1[e]
+        v2 = nx[e + 1]
+        d2 = nd1[e + 1]
+        xi = _getCubicHermiteArcLengthXi(v1, d1, v2, d2, arcDistance - lengths[e], lengths[e + 1] - lengths[e])
+        px.append(interpolateCubicHermite(v1, d1, v2, d2, xi))
+        pd.append(interpolateCubicHermiteDerivative(v1, d1, v2, d2, xi))
+        pe.append(e)
+        pxi.append(xi)
+    return px, pd, pe, pxi
+
 def interpolateSampleCubicHermite(v, d, pe, pxi, psf):
     '''
     Partner function to sampleCubicHermiteCurves for interpolating additional variables with
@@ -469,27 +730,22 @@ def interpolateSampleCubicHermite(v, d, pe, pxi, psf):
     assert (len(v) > 1) and (len(d) == len(v)), 'interpolateSampleLinear. Invalid values v, d'
     valuesCountOut = len(pe)
     assert (valuesCountOut > 0) and (len(pxi) == valuesCountOut), 'interpolateSampleLinear. Invalid element, xi'
-    vOut = []
-    dOut = []
-    if isinstance(v[0], collections.Sequence):
-        for n in range(valuesCountOut):
-            e = pe[n]
-            v1 = v[e]
-            d1 = d[e]
-            v2 = v[e + 1]
-            d2 = d[e + 1]
-            vOut.append(interpolateCubicHermite(v1, d1, v2, d2, pxi[n]))
-            dOut.append([ psf[n]*d for d in interpolateCubicHermiteDerivative(v1, d1, v2, d2, pxi[n]) ])
-    else:
-        for n in range(valuesCountOut):
-            e = pe[n]
-            v1 = [ v[e] ]
-            d1 = [ d[e] ]
-            v2 = [ v[e + 1] ]
-            d2 = [ d[e + 1] ]
-            vOut.append(interpolateCubicHermite(v1, d1, v2, d2, pxi[n])[0])
-            dOut.append(psf[n]*interpolateCubicHermiteDerivative(v1, d1, v2, d2, pxi[n])[0])
-    return vOut, dOut
+    av = np.array(v, dtype=float)
+    ad = np.array(d, dtype=float)
+    scalar = av.ndim == 1
+    if scalar:
+        av = av[:, np.newaxis]
+        ad = ad[:, np.newaxis]
+    ae = np.array(pe)
+    v1 = av[ae]
+    d1 = ad[ae]
+    v2 = av[ae + 1]
+    d2 = ad[ae + 1]
+    vOut = interpolateCubicHermiteArray(v1, d1, v2, d2, pxi)
+    dOut = np.array(psf)[:, np.newaxis]*interpolateCubicHermiteDerivativeArray(v1, d1, v2, d2, pxi)
+    if scalar:
+        return vOut[:, 0].tolist(), dOut[:, 0].tolist()
+    return vOut.tolist(), dOut.tolist()
 
 def interpolateSampleLinear(v, pe, pxi):
     '''
@@ -554,6 +810,7 @@ def getCubicHermiteCurvesPointAtArcDistance(nx, nd, arcDistance):
     Get the coordinates, derivatives at distance along cubic Hermite curves.
     Supplied derivatives are used i.e. not rescaled to arc length.
     Note this is approximate.
+    For many queries on the same curves, use a HermiteCurveArcLengthIndex.
     :param nx: Coordinates of nodes along curves.
     :param nd: Derivatives of nodes along curves.
     :param distance: Distance along curves.
@@ -564,9 +821,6 @@ def getCubicHermiteCurvesPointAtArcDistance(nx, nd, arcDistance):
     if arcDistance < 0.0:
         return nx[0], nd[0], 0, 0.0
     length = 0.0
-    xiDelta = 1.0E-6
-    xiTol = 1.0E-6
-    #print('elementsCount',elementsCount,'arcDistance',arcDistance)
     for e in range(elementsCount):
         partDistance = arcDistance - length
         v1 = nx[e]
@@ -574,36 +828,191 @@ def getCubicHermiteCurvesPointAtArcDistance(nx, nd, arcDistance):
         v2 = nx[e + 1]
         d2 = nd[e + 1]
         arcLength = getCubicHermiteArcLength(v1, d1, v2, d2)
-        #print('e',e,'partDistance',partDistance,'arcLength',arcLength)
         if partDistance <= arcLength:
-            xiLast = 100.0
-            xi = partDistance/arcLength
-            dxiLimit = 0.1
-            for iter in range(100):
-                xiLast = xi
-                dist = getCubicHermiteArcLengthToXi(v1, d1, v2, d2, xi)
-                distp = getCubicHermiteArcLengthToXi(v1, d1, v2, d2, xi + xiDelta)
-                distm = getCubicHermiteArcLengthToXi(v1, d1, v2, d2, xi - xiDelta)
-                if (xi - xiDelta) < 0.0:
-                    distm = -distm
-                dxi_ddist = 2.0*xiDelta/(distp - distm)
-                dxi = dxi_ddist*(partDistance - dist)
-                #print('iter',iter,'xi',xi,'--> dist',dist,'dxi',dxi,'dxiLimit',dxiLimit)
-                if dxi > dxiLimit:
-                    dxi = dxiLimit
-                elif dxi < -dxiLimit:
-                    dxi = -dxiLimit
-                xi += dxi
-                if math.fabs(xi - xiLast) <= xiTol:
-                    #print('converged xi',xi)
-                    return interpolateCubicHermite(v1, d1, v2, d2, xi), interpolateCubicHermiteDerivative(v1, d1, v2, d2, xi), e, xi
-                if iter in [ 4, 10, 25, 62 ]:
-                    dxiLimit *= 0.5
-            print('getCubicHermiteCurvesPointAtArcDistance Max iters reached:',iter,': e', e, ', xi',xi,', closeness', math.fabs(dist - partDistance))
-            return v2, d2, e, xi
+            xi = _getCubicHermiteArcLengthXi(v1, d1, v2, d2, partDistance, arcLength)
+            return interpolateCubicHermite(v1, d1, v2, d2, xi), interpolateCubicHermiteDerivative(v1, d1, v2, d2, xi), e, xi
         length += arcLength
     return nx[-1], nd[-1], elementsCount - 1, 1.0
 
+def _getCubicHermiteArcLengthXi(v1, d1, v2, d2, partDistance, elementLength):
+    """
+    Solve for xi at which getCubicHermiteArcLengthToXi equals partDistance in a single
+    element. Arc length to xi is xi times the quadrature of speed at xi*gaussXi3, from which
+    its derivative w.r.t. xi is evaluated directly. Arc length to xi is not monotonic for
+    looped elements, so Newton steps are kept within a bracket of xi about the solution,
+    bisecting it when the step is not positive or leaves the bracket.
+    :param partDistance: Arc distance into element, clamped to start and end of it.
+    :param elementLength: Arc length of element from getCubicHermiteArcLength.
+    :return: xi
+    """
+    if partDistance <= 0.0:
+        return 0.0
+    if partDistance >= elementLength:
+        return 1.0
+    xiLower = 0.0
+    xiUpper = 1.0
+    xi = partDistance/elementLength
+    for iters in range(100):
+        speed = 0.0
+        dSpeed = 0.0
+        for i in range(3):
+            pointXi = xi*gaussXi3[i]
+            tangent = interpolateCubicHermiteDerivative(v1, d1, v2, d2, pointXi)
+            dTangent = interpolateCubicHermiteSecondDerivative(v1, d1, v2, d2, pointXi)
+            magnitude = vector.magnitude(tangent)
+            speed += gaussWt3[i]*magnitude
+            if magnitude > 0.0:
+                dSpeed += gaussXi3[i]*gaussWt3[i]*vector.dotproduct(tangent, dTangent)/magnitude
+        residual = partDistance - xi*speed
+        if abs(residual) <= 1.0E-12*elementLength:
+            return xi
+        if residual > 0.0:
+            xiLower = xi
+        else:
+            xiUpper = xi
+        dDistance = speed + xi*dSpeed
+        xiNewton = (xi + residual/dDistance) if (dDistance > 0.0) else xiLower
+        xi = xiNewton if (xiLower < xiNewton < xiUpper) else 0.5*(xiLower + xiUpper)
+    print('_getCubicHermiteArcLengthXi Max iters reached:', iters, ', closeness', abs(residual))
+    return xi
+
+class HermiteCurveArcLengthIndex:
+    """
+    Cumulative arc lengths along cubic Hermite curves, built once to locate the element
+    and xi at many arc distances by binary search and a Newton solve within the element.
+    Arc lengths use 3 point Gaussian quadrature as for getCubicHermiteArcLength, and
+    distances within elements are consistent with getCubicHermiteArcLengthToXi.
+    Supplied derivatives are used i.e. not rescaled to arc length.
+    """
+
+    def __init__(self, nx, nd):
+        """
+        :param nx: Coordinates of nodes along curves.
+        :param nd: Derivatives of nodes along curves.
+        """
+        self._elementsCount = len(nx) - 1
+        assert (self._elementsCount > 0) and (len(nd) == len(nx)), 'HermiteCurveArcLengthIndex.  Invalid number of points'
+        self._nx = np.array(nx, dtype=float)
+        self._nd = np.array(nd, dtype=float)
+        # lists for single queries, which are faster without numpy overheads
+        self._nxList = self._nx.tolist()
+        self._ndList = self._nd.tolist()
+        self._lengths = [ 0.0 ] + np.cumsum(getCubicHermiteArcLengthArray(self._nx[:-1], self._nd[:-1], self._nx[1:], self._nd[1:])).tolist()
+        self._lengthsArray = np.array(self._lengths)
+
+    def getElementsCount(self):
+        return self._elementsCount
+
+    def getLength(self):
+        """
+        :return: Total arc length of curves.
+        """
+        return self._lengths[-1]
+
+    def getCumulativeLengths(self):
+        """
+        :return: List of arc distances to each node, starting with 0.0.
+        """
+        return list(self._lengths)
+
+    def getElementXi(self, arcDistance):
+        """
+        Get element index and xi at a single arc distance. Same as getElementXiArray but
+        evaluated in python which is faster for one distance.
+        :param arcDistance: Arc distance, clamped to start and end of curves.
+        :return: element index, xi.
+        """
+        e = min(max(bisect.bisect_right(self._lengths, arcDistance) - 1, 0), self._elementsCount - 1)
+        return e, _getCubicHermiteArcLengthXi(self._nxList[e], self._ndList[e], self._nxList[e + 1], self._ndList[e + 1],
+            arcDistance - self._lengths[e], self._lengths[e + 1] - self._lengths[e])
+
+    def getElementXiArray(self, arcDistances):
+        """
+        Get element indexes and xi at many arc distances in one call. A distance exactly at
+        an interior node is located at the start of the next element.
+        :param arcDistances: Array of arc distances, clamped to start and end of curves.
+        :return: numpy arrays of element indexes and xi.
+        """
+        arcDistances = np.asarray(arcDistances, dtype=float)
+        e = np.clip(np.searchsorted(self._lengthsArray, arcDistances, side='right') - 1, 0, self._elementsCount - 1)
+        partDistances = arcDistances - self._lengthsArray[e]
+        elementLengths = self._lengthsArray[e + 1] - self._lengthsArray[e]
+        xi = np.where(partDistances <= 0.0, 0.0, 1.0)
+        solve = np.nonzero((partDistances > 0.0) & (partDistances < elementLengths))[0]
+        if len(solve) > 0:
+            xi[solve] = self._solveXi(e[solve], partDistances[solve], elementLengths[solve])
+        return e, xi
+
+    def _solveXi(self, e, partDistances, elementLengths):
+        """
+        Solve for xi at which getCubicHermiteArcLengthToXi equals partDistances in elements e,
+        all at once, by bracketed Newton iteration as for _getCubicHermiteArcLengthXi.
+        :param partDistances: Arc distances into elements, strictly within them.
+        :param elementLengths: Arc lengths of elements.
+        :return: Array of xi.
+        """
+        v1 = self._nx[e, np.newaxis]
+        d1 = self._nd[e, np.newaxis]
+        v2 = self._nx[e + 1, np.newaxis]
+        d2 = self._nd[e + 1, np.newaxis]
+        gaussXi = np.array(gaussXi3)
+        gaussWt = np.array(gaussWt3)
+        xiLower = np.zeros(len(e))
+        xiUpper = np.ones(len(e))
+        xi = partDistances/elementLengths
+        active = np.ones(len(e), dtype=bool)
+        for iters in range(100):
+            pointXi = xi[:, np.newaxis]*gaussXi
+            tangent = interpolateCubicHermiteDerivativeArray(v1, d1, v2, d2, pointXi)
+            dTangent = interpolateCubicHermiteSecondDerivativeArray(v1, d1, v2, d2, pointXi)
+            speed = np.sqrt(np.sum(tangent*tangent, axis=2))
+            dSpeed = np.divide(np.sum(tangent*dTangent, axis=2), speed, out=np.zeros(speed.shape), where=speed > 0.0)
+            residuals = partDistances - xi*np.dot(speed, gaussWt)
+            active &= np.abs(residuals) > 1.0E-12*elementLengths
+            if not active.any():
+                return xi
+            xiLower = np.where(active & (residuals > 0.0), xi, xiLower)
+            xiUpper = np.where(active & (residuals <= 0.0), xi, xiUpper)
+            dDistances = np.dot(speed, gaussWt) + xi*np.dot(dSpeed, gaussXi*gaussWt)
+            xiNewton = xi + np.divide(residuals, dDistances, out=np.zeros(xi.shape), where=dDistances > 0.0)
+            xiNewton = np.where((dDistances > 0.0) & (xiLower < xiNewton) & (xiNewton < xiUpper), xiNewton, 0.5*(xiLower + xiUpper))
+            xi = np.where(active, xiNewton, xi)
+        print('HermiteCurveArcLengthIndex Max iters reached:', iters, ', closeness', np.max(np.abs(residuals[active])))
+        return xi
+
+    def getPointsAtElementXi(self, e, xi):
+        """
+        :param e, xi: Arrays of element indexes and xi.
+        :return: numpy arrays of coordinates, derivatives at e, xi.
+        """
+        v1 = self._nx[e]
+        d1 = self._nd[e]
+        v2 = self._nx[e + 1]
+        d2 = self._nd[e + 1]
+        return interpolateCubicHermiteArray(v1, d1, v2, d2, xi), interpolateCubicHermiteDerivativeArray(v1, d1, v2, d2, xi)
+
+    def getPointsAtArcDistances(self, arcDistances):
+        """
+        Get points at many arc distances in one call.
+        :param arcDistances: Array of arc distances, clamped to start and end of curves.
+        :return: numpy arrays of coordinates, derivatives, element indexes, xi.
+        """
+        e, xi = self.getElementXiArray(arcDistances)
+        x, d = self.getPointsAtElementXi(e, xi)
+        return x, d, e, xi
+
+    def getPointAtArcDistance(self, arcDistance):
+        """
+        :param arcDistance: Arc distance, clamped to start and end of curves.
+        :return: coordinates, derivatives, element index, xi.
+        """
+        e, xi = self.getElementXi(arcDistance)
+        v1 = self._nxList[e]
+        d1 = self._ndList[e]
+        v2 = self._nxList[e + 1]
+        d2 = self._ndList[e + 1]
+        return interpolateCubicHermite(v1, d1, v2, d2, xi), interpolateCubicHermiteDerivative(v1, d1, v2, d2, xi), e, xi
+
 class DerivativeScalingMode(Enum):
     ARITHMETIC_MEAN = 1  # derivative is half of sum of arclengths on either side
     HARMONIC_MEAN   = 2  # derivative is reciprocal of arithmetic mean of reciprocals of arclengths = arc lengths weighted by proportion from other side
@@ -775,6 +1184,176 @@ def smoothCubicHermiteDerivativesLoop(nx, nd1,
     print('smoothCubicHermiteDerivativesLoop max iters reached:', iter + 1, ', max = ', round(closeness,2) , 'x tolerance')
     return md1
 
+def _setMagnitudeArray(v, mag):
+    '''
+    :return: Array of vectors v in last axis with magnitudes set to mag, as for vector.setMagnitude.
+    '''
+    return v*(mag/np.sqrt(np.sum(v*v, axis=-1)))[..., np.newaxis]
+
+def _getLinesArcLengths(nx, nd1, nx2, nd2):
+    '''
+    :return: Array (linesCount, elementsCount) of 3 point Gauss arc lengths of elements from
+    nx, nd1 to nx2, nd2, each of shape (linesCount, elementsCount, componentsCount).
+    '''
+    componentsCount = nx.shape[-1]
+    return getCubicHermiteArcLengthArray(nx.reshape(-1, componentsCount), nd1.reshape(-1, componentsCount),
+        nx2.reshape(-1, componentsCount), nd2.reshape(-1, componentsCount)).reshape(nx.shape[:-1])
+
+def _getLinesFlags(flags, linesCount):
+    '''
+    :return: Array of bool for each line from bool or sequence of bool per line.
+    '''
+    return np.broadcast_to(np.asarray(flags, dtype=bool), (linesCount, ))
+
+def smoothCubicHermiteDerivativesLineArray(nx, nd1,
+        fixAllDirections = False,
+        fixStartDerivative = False, fixEndDerivative = False,
+        fixStartDirection = False, fixEndDirection = False,
+        magnitudeScalingMode = DerivativeScalingMode.ARITHMETIC_MEAN):
+    """
+    Smooth derivatives along many lines with the same number of nodes at once, as for
+    smoothCubicHermiteDerivativesLine. Lines are updated together until all have converged;
+    each line stops updating once it has converged so it gets the same result as if
+    smoothed alone.
+    :param nx: Array of coordinates of nodes with shape (linesCount, nodesCount, componentsCount).
+    :param nd1: Array of derivatives of nodes with same shape as nx.
+    :param fixAllDirections: Set to True to only smooth magnitudes, otherwise both direction and magnitude are adjusted.
+    :param fixStartDerivative, fixEndDerivative: Set to True to fix derivative direction and magnitude at respective end.
+    :param fixStartDirection, fixEndDirection: Set to True to fix direction at respective end.
+    These and fixStart/EndDerivative may be a single bool for all lines or a sequence of bool per line.
+    :param magnitudeScalingMode: A value from enum DerivativeScalingMode specifying
+    expression used to get derivative magnitude from adjacent arc lengths.
+    :return: numpy array of modified nd1.
+    """
+    nx = np.asarray(nx, dtype=float)
+    md1 = np.array(nd1, dtype=float)
+    assert (nx.ndim == 3) and (md1.shape == nx.shape), 'smoothCubicHermiteDerivativesLineArray.  Mismatched shape of coordinates or derivatives'
+    linesCount, nodesCount = nx.shape[:2]
+    elementsCount = nodesCount - 1
+    assert elementsCount > 0, 'smoothCubicHermiteDerivativesLineArray.  Too few nodes/elements'
+    arithmeticMeanMagnitude = magnitudeScalingMode is DerivativeScalingMode.ARITHMETIC_MEAN
+    assert arithmeticMeanMagnitude or (magnitudeScalingMode is DerivativeScalingMode.HARMONIC_MEAN), \
+        'smoothCubicHermiteDerivativesLineArray. Invalid magnitude scaling mode'
+    fixStartDerivative = _getLinesFlags(fixStartDerivative, linesCount)
+    fixEndDerivative = _getLinesFlags(fixEndDerivative, linesCount)
+    fixStartDirection = _getLinesFlags(fixStartDirection, linesCount) | fixAllDirections
+    fixEndDirection = _getLinesFlags(fixEndDirection, linesCount) | fixAllDirections
+    startMagnitudeLines = ~fixStartDerivative & fixStartDirection
+    startDerivativeLines = ~fixStartDerivative & ~fixStartDirection
+    endMagnitudeLines = ~fixEndDerivative & fixEndDirection
+    endDerivativeLines = ~fixEndDerivative & ~fixEndDirection
+    # special case where equal derivatives at each end are sought
+    equalDerivativeLines = (elementsCount == 1) & ~(fixStartDerivative | fixEndDerivative)
+    if not fixAllDirections:
+        # directions from each middle point to points before and after it
+        dirm = nx[:, 1:-1] - nx[:, :-2]
+        dirp = nx[:, 2:] - nx[:, 1:-1]
+    tol = 1.0E-6
+    # indexes of lines not yet converged
+    lines = np.arange(linesCount)
+    for iter in range(100):
+        x = nx[lines]
+        lastmd1 = md1[lines]
+        d1 = lastmd1.copy()
+        arcLengths = _getLinesArcLengths(x[:, :-1], lastmd1[:, :-1], x[:, 1:], lastmd1[:, 1:])
+        # start
+        s = startMagnitudeLines[lines]
+        d1[s, 0] = _setMagnitudeArray(lastmd1[s, 0], 2.0*arcLengths[s, 0] - np.sqrt(np.sum(lastmd1[s, 1]*lastmd1[s, 1], axis=1)))
+        s = startDerivativeLines[lines]
+        d1[s, 0] = x[s, 0]*-2.0 + x[s, 1]*2.0 + lastmd1[s, 1]*-1.0
+        # middle
+        if nodesCount > 2:
+            arcLengthsm = arcLengths[:, :-1]
+            arcLengthsp = arcLengths[:, 1:]
+            if not fixAllDirections:
+                # mean weighted by fraction towards that end, equivalent to harmonic mean
+                arcLengthmp = arcLengthsm + arcLengthsp
+                wm = arcLengthsp/arcLengthmp
+                wp = arcLengthsm/arcLengthmp
+                d1[:, 1:-1] = wm[:, :, np.newaxis]*dirm[lines] + wp[:, :, np.newaxis]*dirp[lines]
+            if arithmeticMeanMagnitude:
+                mag = 0.5*(arcLengthsm + arcLengthsp)
+            else: # harmonicMeanMagnitude
+                mag = 2.0/(1.0/arcLengthsm + 1.0/arcLengthsp)
+            d1[:, 1:-1] = _setMagnitudeArray(d1[:, 1:-1], mag)
+        # end
+        s = endMagnitudeLines[lines]
+        d1[s, -1] = _setMagnitudeArray(lastmd1[s, -1], 2.0*arcLengths[s, -1] - np.sqrt(np.sum(lastmd1[s, -2]*lastmd1[s, -2], axis=1)))
+        s = endDerivativeLines[lines]
+        d1[s, -1] = x[s, -2]*-2.0 + lastmd1[s, -2]*-1.0 + x[s, -1]*2.0
+        s = equalDerivativeLines[lines]
+        if np.any(s):
+            mag = _getLinesArcLengths(x[s, :1], d1[s, :1], x[s, 1:], d1[s, 1:])
+            d1[s] = _setMagnitudeArray(d1[s], mag)
+        md1[lines] = d1
+        dtol = tol*np.sum(arcLengths, axis=1)/elementsCount
+        changes = np.max(np.abs(d1 - lastmd1), axis=(1, 2))
+        lines = lines[changes > dtol]
+        if len(lines) == 0:
+            return md1
+
+    closeness = np.max((changes/dtol)[changes > dtol])
+    print('smoothCubicHermiteDerivativesLineArray max iters reached:', iter + 1, ', lines', len(lines), ', max = ', round(closeness,2), 'x tolerance')
+    return md1
+
+def smoothCubicHermiteDerivativesLoopArray(nx, nd1,
+        fixAllDirections = False,
+        magnitudeScalingMode = DerivativeScalingMode.ARITHMETIC_MEAN):
+    """
+    Smooth derivatives around many loops with the same number of nodes at once, as for
+    smoothCubicHermiteDerivativesLoop. Each loop stops updating once it has converged.
+    :param nx: Array of coordinates of nodes with shape (loopsCount, nodesCount, componentsCount).
+    The first point of each loop follows the last.
+    :param nd1: Array of derivatives of nodes with same shape as nx.
+    :param fixAllDirections: Set to True to only smooth magnitudes, otherwise both direction and magnitude are adjusted.
+    :param magnitudeScalingMode: A value from enum DerivativeScalingMode specifying
+    expression used to get derivative magnitude from adjacent arc lengths.
+    :return: numpy array of modified nd1.
+    """
+    nx = np.asarray(nx, dtype=float)
+    md1 = np.array(nd1, dtype=float)
+    assert (nx.ndim == 3) and (md1.shape == nx.shape), 'smoothCubicHermiteDerivativesLoopArray.  Mismatched shape of coordinates or derivatives'
+    nodesCount = elementsCount = nx.shape[1]
+    assert elementsCount > 1, 'smoothCubicHermiteDerivativesLoopArray.  Too few nodes/elements'
+    arithmeticMeanMagnitude = magnitudeScalingMode is DerivativeScalingMode.ARITHMETIC_MEAN
+    assert arithmeticMeanMagnitude or (magnitudeScalingMode is DerivativeScalingMode.HARMONIC_MEAN), \
+        'smoothCubicHermiteDerivativesLoopArray. Invalid magnitude scaling mode'
+    nxp = np.roll(nx, -1, axis=1)
+    if not fixAllDirections:
+        # directions from each point to points before and after it
+        dirm = nx - np.roll(nx, 1, axis=1)
+        dirp = nxp - nx
+    tol = 1.0E-6
+    # indexes of loops not yet converged
+    loops = np.arange(nx.shape[0])
+    for iter in range(100):
+        lastmd1 = md1[loops]
+        arcLengths = _getLinesArcLengths(nx[loops], lastmd1, nxp[loops], np.roll(lastmd1, -1, axis=1))
+        arcLengthsm = np.roll(arcLengths, 1, axis=1)
+        if fixAllDirections:
+            d1 = lastmd1
+        else:
+            # mean weighted by fraction towards that end, equivalent to harmonic mean
+            arcLengthmp = arcLengthsm + arcLengths
+            wm = arcLengths/arcLengthmp
+            wp = arcLengthsm/arcLengthmp
+            d1 = wm[:, :, np.newaxis]*dirm[loops] + wp[:, :, np.newaxis]*dirp[loops]
+        if arithmeticMeanMagnitude:
+            mag = 0.5*(arcLengthsm + arcLengths)
+        else: # harmonicMeanMagnitude
+            mag = 2.0/(1.0/arcLengthsm + 1.0/arcLengths)
+        d1 = _setMagnitudeArray(d1, mag)
+        md1[loops] = d1
+        dtol = tol*np.sum(arcLengths, axis=1)/elementsCount
+        changes = np.max(np.abs(d1 - lastmd1), axis=(1, 2))
+        loops = loops[changes > dtol]
+        if len(loops) == 0:
+            return md1
+
+    closeness = np.max((changes/dtol)[changes > dtol])
+    print('smoothCubicHermiteDerivativesLoopArray max iters reached:', iter + 1, ', loops', len(loops), ', max = ', round(closeness,2), 'x tolerance')
+    return md1
+
 def getDoubleCubicHermiteCurvesMidDerivative(ax, ad1, mx, bx, bd1):
     """
     Get derivative at centre of two cubic curves.
@@ -2,14 +2,55 @@
 Class for refining a mesh from one region to another.
 '''
 from __future__ import division
-import math
+import concurrent.futures
+import numpy as np
 from opencmiss.utils.zinc.field import findOrCreateFieldCoordinates
-from opencmiss.zinc.element import Element, Elementbasis
+from opencmiss.zinc.element import Element, Elementbasis, Elementfieldtemplate
 from opencmiss.zinc.field import Field
 from opencmiss.zinc.node import Node
 from opencmiss.zinc.result import RESULT_OK as ZINC_OK
 from scaffoldmaker.annotation.annotationgroup import AnnotationGroup
-from scaffoldmaker.utils.octree import Octree
+from scaffoldmaker.utils.eft_utils import getEftTermScaling
+from scaffoldmaker.utils.profiling import profiled, profileStage
+from scaffoldmaker.utils.spatialgrid import SpatialGrid
+from scaffoldmaker.utils.tensorbasis import getCubicHermiteBasisArray, getLinearLagrangeBasisArray, \
+    getQuadraticLagrangeBasisArray, getTensorProductBasisArray
+from scaffoldmaker.utils.zinc_utils import createElementsFromArrays
+
+
+def getLatticeExterior(numbersInXi):
+    '''
+    :param numbersInXi: Numbers of refined elements in each xi direction.
+    :return: Array of bool, True for lattice points on the exterior of the element, xi1 varying fastest.
+    '''
+    xi3, xi2, xi1 = np.meshgrid(*[ np.arange(numbersInXi[c] + 1) for c in range(2, -1, -1) ], indexing='ij')
+    exterior = (xi1 == 0) | (xi1 == numbersInXi[0]) | (xi2 == 0) | (xi2 == numbersInXi[1]) | (xi3 == 0) | (xi3 == numbersInXi[2])
+    return exterior.reshape(-1)
+
+
+def evaluateLatticeBlock(block):
+    '''
+    Evaluate refined coordinates and coincident exterior points for a block of elements.
+    Only uses numpy so can be run in worker processes.
+    :param block: Tuple of dict basis key -> basis matrix, list of element items, tolerance.
+    Each item is a tuple of numbers in xi, basis key and element parameters or None and coordinates,
+    and bool True to find coincident points.
+    :return: List over items of array (pointsCount, 3) coordinates, and array (pairsCount, 2) of
+    indexes of exterior points closer than tolerance, lower first, or None if not found.
+    '''
+    basisMatrices, items, tolerance = block
+    results = []
+    for numbersInXi, basisKey, values, findCoincident in items:
+        x = values if (basisKey is None) else np.dot(basisMatrices[basisKey], values)
+        coincidentPairs = None
+        if findCoincident:
+            exteriorIndexes = np.nonzero(getLatticeExterior(numbersInXi))[0]
+            exteriorX = x[exteriorIndexes]
+            distances = np.linalg.norm(exteriorX[:, np.newaxis, :] - exteriorX[np.newaxis, :, :], axis=2)
+            laterIndexes, earlierIndexes = np.nonzero(np.tril(distances < tolerance, -1))
+            coincidentPairs = np.stack([ exteriorIndexes[earlierIndexes], exteriorIndexes[laterIndexes] ], axis=1)
+        results.append(( x, coincidentPairs ))
+    return results
 
 
 class MeshRefinement:
@@ -17,17 +58,31 @@ class MeshRefinement:
     Class for refining a mesh from one region to another.
     '''
 
-    def __init__(self, sourceRegion, targetRegion, sourceAnnotationGroups = []):
+    # 1-D basis array functions for source element basis function types evaluated in batches
+    _basisArrayFunctions = {
+        Elementbasis.FUNCTION_TYPE_LINEAR_LAGRANGE : getLinearLagrangeBasisArray,
+        Elementbasis.FUNCTION_TYPE_QUADRATIC_LAGRANGE : getQuadraticLagrangeBasisArray,
+        Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE : getCubicHermiteBasisArray
+    }
+
+    # number of processes used by default for refining batches of elements
+    defaultProcessesCount = 1
+
+    def __init__(self, sourceRegion, targetRegion, sourceAnnotationGroups = [], processesCount = None):
         '''
         Assumes targetRegion is empty.
         :param sourceAnnotationGroups: List of AnnotationGroup for source mesh in sourceRegion.
         A copy containing the refined elements is created by the MeshRefinement.
+        :param processesCount: Number of processes to evaluate refined coordinates of batches of
+        elements in, or None to use MeshRefinement.defaultProcessesCount. Results do not depend on it.
         '''
+        self._processesCount = MeshRefinement.defaultProcessesCount if (processesCount is None) else processesCount
+        self._batchRefinements = None
         self._sourceRegion = sourceRegion
         self._sourceFm = sourceRegion.getFieldmodule()
         self._sourceCache = self._sourceFm.createFieldcache()
         self._sourceCoordinates = findOrCreateFieldCoordinates(self._sourceFm)
-        # get range of source coordinates for octree range
+        # get range of source coordinates for node grid range
         self._sourceFm.beginChange()
         sourceNodes = self._sourceFm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
         minimumsField = self._sourceFm.createFieldNodesetMinimum(self._sourceCoordinates, sourceNodes)
@@ -46,7 +101,11 @@ class MeshRefinement:
         maximumsField = None
         self._sourceMesh = self._sourceFm.findMeshByDimension(3)
         self._sourceElementiterator = self._sourceMesh.createElementiterator()
-        self._octree = Octree(minimums, maximums)
+        self._nodeGrid = SpatialGrid(minimums, maximums)
+        # map from (basis function types, numbers in xi) to matrix of basis functions at lattice points
+        self._latticeBasisMatrices = {}
+        # map from numbers in xi to lattice point indexes of refined element nodes
+        self._latticeElementNodeIndexes = {}
 
         self._targetRegion = targetRegion
         self._targetFm = targetRegion.getFieldmodule()
@@ -86,86 +145,274 @@ class MeshRefinement:
     def getAnnotationGroups(self):
         return self._annotationGroups
 
+    def beginRefineBatch(self):
+        '''
+        Start recording calls to refineElementCubeStandard3d so refined coordinates of all
+        elements can be evaluated in processes in parallel by endRefineBatch. Nodes and elements
+        are created serially in the original call order so identifiers are unchanged.
+        Only use where callers do not need results of refineElementCubeStandard3d.
+        '''
+        assert self._batchRefinements is None, 'MeshRefinement.beginRefineBatch:  Already in batch'
+        self._batchRefinements = []
+
+    @profiled()
+    def endRefineBatch(self):
+        '''
+        Refine all elements recorded since beginRefineBatch. Source element parameters are
+        extracted serially, refined coordinates and coincident points are computed for blocks of
+        elements in a process pool if processesCount > 1, then nodes are merged and nodes and
+        elements are created serially in the order of recording.
+        '''
+        assert self._batchRefinements is not None, 'MeshRefinement.endRefineBatch:  Not in batch'
+        batchRefinements = self._batchRefinements
+        self._batchRefinements = None
+        basisMatrices = {}
+        items = []
+        for sourceElement, numbersInXi, addNewNodesToOctree, shareNodeIds, shareNodeCoordinates in batchRefinements:
+            basisKey, values = self._getLatticeSource(sourceElement, numbersInXi)
+            if basisKey is not None:
+                basisMatrices[basisKey] = self._getLatticeBasisMatrix(basisKey)
+            items.append(( numbersInXi, basisKey, values, addNewNodesToOctree ))
+        tolerance = self._nodeGrid._tolerance
+        with profileStage('MeshRefinement.evaluateLattice'):
+            if (self._processesCount > 1) and (len(items) > 1):
+                # several blocks per process to balance load
+                blockSize = -(-len(items)//(4*self._processesCount))
+                blocks = [ ( basisMatrices, items[b:b + blockSize], tolerance ) for b in range(0, len(items), blockSize) ]
+                with concurrent.futures.ProcessPoolExecutor(max_workers=self._processesCount) as executor:
+                    results = [ result for blockResults in executor.map(evaluateLatticeBlock, blocks) for result in blockResults ]
+            else:
+                results = evaluateLatticeBlock(( basisMatrices, items, tolerance ))
+        for batchRefinement, result in zip(batchRefinements, results):
+            sourceElement, numbersInXi, addNewNodesToOctree, shareNodeIds, shareNodeCoordinates = batchRefinement
+            x, coincidentPairs = result
+            self._createRefinedElements(sourceElement, numbersInXi, x, coincidentPairs,
+                addNewNodesToOctree, shareNodeIds, shareNodeCoordinates)
+
+    @profiled()
     def refineElementCubeStandard3d(self, sourceElement, numberInXi1, numberInXi2, numberInXi3,
             addNewNodesToOctree=True, shareNodeIds=None, shareNodeCoordinates=None):
         '''
         Refine cube sourceElement to numberInXi1*numberInXi2*numberInXi3 linear cube
         sub-elements, evenly spaced in xi.
         :param addNewNodesToOctree: If True (default) add newly created nodes to
-        octree to be found when refining later elements. Set to False when nodes are at the
+        node grid to be found when refining later elements. Set to False when nodes are at the
         same location and not intended to be shared.
         :param shareNodeIds, shareNodeCoordinates: Arrays of identifiers and coordinates of
         nodes which may be shared in refining this element. If supplied, these are preferentially
-        used ahead of points in the octree. Used to control merging with known nodes, e.g.
+        used ahead of points in the node grid. Used to control merging with known nodes, e.g.
         those returned by this function for elements which used addNewNodesToOctree=False.
         :return: Node identifiers, node coordinates used in refinement of sourceElement.
+        Both are None if called between beginRefineBatch and endRefineBatch.
         '''
         assert (shareNodeIds and shareNodeCoordinates) or (not shareNodeIds and not shareNodeCoordinates), \
             'refineElementCubeStandard3d.  Must supply both of shareNodeIds and shareNodeCoordinates, or neither'
-        shareNodesCount = len(shareNodeIds) if shareNodeIds else 0
+        numbersInXi = ( numberInXi1, numberInXi2, numberInXi3 )
+        if self._batchRefinements is not None:
+            self._batchRefinements.append(( sourceElement, numbersInXi, addNewNodesToOctree, shareNodeIds, shareNodeCoordinates ))
+            return None, None
+        basisKey, values = self._getLatticeSource(sourceElement, numbersInXi)
+        basisMatrices = { basisKey : self._getLatticeBasisMatrix(basisKey) } if (basisKey is not None) else {}
+        with profileStage('MeshRefinement.evaluateLattice'):
+            x, coincidentPairs = evaluateLatticeBlock(( basisMatrices, [ ( numbersInXi, basisKey, values, addNewNodesToOctree ) ],
+                self._nodeGrid._tolerance ))[0]
+        return self._createRefinedElements(sourceElement, numbersInXi, x, coincidentPairs,
+            addNewNodesToOctree, shareNodeIds, shareNodeCoordinates)
+
+    @profiled('MeshRefinement.createElements')
+    def _createRefinedElements(self, sourceElement, numbersInXi, x, coincidentPairs,
+            addNewNodesToOctree, shareNodeIds, shareNodeCoordinates):
+        '''
+        Merge or create nodes at refined coordinates and create refined elements of sourceElement.
+        :param numbersInXi: Numbers of refined elements in each xi direction.
+        :param x: Array of refined coordinates at lattice points, xi1 varying fastest.
+        :param coincidentPairs: Array of pairs of exterior lattice point indexes within tolerance,
+        or None if not adding new nodes to node grid.
+        See refineElementCubeStandard3d for other parameters and return value.
+        '''
+        numberInXi1, numberInXi2, numberInXi3 = numbersInXi
         meshGroups = []
         for sourceAndTargetMeshGroup in self._sourceAndTargetMeshGroups:
             if sourceAndTargetMeshGroup[0].containsElement(sourceElement):
                 meshGroups.append(sourceAndTargetMeshGroup[1])
-        # create nodes
-        nids = []
-        nx = []
-        xi = [ 0.0, 0.0, 0.0 ]
-        tol = self._octree._tolerance
-        for k in range(numberInXi3 + 1):
-            kExterior = (k == 0) or (k == numberInXi3)
-            xi[2] = k/numberInXi3
-            for j in range(numberInXi2 + 1):
-                jExterior = kExterior or (j == 0) or (j == numberInXi2)
-                xi[1] = j/numberInXi2
-                for i in range(numberInXi1 + 1):
-                    iExterior = jExterior or (i == 0) or (i == numberInXi1)
-                    xi[0] = i/numberInXi1
-                    self._sourceCache.setMeshLocation(sourceElement, xi)
-                    result, x = self._sourceCoordinates.evaluateReal(self._sourceCache, 3)
-                    # only exterior points are ever common:
-                    nodeId = None
-                    if iExterior:
-                        if shareNodeIds:
-                            for n in range(shareNodesCount):
-                                if (math.fabs(shareNodeCoordinates[n][0] - x[0]) <= tol) and \
-                                   (math.fabs(shareNodeCoordinates[n][1] - x[1]) <= tol) and \
-                                   (math.fabs(shareNodeCoordinates[n][2] - x[2]) <= tol):
-                                    nodeId = shareNodeIds[n]
-                                    break
-                        if nodeId is None:
-                            nodeId = self._octree.findObjectByCoordinates(x)
-                    if nodeId is None:
-                        node = self._targetNodes.createNode(self._nodeIdentifier, self._nodetemplate)
-                        self._targetCache.setNode(node)
-                        result = self._targetCoordinates.setNodeParameters(self._targetCache, -1, Node.VALUE_LABEL_VALUE, 1, x)
-                        nodeId = self._nodeIdentifier
-                        if iExterior and addNewNodesToOctree:
-                            self._octree.addObjectAtCoordinates(x, nodeId)
-                        self._nodeIdentifier += 1
-                    nids.append(nodeId)
-                    nx.append(x)
+        nx = x.tolist()
+        nids = self._mergeNodes(x, getLatticeExterior(numbersInXi), addNewNodesToOctree, shareNodeIds, shareNodeCoordinates, coincidentPairs)
         # create elements
-        for k in range(numberInXi3):
-            ok = (numberInXi2 + 1)*(numberInXi1 + 1)
-            for j in range(numberInXi2):
-                oj = (numberInXi1 + 1)
-                for i in range(numberInXi1):
-                    bni = k*ok + j*oj + i
-                    element = self._targetMesh.createElement(self._elementIdentifier, self._targetElementtemplate)
-                    enids = [ nids[bni     ], nids[bni      + 1], nids[bni      + oj], nids[bni      + oj + 1],
-                              nids[bni + ok], nids[bni + ok + 1], nids[bni + ok + oj], nids[bni + ok + oj + 1] ]
-                    result = element.setNodesByIdentifier(self._targetEft, enids)
-                    #if result != ZINC_OK:
-                    #print('Element', self._elementIdentifier, result, enids)
-                    self._elementIdentifier += 1
-
-                    for meshGroup in meshGroups:
-                        meshGroup.addElement(element)
+        elementsNodeIdentifiers = np.array(nids)[self._getLatticeElementNodeIndexes(numbersInXi)]
+        self._elementIdentifier = createElementsFromArrays(self._targetMesh, [ ( self._targetElementtemplate, [ self._targetEft ] ) ],
+            elementsNodeIdentifiers, self._elementIdentifier, meshGroupsMasks=[ ( meshGroup, True ) for meshGroup in meshGroups ])
         return nids, nx
 
+    def _getLatticeElementNodeIndexes(self, numbersInXi):
+        '''
+        :param numbersInXi: Numbers of refined elements in each xi direction.
+        :return: Array (elementsCount, 8) of indexes of lattice points of each refined element's
+        local nodes, elements in order of xi1 varying fastest, cached.
+        '''
+        elementNodeIndexes = self._latticeElementNodeIndexes.get(numbersInXi)
+        if elementNodeIndexes is None:
+            oj = numbersInXi[0] + 1
+            ok = (numbersInXi[1] + 1)*oj
+            k, j, i = np.meshgrid(*[ np.arange(numbersInXi[c]) for c in range(2, -1, -1) ], indexing='ij')
+            bni = (k*ok + j*oj + i).reshape(-1)
+            elementNodeIndexes = bni[:, np.newaxis] + np.array([ 0, 1, oj, oj + 1, ok, ok + 1, ok + oj, ok + oj + 1 ])
+            self._latticeElementNodeIndexes[numbersInXi] = elementNodeIndexes
+        return elementNodeIndexes
+
+    @profiled('MeshRefinement.getSourceElementParameters')
+    def _getLatticeSource(self, sourceElement, numbersInXi):
+        '''
+        Get what is needed to evaluate source coordinates at the regular lattice of xi points in
+        sourceElement. Standard node-based Lagrange/Hermite elements are evaluated later in one
+        matrix multiply of the basis functions at all points by the element parameters; other
+        elements are evaluated here point by point with the field cache.
+        :param numbersInXi: Numbers of refined elements in each xi direction.
+        :return: Basis matrix key, array (functionsCount, 3) of element parameters, or
+        None, array (pointsCount, 3) of coordinates at points with xi1 varying fastest.
+        '''
+        elementParameters = self._getElementCoordinatesParameters(sourceElement)
+        if elementParameters is None:
+            nx = []
+            xi = [ 0.0, 0.0, 0.0 ]
+            for k in range(numbersInXi[2] + 1):
+                xi[2] = k/numbersInXi[2]
+                for j in range(numbersInXi[1] + 1):
+                    xi[1] = j/numbersInXi[1]
+                    for i in range(numbersInXi[0] + 1):
+                        xi[0] = i/numbersInXi[0]
+                        self._sourceCache.setMeshLocation(sourceElement, xi)
+                        result, x = self._sourceCoordinates.evaluateReal(self._sourceCache, 3)
+                        nx.append(x)
+            return None, np.array(nx)
+        functionTypes, parameters = elementParameters
+        return ( functionTypes, numbersInXi ), parameters
+
+    def _getLatticeBasisMatrix(self, basisKey):
+        '''
+        :param basisKey: Tuple of basis function types in each xi direction, numbers in xi.
+        :return: Array (pointsCount, functionsCount) of basis functions at lattice points, cached.
+        '''
+        basisMatrix = self._latticeBasisMatrices.get(basisKey)
+        if basisMatrix is None:
+            functionTypes, numbersInXi = basisKey
+            xi3, xi2, xi1 = np.meshgrid(*[ np.arange(numbersInXi[c] + 1)/numbersInXi[c] for c in range(2, -1, -1) ], indexing='ij')
+            xi = np.stack([ xi1.reshape(-1), xi2.reshape(-1), xi3.reshape(-1) ], axis=1)
+            basisMatrix = getTensorProductBasisArray([ self._basisArrayFunctions[functionType] for functionType in functionTypes ], xi)
+            self._latticeBasisMatrices[basisKey] = basisMatrix
+        return basisMatrix
+
+    def _getElementCoordinatesParameters(self, sourceElement):
+        '''
+        Get the effective parameters multiplying each basis function of the source coordinates
+        field over sourceElement, i.e. sums of node parameters with scale factors applied.
+        :return: Tuple of basis function types in each xi direction, array (functionsCount, 3) of
+        parameters, or None if field is not interpolated by a single tensor product node-based template.
+        '''
+        eft = sourceElement.getElementfieldtemplate(self._sourceCoordinates, -1)
+        if not (eft.isValid() and (eft.getParameterMappingMode() == Elementfieldtemplate.PARAMETER_MAPPING_MODE_NODE)):
+            return None
+        basis = eft.getElementbasis()
+        functionTypes = tuple(basis.getFunctionType(xi) for xi in range(1, 4))
+        functionsCount = 1
+        for functionType in functionTypes:
+            if functionType not in self._basisArrayFunctions:
+                return None
+            basisShape = self._basisArrayFunctions[functionType]([ 0.0 ]).shape
+            functionsCount *= basisShape[1]*basisShape[2]
+        if eft.getNumberOfFunctions() != functionsCount:
+            return None
+        scaleFactorsCount = eft.getNumberOfLocalScaleFactors()
+        scaleFactors = []
+        if scaleFactorsCount > 0:
+            result, scaleFactors = sourceElement.getScaleFactors(eft, scaleFactorsCount)
+            if result != ZINC_OK:
+                return None
+            if scaleFactorsCount == 1:
+                scaleFactors = [ scaleFactors ]
+        nodes = [ sourceElement.getNode(eft, n) for n in range(1, eft.getNumberOfLocalNodes() + 1) ]
+        nodeParameters = {}
+        parameters = np.zeros((functionsCount, 3))
+        for f in range(1, functionsCount + 1):
+            for t in range(1, eft.getFunctionNumberOfTerms(f) + 1):
+                localNodeIndex = eft.getTermLocalNodeIndex(f, t)
+                valueLabel = eft.getTermNodeValueLabel(f, t)
+                version = eft.getTermNodeVersion(f, t)
+                key = ( localNodeIndex, valueLabel, version )
+                x = nodeParameters.get(key)
+                if x is None:
+                    self._sourceCache.setNode(nodes[localNodeIndex - 1])
+                    result, x = self._sourceCoordinates.getNodeParameters(self._sourceCache, -1, valueLabel, version, 3)
+                    if result != ZINC_OK:
+                        return None
+                    nodeParameters[key] = x
+                scale = 1.0
+                for scaleFactorIndex in getEftTermScaling(eft, f, t):
+                    scale *= scaleFactors[scaleFactorIndex - 1]
+                parameters[f - 1] += [ scale*c for c in x ]
+        return functionTypes, parameters
+
+    @profiled('MeshRefinement.mergeNodes')
+    def _mergeNodes(self, x, exterior, addNewNodesToGrid, shareNodeIds, shareNodeCoordinates, coincidentPairs):
+        '''
+        Get identifiers of nodes at coordinates x, creating new nodes in order where not merged
+        with existing nodes. Only exterior points are ever common, and are matched in batches first
+        with share nodes, then in the node grid, then with coincident new points in x.
+        :param x: Array (pointsCount, 3) of point coordinates.
+        :param exterior: Array of bool, True for points on the exterior of the element.
+        :param addNewNodesToGrid: If True add new exterior nodes to node grid, and merge
+        coincident new points in x.
+        :param shareNodeIds, shareNodeCoordinates: Optional lists of nodes to preferentially share.
+        :param coincidentPairs: Array (pairsCount, 2) of indexes of exterior points within tolerance,
+        lower index first. Only used if addNewNodesToGrid.
+        :return: List of node identifiers for x.
+        '''
+        pointsCount = x.shape[0]
+        nids = np.full(pointsCount, -1, dtype=np.int64)
+        exteriorIndexes = np.nonzero(exterior)[0]
+        tol = self._nodeGrid._tolerance
+        if shareNodeIds:
+            inBox = np.all(np.fabs(x[exteriorIndexes, np.newaxis, :] - np.array(shareNodeCoordinates)[np.newaxis, :, :]) <= tol, axis=2)
+            shared = np.any(inBox, axis=1)
+            nids[exteriorIndexes[shared]] = np.array(shareNodeIds)[np.argmax(inBox[shared], axis=1)]
+        searchIndexes = exteriorIndexes[nids[exteriorIndexes] < 0]
+        nids[searchIndexes] = self._nodeGrid.findObjectsByCoordinates(x[searchIndexes])
+        newIndexes = np.nonzero(nids < 0)[0]
+        # new exterior points coincident with an earlier new point e.g. on collapsed faces use its node.
+        # As when adding points to the node grid one at a time, each point only matches the nearest
+        # earlier point which created a node, so chains of points within tolerance are not merged
+        firstIndexes = newIndexes.copy()
+        if addNewNodesToGrid and (coincidentPairs.shape[0] > 0):
+            isNew = nids < 0
+            pairs = coincidentPairs[isNew[coincidentPairs[:, 0]] & isNew[coincidentPairs[:, 1]]]
+            pairs = pairs[np.lexsort((pairs[:, 0], pairs[:, 1]))]
+            distances = np.linalg.norm(x[pairs[:, 1]] - x[pairs[:, 0]], axis=1)
+            first = np.arange(pointsCount)
+            nearestDistances = {}
+            for earlier, later, distance in zip(pairs[:, 0].tolist(), pairs[:, 1].tolist(), distances.tolist()):
+                if (first[earlier] == earlier) and (distance < nearestDistances.get(later, tol)):
+                    first[later] = earlier
+                    nearestDistances[later] = distance
+            firstIndexes = first[newIndexes]
+        createIndexes = newIndexes[firstIndexes == newIndexes]
+        nids[createIndexes] = np.arange(self._nodeIdentifier, self._nodeIdentifier + createIndexes.shape[0])
+        nids[newIndexes] = nids[firstIndexes]
+        for index in createIndexes.tolist():
+            node = self._targetNodes.createNode(self._nodeIdentifier, self._nodetemplate)
+            self._targetCache.setNode(node)
+            result = self._targetCoordinates.setNodeParameters(self._targetCache, -1, Node.VALUE_LABEL_VALUE, 1, x[index].tolist())
+            self._nodeIdentifier += 1
+        if addNewNodesToGrid:
+            addIndexes = createIndexes[exterior[createIndexes]]
+            self._nodeGrid.addObjectsAtCoordinates(x[addIndexes], nids[addIndexes])
+        return nids.tolist()
+
     def refineAllElementsCubeStandard3d(self, numberInXi1, numberInXi2, numberInXi3):
+        batch = (self._processesCount > 1) and (self._batchRefinements is None)
+        if batch:
+            self.beginRefineBatch()
         element = self._sourceElementiterator.next()
         while element.isValid():
             self.refineElementCubeStandard3d(element, numberInXi1, numberInXi2, numberInXi3)
             element = self._sourceElementiterator.next()
+        if batch:
+            self.endRefineBatch()
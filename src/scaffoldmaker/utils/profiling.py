@@ -0,0 +1,196 @@
+'''
+Opt-in profiling of scaffold generation, recording nested stage timings and Zinc API call counts.
+Usage:
+    with GenerationProfiler() as profiler:
+        scaffoldPackage.generate(region)
+    print(profiler.toJSON())
+Stages are recorded by profileStage() context managers and functions decorated with
+profiled(), which cost almost nothing when no profiler is active.
+'''
+
+import contextlib
+import functools
+import importlib
+import json
+import time
+
+# the single active profiler, or None
+_activeProfiler = None
+
+# Zinc API methods whose calls are counted when counting is enabled: module, class, method names.
+# Each method must be defined in the class itself, not inherited
+_zincCountedMethods = [
+    ( 'opencmiss.zinc.element', 'Element', 'setNodesByIdentifier' ),
+    ( 'opencmiss.zinc.element', 'Element', 'setScaleFactors' ),
+    ( 'opencmiss.zinc.element', 'Mesh', 'createElement' ),
+    ( 'opencmiss.zinc.element', 'MeshGroup', 'addElement' ),
+    ( 'opencmiss.zinc.field', 'Field', 'evaluateReal' ),
+    ( 'opencmiss.zinc.field', 'FieldFiniteElement', 'getNodeParameters' ),
+    ( 'opencmiss.zinc.field', 'FieldFiniteElement', 'setNodeParameters' ),
+    ( 'opencmiss.zinc.fieldcache', 'Fieldcache', 'setMeshLocation' ),
+    ( 'opencmiss.zinc.fieldcache', 'Fieldcache', 'setNode' ),
+    ( 'opencmiss.zinc.node', 'Nodeset', 'createNode' ),
+    ( 'opencmiss.zinc.node', 'NodesetGroup', 'addNode' ) ]
+
+# Zinc API methods which are also timed as stages when counting is enabled
+_zincStageMethods = [
+    ( 'opencmiss.zinc.fieldmodule', 'Fieldmodule', 'defineAllFaces' ) ]
+
+
+class _Stage:
+    '''
+    Accumulated timing and Zinc call counts of all entries to a named stage under a parent stage.
+    '''
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.time = 0.0
+        self.zincCalls = {}
+        self.stages = {}
+
+    def getChild(self, name):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = _Stage(name)
+        return stage
+
+    def toDict(self):
+        dct = { 'name' : self.name, 'count' : self.count, 'time' : self.time }
+        if self.zincCalls:
+            dct['zincCalls'] = dict(sorted(self.zincCalls.items()))
+        if self.stages:
+            dct['stages'] = [ stage.toDict() for stage in self.stages.values() ]
+        return dct
+
+
+class GenerationProfiler:
+    '''
+    Context manager activating profiling of stages entered while it is active.
+    Repeated entries to a stage with the same parent are accumulated with a count.
+    Only one profiler can be active at a time, in the current process.
+    '''
+
+    def __init__(self, name='generation', countZincCalls=True):
+        '''
+        :param name: Name of root stage.
+        :param countZincCalls: If True, count calls to selected Zinc API methods in each stage,
+        by temporarily wrapping them while profiler is active.
+        '''
+        self._root = _Stage(name)
+        self._stack = [ self._root ]
+        self._countZincCalls = countZincCalls
+        self._originalMethods = []
+        self._startTime = None
+
+    def __enter__(self):
+        global _activeProfiler
+        assert _activeProfiler is None, 'GenerationProfiler:  Another profiler is already active'
+        if self._countZincCalls:
+            try:
+                self._wrapZincMethods()
+            except:
+                self._unwrapZincMethods()
+                raise
+        _activeProfiler = self
+        self._root.count += 1
+        self._startTime = time.perf_counter()
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        global _activeProfiler
+        self._root.time += time.perf_counter() - self._startTime
+        self._unwrapZincMethods()
+        _activeProfiler = None
+        return False
+
+    def _wrapZincMethods(self):
+        '''
+        Replace selected Zinc methods with wrappers counting calls in the current stage.
+        Fails if any method is not defined in its class, so it would never be counted.
+        '''
+        for methods, asStage in ( ( _zincCountedMethods, False ), ( _zincStageMethods, True ) ):
+            for moduleName, className, methodName in methods:
+                cls = getattr(importlib.import_module(moduleName), className)
+                method = cls.__dict__.get(methodName)
+                assert method is not None, 'GenerationProfiler:  Zinc method ' + className + '.' + methodName + ' not found'
+                self._originalMethods.append(( cls, methodName, method ))
+                setattr(cls, methodName, self._getZincMethodWrapper(method, className + '.' + methodName, asStage))
+
+    def _getZincMethodWrapper(self, method, callName, asStage):
+        profiler = self
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            zincCalls = profiler._stack[-1].zincCalls
+            zincCalls[callName] = zincCalls.get(callName, 0) + 1
+            if asStage:
+                with profiler.stage(callName):
+                    return method(*args, **kwargs)
+            return method(*args, **kwargs)
+        return wrapper
+
+    def _unwrapZincMethods(self):
+        for cls, methodName, method in reversed(self._originalMethods):
+            setattr(cls, methodName, method)
+        self._originalMethods = []
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        '''
+        Context manager timing a stage nested in the current stage.
+        '''
+        stage = self._stack[-1].getChild(name)
+        self._stack.append(stage)
+        startTime = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.time += time.perf_counter() - startTime
+            stage.count += 1
+            self._stack.pop()
+
+    def getReport(self):
+        '''
+        :return: Dict with nested name, count, time in seconds, zincCalls counts and list of stages.
+        '''
+        return self._root.toDict()
+
+    def toJSON(self):
+        return json.dumps(self.getReport(), indent=2)
+
+    def writeFile(self, fileName):
+        with open(fileName, 'w') as f:
+            f.write(self.toJSON())
+
+
+def getActiveProfiler():
+    '''
+    :return: Active GenerationProfiler or None.
+    '''
+    return _activeProfiler
+
+
+def profileStage(name):
+    '''
+    :return: Context manager timing stage name if a profiler is active, otherwise doing nothing.
+    '''
+    if _activeProfiler is None:
+        return contextlib.nullcontext()
+    return _activeProfiler.stage(name)
+
+
+def profiled(name=None):
+    '''
+    Decorator timing calls to function as a stage if a profiler is active.
+    :param name: Stage name, default is qualified name of function.
+    '''
+    def decorator(function):
+        stageName = name if name else function.__qualname__
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _activeProfiler is None:
+                return function(*args, **kwargs)
+            with _activeProfiler.stage(stageName):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
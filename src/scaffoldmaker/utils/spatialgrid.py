@@ -0,0 +1,152 @@
+'''
+Bucketed grid for searching for objects by coordinates, with batch queries using numpy.
+'''
+from __future__ import division
+import math
+import numpy as np
+
+class SpatialGrid:
+    '''
+    Bucketed grid for searching for integer objects e.g. node identifiers by coordinates.
+    Drop in replacement for Octree supporting batches of coordinates as numpy arrays.
+    Objects are held in arrays sorted by the key of the grid cell they are in, so queries
+    are binary searches of the few cells overlapping the tolerance box around each point.
+    '''
+
+    def __init__(self, minimums, maximums, tolerance = None):
+        '''
+        :param minimums: List of 3 minimum coordinate values. Caller to include any edge allowance.
+        :param maximums: List of 3 maximum coordinate values. Caller to include any edge allowance.
+        :param tolerance: If supplied, tolerance to use, or None to compute as 1.0E-6*diagonal.
+        '''
+        self._dimension = 3
+        assert len(minimums) == self._dimension, 'SpatialGrid minimums is invalid length'
+        assert len(maximums) == self._dimension, 'SpatialGrid maximums is invalid length'
+        if tolerance is None:
+            self._tolerance = 1.0E-6*math.sqrt(sum(((maximums[i] - minimums[i])*(maximums[i] - minimums[i])) for i in range(self._dimension)))
+        else:
+            self._tolerance = tolerance
+        self._minimums = np.array(minimums, dtype=float)
+        self._maximums = np.array(maximums, dtype=float)
+        # cells are several times the tolerance so each holds few objects, enlarged if keys would overflow
+        self._cellSize = max(4.0*self._tolerance, 1.0E-300)
+        while True:
+            self._cellsCounts = np.floor((self._maximums - self._minimums)/self._cellSize).astype(np.int64) + 1
+            if float(np.prod(self._cellsCounts.astype(float))) < 2.0**62:
+                break
+            self._cellSize *= 2.0
+        self._keyStrides = np.array([ 1, self._cellsCounts[0], self._cellsCounts[0]*self._cellsCounts[1] ], dtype=np.int64)
+        # objects sorted by cell key, in a large main set and a small set of recent additions
+        # which is periodically merged into it, to avoid copying all arrays on every addition
+        self._main = self._createSet()
+        self._recent = self._createSet()
+
+    def _createSet(self):
+        '''
+        :return: Empty [ keys, coordinates, objects ] arrays.
+        '''
+        return [ np.zeros(0, dtype=np.int64), np.zeros((0, self._dimension)), np.zeros(0, dtype=np.int64) ]
+
+    def _getCells(self, x):
+        '''
+        :param x: Array (N, 3) of coordinates.
+        :return: Integer array (N, 3) of cells containing x, clamped to grid.
+        '''
+        cells = np.floor((x - self._minimums)/self._cellSize).astype(np.int64)
+        return np.clip(cells, 0, self._cellsCounts - 1)
+
+    def _findInSet(self, objectSet, keys, x):
+        '''
+        Find nearest object within tolerance in one set of sorted objects.
+        :param objectSet: [ keys, coordinates, objects ] arrays sorted by keys.
+        :param keys: Integer array (N, M) of cell keys to search for each point.
+        :param x: Array (N, 3) of coordinates.
+        :return: Array (N) nearest distance or infinity if none found, integer array (N) nearest object.
+        '''
+        setKeys, setCoordinates, setObjects = objectSet
+        pointsCount = x.shape[0]
+        distance = np.full(pointsCount, np.inf)
+        nearestObjects = np.full(pointsCount, -1, dtype=np.int64)
+        if setKeys.shape[0] == 0:
+            return distance, nearestObjects
+        starts = np.searchsorted(setKeys, keys, side='left')
+        ends = np.searchsorted(setKeys, keys, side='right')
+        maximumCount = int(np.max(ends - starts))
+        if maximumCount == 0:
+            return distance, nearestObjects
+        candidates = starts[:, :, np.newaxis] + np.arange(maximumCount)
+        valid = candidates < ends[:, :, np.newaxis]
+        candidates = np.where(valid, candidates, 0).reshape((pointsCount, -1))
+        valid = valid.reshape((pointsCount, -1))
+        distances = np.linalg.norm(setCoordinates[candidates] - x[:, np.newaxis, :], axis=2)
+        distances = np.where(valid & (distances < self._tolerance), distances, np.inf)
+        nearest = np.argmin(distances, axis=1)
+        points = np.arange(pointsCount)
+        distance = distances[points, nearest]
+        nearestObjects = np.where(np.isfinite(distance), setObjects[candidates[points, nearest]], -1)
+        return distance, nearestObjects
+
+    def findObjectsByCoordinates(self, x):
+        '''
+        Find closest existing objects with |x - ox| < tolerance for many points.
+        :param x: Array (N, 3) of coordinates, or list convertible to it.
+        :return: Integer array (N) of nearest objects, or -1 where none found.
+        '''
+        x = np.asarray(x, dtype=float).reshape((-1, self._dimension))
+        pointsCount = x.shape[0]
+        # at most 2 cells per dimension overlap the box of +/- tolerance around each point
+        lowerCells = self._getCells(x - self._tolerance)
+        upperCells = self._getCells(x + self._tolerance)
+        keys = np.empty((pointsCount, 1 << self._dimension), dtype=np.int64)
+        for corner in range(1 << self._dimension):
+            cells = lowerCells.copy()
+            for c in range(self._dimension):
+                if corner & (1 << c):
+                    cells[:, c] = upperCells[:, c]
+            keys[:, corner] = np.dot(cells, self._keyStrides)
+        # search repeated cells only once
+        for corner in range(1, 1 << self._dimension):
+            repeated = np.any(keys[:, :corner] == keys[:, corner:corner + 1], axis=1)
+            keys[repeated, corner] = -1
+        mainDistance, mainObjects = self._findInSet(self._main, keys, x)
+        recentDistance, recentObjects = self._findInSet(self._recent, keys, x)
+        return np.where(recentDistance < mainDistance, recentObjects, mainObjects)
+
+    def findObjectByCoordinates(self, x):
+        '''
+        Find closest existing object with |x - ox| < tolerance.
+        :param x: 3 coordinates in a list.
+        :return: nearest object or None if not found.
+        '''
+        obj = self.findObjectsByCoordinates(x)[0]
+        return None if (obj < 0) else int(obj)
+
+    def addObjectsAtCoordinates(self, x, objs):
+        '''
+        Add objects at coordinates to grid.
+        Caller must have received -1 results for findObjectsByCoordinates() first,
+        and ensured the new points are not within tolerance of each other.
+        :param x: Array (N, 3) of coordinates, or list convertible to it.
+        :param objs: N non-negative integer objects to store with coordinates.
+        '''
+        x = np.asarray(x, dtype=float).reshape((-1, self._dimension))
+        objs = np.asarray(objs, dtype=np.int64).reshape(-1)
+        keys = np.dot(self._getCells(x), self._keyStrides)
+        recentKeys, recentCoordinates, recentObjects = self._recent
+        keys = np.concatenate((recentKeys, keys))
+        order = np.argsort(keys, kind='stable')
+        self._recent = [ keys[order], np.concatenate((recentCoordinates, x))[order], np.concatenate((recentObjects, objs))[order] ]
+        if self._recent[0].shape[0] > max(256, self._main[0].shape[0]//16):
+            keys = np.concatenate((self._main[0], self._recent[0]))
+            order = np.argsort(keys, kind='stable')
+            self._main = [ keys[order] ] + [ np.concatenate((self._main[i], self._recent[i]))[order] for i in range(1, 3) ]
+            self._recent = self._createSet()
+
+    def addObjectAtCoordinates(self, x, obj):
+        '''
+        Add object at coordinates to grid.
+        Caller must have received None result for findObjectByCoordinates() first!
+        :param x: 3 coordinates in a list.
+        :param obj: Non-negative integer object to store with coordinates.
+        '''
+        self.addObjectsAtCoordinates(x, [ obj ])
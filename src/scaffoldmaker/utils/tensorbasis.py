@@ -0,0 +1,68 @@
+'''
+Vectorised evaluation of element basis functions over many points with numpy.
+Tensor product bases are returned with functions in the order Zinc uses for
+standard node based element field templates.
+'''
+
+import numpy as np
+
+
+def getCubicHermiteBasisArray(xi):
+    '''
+    :param xi: Array of N xi values.
+    :return: Array (N, 2 nodes, 2 values) of cubic Hermite basis functions for x1, d1, x2, d2.
+    '''
+    xi = np.asarray(xi, dtype=float)
+    xi2 = xi*xi
+    xi3 = xi2*xi
+    basis = np.empty((xi.shape[0], 2, 2))
+    basis[:, 0, 0] = 1.0 - 3.0*xi2 + 2.0*xi3
+    basis[:, 0, 1] = xi - 2.0*xi2 + xi3
+    basis[:, 1, 0] = 3.0*xi2 - 2.0*xi3
+    basis[:, 1, 1] = -xi2 + xi3
+    return basis
+
+
+def getLinearLagrangeBasisArray(xi):
+    '''
+    :param xi: Array of N xi values.
+    :return: Array (N, 2 nodes, 1 value) of linear Lagrange basis functions.
+    '''
+    xi = np.asarray(xi, dtype=float)
+    basis = np.empty((xi.shape[0], 2, 1))
+    basis[:, 0, 0] = 1.0 - xi
+    basis[:, 1, 0] = xi
+    return basis
+
+
+def getQuadraticLagrangeBasisArray(xi):
+    '''
+    :param xi: Array of N xi values.
+    :return: Array (N, 3 nodes, 1 value) of quadratic Lagrange basis functions.
+    '''
+    xi = np.asarray(xi, dtype=float)
+    basis = np.empty((xi.shape[0], 3, 1))
+    basis[:, 0, 0] = (1.0 - xi)*(1.0 - 2.0*xi)
+    basis[:, 1, 0] = 4.0*xi*(1.0 - xi)
+    basis[:, 2, 0] = xi*(2.0*xi - 1.0)
+    return basis
+
+
+def getTensorProductBasisArray(basisArrayFunctions, xi):
+    '''
+    Get tensor product basis functions at many points.
+    :param basisArrayFunctions: List of 1-D basis array functions from this module, one per xi direction.
+    :param xi: Array (N, dimension) of element xi coordinates.
+    :return: Array (N, functionsCount) of basis function values. Functions are ordered by local node
+    varying fastest in xi1, then for each node by value/derivative varying fastest in xi1,
+    e.g. value, d/ds1, d/ds2, d2/ds1ds2, d/ds3 ... for tricubic Hermite.
+    '''
+    xi = np.asarray(xi, dtype=float)
+    pointsCount = xi.shape[0]
+    basis = np.ones((pointsCount, 1, 1))
+    for d, basisArrayFunction in enumerate(basisArrayFunctions):
+        basis1d = basisArrayFunction(xi[:, d])
+        # later directions vary slowest in both nodes and values
+        basis = np.einsum('pia,pjb->pijab', basis1d, basis).reshape(
+            (pointsCount, basis1d.shape[1]*basis.shape[1], basis1d.shape[2]*basis.shape[2]))
+    return basis.reshape((pointsCount, -1))
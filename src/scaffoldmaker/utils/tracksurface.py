@@ -5,9 +5,17 @@ Utility class for representing surfaces on which features can be located.
 from __future__ import division
 import copy
 import math
+import numpy as np
 from scaffoldmaker.utils import interpolation as interp
 from scaffoldmaker.utils import vector
 
+# coefficients of cubic Hermite basis functions x1, d1, x2, d2 (columns) in powers 0-3 of xi (rows)
+_cubicHermitePowerCoefficients = np.array([
+    [  1.0,  0.0,  0.0,  0.0 ],
+    [  0.0,  1.0,  0.0,  0.0 ],
+    [ -3.0, -2.0,  3.0, -1.0 ],
+    [  2.0,  1.0, -2.0,  1.0 ] ])
+
 
 class TrackSurface:
     '''
@@ -15,6 +23,7 @@ class TrackSurface:
     specified directions and distances for location surface features.
     Currently represented by a lattice of elementsCount1 x elementsCount2
     square elements with bicubic Hermite interpolation but zero cross derivatives.
+    Each element is evaluated from precomputed coefficients of powers of xi1 and xi2.
     '''
 
     def __init__(self, elementsCount1, elementsCount2, nx, nd1, nd2):
@@ -31,6 +40,24 @@ class TrackSurface:
         self.nx = nx
         self.nd1 = nd1
         self.nd2 = nd2
+        # geometry matrices for each component, indexed by Hermite basis in xi1, xi2, of the element
+        # starting at each node in order except the last row of nodes, including the last node of each
+        # row which gives the element wrapping into the start of the next row as for e1 == elementsCount1
+        nodesCount1 = elementsCount1 + 1
+        ax = np.array(nx, dtype=float)
+        ad1 = np.array(nd1, dtype=float)
+        ad2 = np.array(nd2, dtype=float)
+        startNodesCount = elementsCount2*nodesCount1
+        geometry = np.zeros(( startNodesCount - 1, 3, 4, 4 ))
+        for i in range(2):
+            for j in range(2):
+                nodes = slice(i + j*nodesCount1, i + j*nodesCount1 + startNodesCount - 1)
+                geometry[:, :, 2*i    , 2*j    ] = ax [nodes]
+                geometry[:, :, 2*i + 1, 2*j    ] = ad1[nodes]
+                geometry[:, :, 2*i    , 2*j + 1] = ad2[nodes]
+        # coefficients of powers of xi1 (rows) and xi2 (columns) for each element and component,
+        # indexed by start node e2*(elementsCount1 + 1) + e1
+        self._coefficients = _cubicHermitePowerCoefficients @ geometry @ _cubicHermitePowerCoefficients.T
 
     def createMirrorX(self):
         '''
@@ -79,6 +106,22 @@ class TrackSurface:
             xi2 = 1.0
         return TrackSurfacePosition(e1, e2, xi1, xi2)
 
+    def createPositionsProportionArray(self, proportions):
+        '''
+        Get positions on surface for many proportions across directions 1 and 2 at once,
+        as for createPositionProportion.
+        :param proportions: Array of N proportion1, proportion2.
+        :return: numpy array (N, 4) of e1, e2, xi1, xi2 for evaluateCoordinatesMany.
+        '''
+        proportions = np.asarray(proportions, dtype=float).reshape(-1, 2)
+        assert np.all((proportions >= 0.0) & (proportions <= 1.0)), 'createPositionsProportionArray:  Proportion out of range'
+        elementsCounts = np.array([ self.elementsCount1, self.elementsCount2 ])
+        pe = proportions*elementsCounts
+        inside = pe < elementsCounts
+        e = np.where(inside, np.floor(pe), elementsCounts - 1)
+        xi = np.where(inside, pe - e, 1.0)
+        return np.concatenate((e, xi), axis=1)
+
     def getProportion(self, position):
         '''
         From a position on this track surface, return proportions.
@@ -94,48 +137,39 @@ class TrackSurface:
         :return: If derivatives is False: coordinates [ x, y, z].
         If derivatives is True: coordinates, derivative1, derivative2.
         '''
-        n1 = position.e2*(self.elementsCount1 + 1) + position.e1
-        n2 = n1 + 1
-        n3 = n1 + self.elementsCount1 + 1
-        n4 = n3 + 1
-        ni = [ n1, n2, n3, n4 ]
-        f1x1, f1d1, f1x2, f1d2 = interp.getCubicHermiteBasis(position.xi1)
-        f2x1, f2d1, f2x2, f2d2 = interp.getCubicHermiteBasis(position.xi2)
-        fx  = [ f1x1*f2x1, f1x2*f2x1, f1x1*f2x2, f1x2*f2x2 ]
-        fd1 = [ f1d1*f2x1, f1d2*f2x1, f1d1*f2x2, f1d2*f2x2 ]
-        fd2 = [ f1x1*f2d1, f1x2*f2d1, f1x1*f2d2, f1x2*f2d2 ]
-        nx = self.nx
-        nd1 = self.nd1
-        nd2 = self.nd2
-        coordinates = []
-        for c in range(3):
-            x = 0.0
-            for ln in range(4):
-                gn = ni[ln]
-                x += fx[ln]*nx[gn][c] + fd1[ln]*nd1[gn][c] + fd2[ln]*nd2[gn][c]
-            coordinates.append(x)
+        coefficients = self._coefficients[position.e2*(self.elementsCount1 + 1) + position.e1]
+        xi1 = position.xi1
+        xi2 = position.xi2
         if not derivatives:
-            return coordinates
-        df1x1, df1d1, df1x2, df1d2 = interp.getCubicHermiteBasisDerivatives(position.xi1)
-        d1fx  = [ df1x1*f2x1, df1x2*f2x1, df1x1*f2x2, df1x2*f2x2 ]
-        d1fd1 = [ df1d1*f2x1, df1d2*f2x1, df1d1*f2x2, df1d2*f2x2 ]
-        d1fd2 = [ df1x1*f2d1, df1x2*f2d1, df1x1*f2d2, df1x2*f2d2 ]
-        df2x1, df2d1, df2x2, df2d2 = interp.getCubicHermiteBasisDerivatives(position.xi2)
-        d2fx  = [ f1x1*df2x1, f1x2*df2x1, f1x1*df2x2, f1x2*df2x2 ]
-        d2fd1 = [ f1d1*df2x1, f1d2*df2x1, f1d1*df2x2, f1d2*df2x2 ]
-        d2fd2 = [ f1x1*df2d1, f1x2*df2d1, f1x1*df2d2, f1x2*df2d2 ]
-        derivative1 = []
-        derivative2 = []
-        for c in range(3):
-            d1 = 0.0
-            d2 = 0.0
-            for ln in range(4):
-                gn = ni[ln]
-                d1 += d1fx[ln]*nx[gn][c] + d1fd1[ln]*nd1[gn][c] + d1fd2[ln]*nd2[gn][c]
-                d2 += d2fx[ln]*nx[gn][c] + d2fd1[ln]*nd1[gn][c] + d2fd2[ln]*nd2[gn][c]
-            derivative1.append(d1)
-            derivative2.append(d2)
-        return coordinates, derivative1, derivative2
+            return (np.array([ 1.0, xi1, xi1*xi1, xi1*xi1*xi1 ]) @ coefficients @ np.array([ 1.0, xi2, xi2*xi2, xi2*xi2*xi2 ])).tolist()
+        # rows are powers of xi1 and their derivatives; columns are powers of xi2 and their derivatives
+        xi1Powers = np.array([ [ 1.0, xi1, xi1*xi1, xi1*xi1*xi1 ], [ 0.0, 1.0, 2.0*xi1, 3.0*xi1*xi1 ] ])
+        xi2Powers = np.array([ [ 1.0, 0.0 ], [ xi2, 1.0 ], [ xi2*xi2, 2.0*xi2 ], [ xi2*xi2*xi2, 3.0*xi2*xi2 ] ])
+        values = xi1Powers @ coefficients @ xi2Powers
+        return values[:, 0, 0].tolist(), values[:, 1, 0].tolist(), values[:, 0, 1].tolist()
+
+    def evaluateCoordinatesMany(self, positions, derivatives = False):
+        '''
+        Evaluate coordinates on surface at many positions at once, and optionally
+        derivatives w.r.t. xi1 and xi2.
+        :param positions: Array (N, 4) of valid e1, e2, xi1, xi2, e.g. from createPositionsProportionArray.
+        :return: If derivatives is False: numpy array (N, 3) of coordinates.
+        If derivatives is True: numpy arrays of coordinates, derivative1, derivative2.
+        '''
+        positions = np.asarray(positions, dtype=float).reshape(-1, 4)
+        coefficients = self._coefficients[positions[:, 1].astype(int)*(self.elementsCount1 + 1) + positions[:, 0].astype(int)]
+        xi1 = positions[:, 2]
+        xi2 = positions[:, 3]
+        zero = np.zeros(len(positions))
+        one = np.ones(len(positions))
+        xi1Powers = np.stack([ np.stack([ one, xi1, xi1*xi1, xi1*xi1*xi1 ], axis=1),
+            np.stack([ zero, one, 2.0*xi1, 3.0*xi1*xi1 ], axis=1) ], axis=1)
+        xi2Powers = np.stack([ np.stack([ one, xi2, xi2*xi2, xi2*xi2*xi2 ], axis=1),
+            np.stack([ zero, one, 2.0*xi2, 3.0*xi2*xi2 ], axis=1) ], axis=2)
+        values = xi1Powers[:, np.newaxis] @ coefficients @ xi2Powers[:, np.newaxis]
+        if not derivatives:
+            return values[:, :, 0, 0]
+        return values[:, :, 0, 0], values[:, :, 1, 0], values[:, :, 0, 1]
 
     def createHermiteCurvePoints(self, aProportion1, aProportion2, bProportion1, bProportion2, elementsCount,
             derivativeStart = None, derivativeEnd = None):
@@ -193,26 +227,21 @@ class TrackSurface:
             [ [ dp1Start, dp2Start ], [ dp1End, dp2End ] ], elementsCount, derivativeMagnitudeStart, derivativeMagnitudeEnd)[0:2]
         #print(' proportions', proportions)
         #print('dproportions', dproportions)
-        nx  = []
-        nd1 = []
-        nd2 = []
-        nd3 = []
-        for n in range(0, elementsCount + 1):
-            position = self.createPositionProportion(proportions[n][0], proportions[n][1])
-            x, sd1, sd2 = self.evaluateCoordinates(position, derivatives = True)
-            f1 = dproportions[n][0]*self.elementsCount1
-            f2 = dproportions[n][1]*self.elementsCount2
-            d1 = [ (f1*sd1[c] + f2*sd2[c]) for c in range(3) ]
-            d3 = vector.crossproduct3(sd1, sd2)
-            # handle zero magnitude of d3
-            mag = math.sqrt(sum(d3[c]*d3[c] for c in range(3)))
-            if mag > 0.0:
-                d3 = [ (d3[c]/mag) for c in range(3) ]
-            d2 = vector.crossproduct3(d3, d1)
-            nx .append(x)
-            nd2.append(d2)
-            nd1.append(d1)
-            nd3.append(d3)
+        ax, sd1, sd2 = self.evaluateCoordinatesMany(self.createPositionsProportionArray(proportions), derivatives = True)
+        nx = ax.tolist()
+        dp = np.array(dproportions)
+        f1 = dp[:, 0:1]*self.elementsCount1
+        f2 = dp[:, 1:2]*self.elementsCount2
+        d1 = f1*sd1 + f2*sd2
+        d3 = np.cross(sd1, sd2)
+        # handle zero magnitude of d3
+        mag = np.sqrt(np.sum(d3*d3, axis=1))
+        nonZero = mag > 0.0
+        d3[nonZero] /= mag[nonZero, np.newaxis]
+        d2 = np.cross(d3, d1)
+        nd1 = d1.tolist()
+        nd2 = d2.tolist()
+        nd3 = d3.tolist()
         #print('createHermiteCurvePoints end \n nx', nx,'\nnd1',nd1,'\nnd2',nd2,'\nnd3',nd3)
         return nx, nd1, nd2, nd3, proportions
 
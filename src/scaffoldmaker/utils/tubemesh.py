@@ -4,6 +4,7 @@ using a segment profile.
 '''
 from __future__ import division
 import math
+import numpy as np
 from opencmiss.utils.zinc.field import findOrCreateFieldCoordinates, findOrCreateFieldTextureCoordinates
 from opencmiss.zinc.element import Element, Elementbasis
 from opencmiss.zinc.field import Field
@@ -14,7 +15,10 @@ from scaffoldmaker.utils.geometry import createCirclePoints
 from scaffoldmaker.utils import interpolation as interp
 from scaffoldmaker.utils import matrix
 from scaffoldmaker.utils import vector
+from scaffoldmaker.utils.profiling import profiled
+from scaffoldmaker.utils.zinc_utils import createElementsFromArrays, createNodesFromArrays
 
+@profiled()
 def warpSegmentPoints(xList, d1List, d2List, segmentAxis, segmentLength,
                       sx, sd1, sd2, elementsCountAround, elementsCountAlongSegment,
                       nSegment, faceMidPointZ):
@@ -38,7 +42,6 @@ def warpSegmentPoints(xList, d1List, d2List, segmentAxis, segmentLength,
     xWarpedList = []
     d1WarpedList = []
     d2WarpedList = []
-    smoothd2WarpedList = []
     d3WarpedUnitList = []
 
     for nAlongSegment in range(elementsCountAlongSegment + 1):
@@ -118,22 +121,12 @@ def warpSegmentPoints(xList, d1List, d2List, segmentAxis, segmentLength,
             d1WarpedList.append(d1Rot2)
             d2WarpedList.append(d2Rot2)
 
-    # Smooth d2 for segment
-    smoothd2Raw = []
-    for n1 in range(elementsCountAround):
-        nx = []
-        nd2 = []
-        for n2 in range(elementsCountAlongSegment + 1):
-            n = n2*elementsCountAround + n1
-            nx.append(xWarpedList[n])
-            nd2.append(d2WarpedList[n])
-        smoothd2 = interp.smoothCubicHermiteDerivativesLine(nx, nd2, fixStartDerivative = True, fixEndDerivative = True)
-        smoothd2Raw.append(smoothd2)
-
-    # Re-arrange smoothd2
-    for n2 in range(elementsCountAlongSegment + 1):
-        for n1 in range(elementsCountAround):
-            smoothd2WarpedList.append(smoothd2Raw[n1][n2])
+    # Smooth d2 for segment along all lines around at once, arrays indexed by n1, n2
+    shape = ( elementsCountAlongSegment + 1, elementsCountAround, 3 )
+    nx = np.array(xWarpedList).reshape(shape).transpose(1, 0, 2)
+    nd2 = np.array(d2WarpedList).reshape(shape).transpose(1, 0, 2)
+    smoothd2 = interp.smoothCubicHermiteDerivativesLineArray(nx, nd2, fixStartDerivative = True, fixEndDerivative = True)
+    smoothd2WarpedList = smoothd2.transpose(1, 0, 2).reshape(-1, 3).tolist()
 
     # Calculate unit d3
     for n in range(len(xWarpedList)):
@@ -143,6 +136,7 @@ def warpSegmentPoints(xList, d1List, d2List, segmentAxis, segmentLength,
     return xWarpedList, d1WarpedList, smoothd2WarpedList, d3WarpedUnitList
 
 
+@profiled()
 def getCoordinatesFromInner(xInner, d1Inner, d2Inner, d3Inner,
     wallThicknessList, elementsCountAround,
     elementsCountAlong, elementsCountThroughWall, transitElementList):
@@ -234,6 +228,7 @@ def getCoordinatesFromInner(xInner, d1Inner, d2Inner, d3Inner,
 
     return xList, d1List, d2List, d3List, curvatureList
 
+@profiled()
 def createFlatAndTextureCoordinates(xiList, lengthAroundList,
     totalLengthAlong, wallThickness, elementsCountAround,
     elementsCountAlong, elementsCountThroughWall, transitElementList):
@@ -329,6 +324,79 @@ def createFlatAndTextureCoordinates(xiList, lengthAroundList,
 
     return xFlatList, d1FlatList, d2FlatList, xTextureList, d1TextureList, d2TextureList
 
+def createNodesWithFlatAndTextureCoordinates(nodes, coordinates, flatCoordinates, textureCoordinates,
+    x, d1, d2, d3, xFlat, d1Flat, d2Flat, xTexture, d1Texture, d2Texture, flatIndexes, flatVersion2Offsets,
+    firstNodeIdentifier, useCubicHermiteThroughWall, useCrossDerivatives):
+    """
+    Create nodes with consecutive identifiers defining coordinates, flat coordinates and texture
+    coordinates, where nodes on the opening of the flat tube have 2 versions of flat and texture
+    coordinates. Cross derivatives are defined but zero.
+    :param x, d1, d2, d3: coordinates and derivatives of coordinates field for each node.
+    :param xFlat, d1Flat, d2Flat: coordinates and derivatives of flat coordinates field.
+    :param xTexture, d1Texture, d2Texture: coordinates and derivatives of texture coordinates field.
+    :param flatIndexes: Array of index of version 1 flat and texture coordinates for each node.
+    :param flatVersion2Offsets: Array of offset from flatIndexes to version 2 flat and texture
+    coordinates for each node, or 0 if node has only 1 version.
+    :param firstNodeIdentifier: Identifier of first node.
+    :param useCubicHermiteThroughWall: use linear when false
+    :param useCrossDerivatives: use cross derivatives when true
+    :return: Next node identifier
+    """
+    # node templates for all fields; nodes on the tube opening have 2 versions of flat and texture coordinates
+    nodetemplates = []
+    for versionsCount in (1, 2):
+        nodetemplate = nodes.createNodetemplate()
+        nodetemplate.defineField(coordinates)
+        nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_VALUE, 1)
+        nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS1, 1)
+        nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS2, 1)
+        if useCrossDerivatives:
+            nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D2_DS1DS2, 1)
+        if useCubicHermiteThroughWall:
+            nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS3, 1)
+            if useCrossDerivatives:
+                nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D2_DS1DS3, 1)
+                nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D2_DS2DS3, 1)
+                nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D3_DS1DS2DS3, 1)
+        for field in (flatCoordinates, textureCoordinates):
+            nodetemplate.defineField(field)
+            nodetemplate.setValueNumberOfVersions(field, -1, Node.VALUE_LABEL_VALUE, versionsCount)
+            nodetemplate.setValueNumberOfVersions(field, -1, Node.VALUE_LABEL_D_DS1, versionsCount)
+            nodetemplate.setValueNumberOfVersions(field, -1, Node.VALUE_LABEL_D_DS2, versionsCount)
+            if useCrossDerivatives:
+                nodetemplate.setValueNumberOfVersions(field, -1, Node.VALUE_LABEL_D2_DS1DS2, versionsCount)
+        nodetemplates.append(nodetemplate)
+
+    nodesCount = len(x)
+    coordinatesValueLabels = [ Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2 ]
+    coordinatesValues = [ x, d1, d2 ]
+    if useCubicHermiteThroughWall:
+        coordinatesValueLabels.append(Node.VALUE_LABEL_D_DS3)
+        coordinatesValues.append(d3)
+    coordinatesValues = np.stack(coordinatesValues, axis=1)
+    flatValues = np.stack([ xFlat, d1Flat, d2Flat ], axis=1)
+    textureValues = np.stack([ xTexture, d1Texture, d2Texture ], axis=1)
+    flatValueLabels = [ Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2 ]
+    for versionsCount, nodeIndexes in ((1, np.nonzero(flatVersion2Offsets == 0)[0]), (2, np.nonzero(flatVersion2Offsets)[0])):
+        if len(nodeIndexes) == 0:
+            continue
+        indexes = flatIndexes[nodeIndexes]
+        valueLabels = flatValueLabels
+        flatNodeValues = flatValues[indexes]
+        textureNodeValues = textureValues[indexes]
+        if versionsCount == 2:
+            valueLabels = flatValueLabels + [ (valueLabel, 2) for valueLabel in flatValueLabels ]
+            indexes2 = indexes + flatVersion2Offsets[nodeIndexes]
+            flatNodeValues = np.concatenate((flatNodeValues, flatValues[indexes2]), axis=1)
+            textureNodeValues = np.concatenate((textureNodeValues, textureValues[indexes2]), axis=1)
+        createNodesFromArrays(nodes, nodetemplates[versionsCount - 1], [
+            ( coordinates, coordinatesValueLabels, coordinatesValues[nodeIndexes] ),
+            ( flatCoordinates, valueLabels, flatNodeValues ),
+            ( textureCoordinates, valueLabels, textureNodeValues ) ], firstNodeIdentifier + nodeIndexes)
+    return firstNodeIdentifier + nodesCount
+
+
+@profiled()
 def createNodesAndElements(region,
     x, d1, d2, d3,
     xFlat, d1Flat, d2Flat,
@@ -359,28 +427,14 @@ def createNodesAndElements(region,
 
     nodeIdentifier = firstNodeIdentifier
     elementIdentifier = firstElementIdentifier
-    zero = [ 0.0, 0.0, 0.0 ]
 
     fm = region.getFieldmodule()
     fm.beginChange()
-    cache = fm.createFieldcache()
 
-    # Coordinates field
     coordinates = findOrCreateFieldCoordinates(fm)
+    flatCoordinates = findOrCreateFieldCoordinates(fm, name="flat coordinates")
+    textureCoordinates = findOrCreateFieldTextureCoordinates(fm)
     nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
-    nodetemplate = nodes.createNodetemplate()
-    nodetemplate.defineField(coordinates)
-    nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_VALUE, 1)
-    nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS1, 1)
-    nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS2, 1)
-    if useCrossDerivatives:
-        nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D2_DS1DS2, 1)
-    if useCubicHermiteThroughWall:
-        nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS3, 1)
-        if useCrossDerivatives:
-            nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D2_DS1DS3, 1)
-            nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D2_DS2DS3, 1)
-            nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D3_DS1DS2DS3, 1)
 
     mesh = fm.findMeshByDimension(3)
 
@@ -390,138 +444,49 @@ def createNodesAndElements(region,
         eftfactory = eftfactory_bicubichermitelinear(mesh, useCrossDerivatives)
     eft = eftfactory.createEftBasic()
 
-    elementtemplate = mesh.createElementtemplate()
-    elementtemplate.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-    result = elementtemplate.defineField(coordinates, -1, eft)
-
-    # Flat coordinates field
+    # Flat and texture coordinates fields
     bicubichermitelinear = eftfactory_bicubichermitelinear(mesh, useCrossDerivatives)
     eftTexture1 = bicubichermitelinear.createEftBasic()
     eftTexture2 = bicubichermitelinear.createEftOpenTube()
 
-    flatCoordinates = findOrCreateFieldCoordinates(fm, name="flat coordinates")
-    flatNodetemplate1 = nodes.createNodetemplate()
-    flatNodetemplate1.defineField(flatCoordinates)
-    flatNodetemplate1.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_VALUE, 1)
-    flatNodetemplate1.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_D_DS1, 1)
-    flatNodetemplate1.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_D_DS2, 1)
-    if useCrossDerivatives:
-        flatNodetemplate1.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_D2_DS1DS2, 1)
-
-    flatNodetemplate2 = nodes.createNodetemplate()
-    flatNodetemplate2.defineField(flatCoordinates)
-    flatNodetemplate2.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_VALUE, 2)
-    flatNodetemplate2.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_D_DS1, 2)
-    flatNodetemplate2.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_D_DS2, 2)
-    if useCrossDerivatives:
-        flatNodetemplate2.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_D2_DS1DS2, 2)
-
-    flatElementtemplate1 = mesh.createElementtemplate()
-    flatElementtemplate1.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-    flatElementtemplate1.defineField(flatCoordinates, -1, eftTexture1)
-
-    flatElementtemplate2 = mesh.createElementtemplate()
-    flatElementtemplate2.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-    flatElementtemplate2.defineField(flatCoordinates, -1, eftTexture2)
-
-    # Texture coordinates field
-    textureCoordinates = findOrCreateFieldTextureCoordinates(fm)
-    textureNodetemplate1 = nodes.createNodetemplate()
-    textureNodetemplate1.defineField(textureCoordinates)
-    textureNodetemplate1.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_VALUE, 1)
-    textureNodetemplate1.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_D_DS1, 1)
-    textureNodetemplate1.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_D_DS2, 1)
-    if useCrossDerivatives:
-        textureNodetemplate1.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_D2_DS1DS2, 1)
-
-    textureNodetemplate2 = nodes.createNodetemplate()
-    textureNodetemplate2.defineField(textureCoordinates)
-    textureNodetemplate2.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_VALUE, 2)
-    textureNodetemplate2.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_D_DS1, 2)
-    textureNodetemplate2.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_D_DS2, 2)
-    if useCrossDerivatives:
-        textureNodetemplate2.setValueNumberOfVersions(textureCoordinates, -1, Node.VALUE_LABEL_D2_DS1DS2, 2)
-
-    elementtemplate1 = mesh.createElementtemplate()
-    elementtemplate1.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-    elementtemplate1.defineField(textureCoordinates, -1, eftTexture1)
-
-    elementtemplate2 = mesh.createElementtemplate()
-    elementtemplate2.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-    elementtemplate2.defineField(textureCoordinates, -1, eftTexture2)
-
-    # Create nodes
-    # Coordinates field
-    for n in range(len(x)):
-        node = nodes.createNode(nodeIdentifier, nodetemplate)
-        cache.setNode(node)
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, x[n])
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1[n])
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, d2[n])
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS3, 1, d3[n])
-        if useCrossDerivatives:
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS3, 1, zero)
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS2DS3, 1, zero)
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D3_DS1DS2DS3, 1, zero)
-        # print('NodeIdentifier = ', nodeIdentifier, xList[n])
-        nodeIdentifier = nodeIdentifier + 1
-
-    # Flat and texture coordinates fields
-    nodeIdentifier = firstNodeIdentifier
-    for n2 in range(elementsCountAlong + 1):
-        for n3 in range(elementsCountThroughWall + 1):
-            for n1 in range(elementsCountAround):
-                i = n2*(elementsCountAround + 1)*(elementsCountThroughWall + 1) + (elementsCountAround + 1)*n3 + n1
-                node = nodes.findNodeByIdentifier(nodeIdentifier)
-                node.merge(flatNodetemplate2 if n1 == 0 else flatNodetemplate1)
-                node.merge(textureNodetemplate2 if n1 == 0 else textureNodetemplate1)
-                cache.setNode(node)
-                # print('NodeIdentifier', nodeIdentifier, 'version 1, xList Index =', i+1)
-                flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, xFlat[i])
-                flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1Flat[i])
-                flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, d2Flat[i])
-                textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, xTexture[i])
-                textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1Texture[i])
-                textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, d2Texture[i])
-                if useCrossDerivatives:
-                    flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
-                    textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
-                if n1 == 0:
-                    # print('NodeIdentifier', nodeIdentifier, 'version 2, xList Index =', i+elementsCountAround+1)
-                    flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 2, xFlat[i+elementsCountAround])
-                    flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 2, d1Flat[i+elementsCountAround])
-                    flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 2, d2Flat[i+elementsCountAround])
-                    textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 2, xTexture[i+elementsCountAround])
-                    textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 2, d1Texture[i+elementsCountAround])
-                    textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 2, d2Texture[i+elementsCountAround])
-                    if useCrossDerivatives:
-                        flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 2, zero)
-                        textureCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 2, zero)
-                nodeIdentifier = nodeIdentifier + 1
+    # element templates for all fields on regular elements and those on the opening
+    elementtemplates = []
+    for eftTexture in (eftTexture1, eftTexture2):
+        elementtemplate = mesh.createElementtemplate()
+        elementtemplate.setElementShapeType(Element.SHAPE_TYPE_CUBE)
+        elementtemplate.defineField(coordinates, -1, eft)
+        elementtemplate.defineField(flatCoordinates, -1, eftTexture)
+        elementtemplate.defineField(textureCoordinates, -1, eftTexture)
+        elementtemplates.append(( elementtemplate, [ eft, eftTexture ] ))
+
+    # Create nodes with 2 versions of flat and texture coordinates on the first node around,
+    # with the second taken from the end of each row around
+    nodesCount = len(x)
+    n1 = np.arange(nodesCount) % elementsCountAround
+    flatIndexes = (np.arange(nodesCount) // elementsCountAround)*(elementsCountAround + 1) + n1
+    flatVersion2Offsets = np.where(n1 == 0, elementsCountAround, 0)
+    nodeIdentifier = createNodesWithFlatAndTextureCoordinates(nodes, coordinates, flatCoordinates, textureCoordinates,
+        x, d1, d2, d3, xFlat, d1Flat, d2Flat, xTexture, d1Texture, d2Texture, flatIndexes, flatVersion2Offsets,
+        firstNodeIdentifier, useCubicHermiteThroughWall, useCrossDerivatives)
 
     # create elements
     now = elementsCountAround*(elementsCountThroughWall+1)
-    for e2 in range(elementsCountAlong):
-        for e3 in range(elementsCountThroughWall):
-            for e1 in range(elementsCountAround):
-                bni11 = e2*now + e3*elementsCountAround + e1 + 1
-                bni12 = e2*now + e3*elementsCountAround + (e1 + 1) % elementsCountAround + 1
-                bni21 = e2*now + (e3 + 1)*elementsCountAround + e1 + 1
-                bni22 = e2*now + (e3 + 1)*elementsCountAround + (e1 + 1) % elementsCountAround + 1
-                nodeIdentifiers = [ bni11, bni12, bni11 + now, bni12 + now, bni21, bni22, bni21 + now, bni22 + now ]
-                onOpening = e1 > elementsCountAround - 2
-                element = mesh.createElement(elementIdentifier, elementtemplate)
-                element.setNodesByIdentifier(eft, nodeIdentifiers)
-                element.merge(flatElementtemplate2 if onOpening else flatElementtemplate1)
-                element.merge(elementtemplate2 if onOpening else elementtemplate1)
-                element.setNodesByIdentifier(eftTexture2 if onOpening else eftTexture1, nodeIdentifiers)
-                elementIdentifier = elementIdentifier + 1
-                if annotationGroups:
-                    for annotationGroup in annotationGroups:
-                        if annotationArray[e1] == annotationGroup._name:
-                            meshGroup = annotationGroup.getMeshGroup(mesh)
-                            meshGroup.addElement(element)
+    e2, e3, e1 = np.meshgrid(np.arange(elementsCountAlong), np.arange(elementsCountThroughWall),
+        np.arange(elementsCountAround), indexing='ij')
+    e2, e3, e1 = e2.reshape(-1), e3.reshape(-1), e1.reshape(-1)
+    bni11 = e2*now + e3*elementsCountAround + e1 + 1
+    bni12 = e2*now + e3*elementsCountAround + (e1 + 1) % elementsCountAround + 1
+    bni21 = e2*now + (e3 + 1)*elementsCountAround + e1 + 1
+    bni22 = e2*now + (e3 + 1)*elementsCountAround + (e1 + 1) % elementsCountAround + 1
+    elementsNodeIdentifiers = np.stack([ bni11, bni12, bni11 + now, bni12 + now, bni21, bni22, bni21 + now, bni22 + now ], axis=1)
+    onOpening = e1 > elementsCountAround - 2
+    meshGroupsMasks = []
+    if annotationGroups:
+        for annotationGroup in annotationGroups:
+            aroundMask = np.array([ (annotation == annotationGroup._name) for annotation in annotationArray ])
+            meshGroupsMasks.append(( annotationGroup.getMeshGroup(mesh), aroundMask[e1] ))
+    elementIdentifier = createElementsFromArrays(mesh, elementtemplates, elementsNodeIdentifiers, elementIdentifier,
+        onOpening.astype(int), meshGroupsMasks)
 
     fm.endChange()
 
@@ -623,17 +588,10 @@ def getCylindricalSegmentInnerPoints(elementsCountAround, elementsCountAlongSegm
         xFinal = xFinal + xLoop
         d1Final = d1Final + d1Loop
 
-    # Smooth d2 for segment
-    smoothd2Raw = []
-    for n1 in range(elementsCountAround):
-        nx = []
-        nd2 = []
-        for n2 in range(elementsCountAlongSegment + 1):
-            n = n2 * elementsCountAround + n1
-            nx.append(xFinal[n])
-            nd2.append(segmentAxis)
-        smoothd2 = interp.smoothCubicHermiteDerivativesLine(nx, nd2)
-        smoothd2Raw.append(smoothd2)
+    # Smooth d2 for segment along all lines around at once, indexed by n1, n2
+    nx = np.array(xFinal).reshape(elementsCountAlongSegment + 1, elementsCountAround, 3).transpose(1, 0, 2)
+    nd2 = np.broadcast_to(segmentAxis, nx.shape)
+    smoothd2Raw = interp.smoothCubicHermiteDerivativesLineArray(nx, nd2).tolist()
 
     # Re-arrange smoothd2
     for n2 in range(elementsCountAlongSegment + 1):
@@ -2,6 +2,7 @@
 Utility functions for easing use of Zinc API.
 '''
 
+import numpy as np
 from opencmiss.utils.zinc.field import findOrCreateFieldCoordinates
 from opencmiss.utils.zinc.general import ChangeManager
 from opencmiss.zinc.context import Context
@@ -130,6 +131,108 @@ def exnodeStringFromNodeValues(
     return exString
 
 
+def createNodesFromArrays(nodeset, nodetemplate, fieldsParameters, nodeIdentifiers):
+    '''
+    Create nodes with nodetemplate and set their field parameters from arrays, with the minimum
+    number of calls to Zinc: one to create each node, one to set it in a field cache and one for
+    each parameter vector which is non-zero for any node, all within a single change cache.
+    :param nodeset: Zinc Nodeset or NodesetGroup to create nodes in.
+    :param nodetemplate: Nodetemplate defining all fields and parameters to set. Parameters
+    defined by it but not supplied are zero.
+    :param fieldsParameters: List of (field, valueLabels, values) where valueLabels is a list of
+    node value labels for version 1 or (valueLabel, version) tuples, and values is array-like
+    with shape (nodesCount, len(valueLabels), componentsCount).
+    :param nodeIdentifiers: Sequence of identifiers of nodes to create, or int first identifier
+    for consecutive identifiers.
+    :return: Next node identifier after the last created. If no nodes are created this is the
+    first identifier if int, otherwise None.
+    '''
+    assert fieldsParameters, 'createNodesFromArrays:  No fields parameters'
+    nodesCount = len(fieldsParameters[0][2])
+    if isinstance(nodeIdentifiers, int):
+        nodeIdentifiers = range(nodeIdentifiers, nodeIdentifiers + nodesCount)
+    assert len(nodeIdentifiers) == nodesCount, 'createNodesFromArrays:  Number of node identifiers does not match values'
+    if nodesCount == 0:
+        return nodeIdentifiers.start if isinstance(nodeIdentifiers, range) else None
+    # list of (setNodeParameters, valueLabel, version, values list) for parameters non-zero at any node
+    parametersSetters = []
+    for field, valueLabels, values in fieldsParameters:
+        values = np.asarray(values, dtype=np.float64)
+        assert values.shape == (nodesCount, len(valueLabels), field.getNumberOfComponents()), \
+            'createNodesFromArrays:  Invalid shape of values for field ' + field.getName()
+        for v, valueLabel in enumerate(valueLabels):
+            if np.any(values[:, v]):
+                valueLabel, version = valueLabel if isinstance(valueLabel, tuple) else (valueLabel, 1)
+                parametersSetters.append(( field.setNodeParameters, valueLabel, version, values[:, v].tolist() ))
+    fieldmodule = nodeset.getFieldmodule()
+    cache = fieldmodule.createFieldcache()
+    createNode = nodeset.createNode
+    setNode = cache.setNode
+    with ChangeManager(fieldmodule):
+        for n, nodeIdentifier in enumerate(nodeIdentifiers):
+            setNode(createNode(int(nodeIdentifier), nodetemplate))
+            for setNodeParameters, valueLabel, version, valuesList in parametersSetters:
+                setNodeParameters(cache, -1, valueLabel, version, valuesList[n])
+    return int(nodeIdentifier) + 1
+
+
+def createElementsFromArrays(mesh, elementtemplates, elementsNodeIdentifiers, elementIdentifiers,
+        elementtemplateIndexes=None, meshGroupsMasks=None):
+    '''
+    Create elements from an array of their local node identifiers and add them to mesh groups
+    from masks, with the minimum number of calls to Zinc: one to create each element, one to set
+    nodes for each of its element field templates and one to add it to each mesh group it is in,
+    all within a single change cache.
+    :param mesh: Zinc Mesh to create elements in.
+    :param elementtemplates: List of (elementtemplate, efts) where efts is a list of the element
+    field templates defined by elementtemplate whose local nodes are set from the element's node
+    identifiers.
+    :param elementsNodeIdentifiers: Array-like (elementsCount, localNodesCount) of identifiers of
+    the local nodes of each element, or list of lists if local nodes count varies with template.
+    :param elementIdentifiers: Sequence of identifiers of elements to create, or int first
+    identifier for consecutive identifiers.
+    :param elementtemplateIndexes: Optional array-like of index into elementtemplates for each
+    element. Default is to use the first for all elements.
+    :param meshGroupsMasks: Optional list of (meshGroup, mask) where mask is array-like of bool for
+    each element, True to add it to meshGroup, or a single bool for all elements.
+    :return: Next element identifier after the last created. If no elements are created this is
+    the first identifier if int, otherwise None.
+    '''
+    elementsCount = len(elementsNodeIdentifiers)
+    if isinstance(elementIdentifiers, int):
+        elementIdentifiers = range(elementIdentifiers, elementIdentifiers + elementsCount)
+    assert len(elementIdentifiers) == elementsCount, \
+        'createElementsFromArrays:  Number of element identifiers does not match node identifiers'
+    if elementsCount == 0:
+        return elementIdentifiers.start if isinstance(elementIdentifiers, range) else None
+    # Zinc needs python ints
+    if isinstance(elementsNodeIdentifiers, np.ndarray):
+        elementsNodeIdentifiers = elementsNodeIdentifiers.tolist()
+    if meshGroupsMasks is None:
+        meshGroupsMasks = []
+    if elementtemplateIndexes is None:
+        elementtemplateIndexes = [ 0 ]*elementsCount
+    else:
+        elementtemplateIndexes = np.asarray(elementtemplateIndexes).tolist()
+        assert len(elementtemplateIndexes) == elementsCount, \
+            'createElementsFromArrays:  Number of element template indexes does not match node identifiers'
+    createElement = mesh.createElement
+    elements = []
+    with ChangeManager(mesh.getFieldmodule()):
+        for elementIdentifier, elementtemplateIndex, nodeIdentifiers in \
+                zip(elementIdentifiers, elementtemplateIndexes, elementsNodeIdentifiers):
+            elementtemplate, efts = elementtemplates[elementtemplateIndex]
+            element = createElement(int(elementIdentifier), elementtemplate)
+            for eft in efts:
+                element.setNodesByIdentifier(eft, nodeIdentifiers)
+            elements.append(element)
+        for meshGroup, mask in meshGroupsMasks:
+            addElement = meshGroup.addElement
+            for index in np.nonzero(np.broadcast_to(mask, (elementsCount,)))[0].tolist():
+                addElement(elements[index])
+    return int(elementIdentifier) + 1
+
+
 def createFaceMeshGroupExteriorOnFace(fieldmodule : Fieldmodule, elementFaceType) -> MeshGroup:
     """
     Returns mesh group for the exterior surface on the face described
@@ -0,0 +1,52 @@
+import unittest
+from opencmiss.zinc.context import Context
+from opencmiss.zinc.field import Field
+from opencmiss.zinc.result import RESULT_OK
+from scaffoldmaker.meshtypes.meshtype_3d_sphereshell1 import MeshType_3d_sphereshell1
+from scaffoldmaker.utils.basemeshcache import getBaseMeshCacheCounts, setBaseMeshCacheSize
+
+def generateRefinedMesh(options):
+    '''
+    Generate sphere shell scaffold with options in a new context.
+    :return: Context, region model written to EX format in memory.
+    '''
+    context = Context("Test")
+    region = context.getDefaultRegion()
+    MeshType_3d_sphereshell1.generateMesh(region, options)
+    streaminformation = region.createStreaminformationRegion()
+    memoryresource = streaminformation.createStreamresourceMemory()
+    region.write(streaminformation)
+    result, buffer = memoryresource.getBuffer()
+    assert result == RESULT_OK
+    return context, buffer
+
+class BaseMeshCacheTestCase(unittest.TestCase):
+
+    def test_base_mesh_cache(self):
+        """
+        Test refined mesh is regenerated from cached base mesh when only refine options change,
+        giving the same output as without the cache.
+        """
+        options = MeshType_3d_sphereshell1.getDefaultOptions()
+        options['Refine'] = True
+        options['Refine number of elements around'] = 2
+        options['Refine number of elements up'] = 2
+        options['Refine number of elements through wall'] = 1
+        try:
+            setBaseMeshCacheSize(2)
+            hitsCount, missesCount = getBaseMeshCacheCounts()
+            context, buffer = generateRefinedMesh(options)
+            self.assertEqual((hitsCount, missesCount + 1), getBaseMeshCacheCounts())
+            options['Refine number of elements through wall'] = 2
+            context, cachedBuffer = generateRefinedMesh(options)
+            self.assertEqual((hitsCount + 1, missesCount + 1), getBaseMeshCacheCounts())
+            nodes = context.getDefaultRegion().getFieldmodule().findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+            self.assertEqual(174, nodes.getSize())
+        finally:
+            setBaseMeshCacheSize(0)
+        context, uncachedBuffer = generateRefinedMesh(options)
+        self.assertEqual((hitsCount + 1, missesCount + 1), getBaseMeshCacheCounts())
+        self.assertEqual(uncachedBuffer, cachedBuffer)
+
+if __name__ == "__main__":
+    unittest.main()
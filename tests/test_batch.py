@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from scaffoldmaker.batch import getTimingSummary, main, runBatch, runJob
+
+okJob = { 'name' : 'box', 'scaffoldTypeName' : '3D Box 1', 'scaffoldSettings' : { 'Number of elements 1' : 2 } }
+unknownJob = { 'name' : 'unknown', 'scaffoldTypeName' : '3D Unknown 1' }
+raisingJob = { 'name' : 'raising', 'scaffoldTypeName' : '3D Box 1', 'scaffoldSettings' : { 'Number of elements 1' : 'two' } }
+# takes many times longer than the timeout used for it, in Python code where the timeout can interrupt it
+timeoutJob = { 'name' : 'slow', 'scaffoldTypeName' : '3D Heart Ventricles 1', 'scaffoldSettings' : { 'Refine' : True,
+    'Refine number of elements surface' : 16, 'Refine number of elements through LV wall' : 16, 'Refine number of elements through wall' : 16 } }
+
+class BatchTestCase(unittest.TestCase):
+
+    def test_run_job(self):
+        """
+        Test runJob status and output files for ok, unknown scaffold, raising and timed out jobs.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            fileName = os.path.join(directory, 'box.exf')
+            result = runJob(okJob, fileName, profile=True)
+            self.assertEqual('ok', result['status'])
+            self.assertEqual(2, result['elementsCount'])
+            self.assertEqual(12, result['nodesCount'])
+            self.assertTrue(result['elapsed'] > 0.0)
+            self.assertEqual([ 'box.exf', 'box.profile.json' ], sorted(os.listdir(directory)))
+            with open(fileName, 'r') as f:
+                self.assertIn('coordinates', f.read())
+
+            for job, timeout in ((unknownJob, None), (raisingJob, None), (timeoutJob, 1.0)):
+                fileName = os.path.join(directory, job['name'] + '.exf')
+                result = runJob(job, fileName, timeout=timeout)
+                self.assertEqual('timeout' if timeout else 'error', result['status'])
+                self.assertFalse(os.path.exists(fileName))
+            self.assertIn('Unknown scaffold type 3D Unknown 1', runJob(unknownJob, fileName)['message'])
+            self.assertIn('TypeError', runJob(raisingJob, fileName)['message'])
+
+    def test_run_batch(self):
+        """
+        Test runBatch in a process pool and the command line summary for a batch of all kinds of job.
+        """
+        jobs = [ okJob, unknownJob, raisingJob, timeoutJob ]
+        with tempfile.TemporaryDirectory() as directory:
+            results = runBatch(jobs, directory, processesCount=2, timeout=1.0)
+            self.assertEqual([ 'ok', 'error', 'error', 'timeout' ], [ result['status'] for result in results ])
+            self.assertEqual([ job['name'] for job in jobs ], [ result['name'] for result in results ])
+            self.assertEqual([ os.path.join(directory, 'box.exf'), None, None, None ], [ result['fileName'] for result in results ])
+            self.assertEqual([ 'box.exf' ], os.listdir(directory))
+            summary = getTimingSummary(results).split('\n')
+            self.assertEqual(5, len(summary))
+            self.assertTrue(summary[0].startswith('ok            1 jobs'))
+            self.assertTrue(summary[1].startswith('timeout       1 jobs'))
+            self.assertTrue(summary[2].startswith('error         2 jobs'))
+            self.assertTrue(summary[3].startswith('unknown: '))
+            self.assertTrue(summary[4].startswith('raising: '))
+
+        with tempfile.TemporaryDirectory() as directory:
+            jobsFileName = os.path.join(directory, 'jobs.json')
+            with open(jobsFileName, 'w') as f:
+                json.dump(jobs, f)
+            outputDirectory = os.path.join(directory, 'out')
+            with mock.patch.object(sys, 'argv', [ 'scaffoldmaker-batch', jobsFileName, '--output-directory', outputDirectory,
+                    '--processes', '2', '--timeout', '1.0', '--profile' ]):
+                main()
+            self.assertEqual([ 'box.exf', 'box.profile.json', 'summary.json' ], sorted(os.listdir(outputDirectory)))
+            with open(os.path.join(outputDirectory, 'summary.json'), 'r') as f:
+                summary = json.load(f)
+            self.assertEqual([ 'ok', 'error', 'error', 'timeout' ], [ result['status'] for result in summary ])
+            self.assertEqual(2, summary[0]['elementsCount'])
+
+if __name__ == "__main__":
+    unittest.main()
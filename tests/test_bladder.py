@@ -3,6 +3,7 @@ import unittest
 from opencmiss.utils.zinc.finiteelement import evaluateFieldNodesetRange
 from opencmiss.zinc.context import Context
 from opencmiss.zinc.field import Field
+from opencmiss.zinc.node import Node
 from opencmiss.zinc.result import RESULT_OK
 from scaffoldmaker.annotation.annotationgroup import AnnotationGroup
 from scaffoldmaker.meshtypes.meshtype_3d_ostium1 import MeshType_3d_ostium1
@@ -111,5 +112,33 @@ class BladderScaffoldTestCase(unittest.TestCase):
         assertAlmostEqualList(self, minimums, [-2.996386368615517, -2.996386368615517, -6.464466094067262], 1.0E-6)
         assertAlmostEqualList(self, maximums, [2.996386368615517, 2.996386368615517, 5.0], 1.0E-6)
 
+    def test_bladder1_ureter_coordinates(self):
+        """
+        Test coordinates of bladder parameter sets including around the mirrored second ureter,
+        which is located at the end of a row of elements on its track surface.
+        """
+        for parameterSetName, nodesCount, nodeIdentifier, nodeCoordinates, coordinatesSum in [
+                ("Default", 254, 244, [ 0.6431849473172124, 0.7937178924013584, -5.0708786007211115 ],
+                    [ 7.800677845670734e-06, 58.79951937794219, -724.0032942466942 ]),
+                ("Rat 1", 414, 379, [ 1.18537126875702, -0.30677541130934904, -2.5806507933071354 ],
+                    [ 0.017911655026055295, -26.84707382965975, -553.3871589472902 ]) ]:
+            options = MeshType_3d_bladder1.getDefaultOptions(parameterSetName)
+            context = Context("Test")
+            region = context.getDefaultRegion()
+            MeshType_3d_bladder1.generateBaseMesh(region, options)
+            fieldmodule = region.getFieldmodule()
+            nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+            self.assertEqual(nodesCount, nodes.getSize())
+            coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+            fieldcache = fieldmodule.createFieldcache()
+            fieldcache.setNode(nodes.findNodeByIdentifier(nodeIdentifier))
+            result, x = coordinates.getNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, 3)
+            self.assertEqual(RESULT_OK, result)
+            assertAlmostEqualList(self, x, nodeCoordinates, 1.0E-6)
+            sumField = fieldmodule.createFieldNodesetSum(coordinates, nodes)
+            result, x = sumField.evaluateReal(fieldcache, 3)
+            self.assertEqual(RESULT_OK, result)
+            assertAlmostEqualList(self, x, coordinatesSum, 1.0E-6)
+
 if __name__ == "__main__":
     unittest.main()
@@ -135,10 +135,10 @@ class ColonScaffoldTestCase(unittest.TestCase):
         fieldcache = fieldmodule.createFieldcache()
         result, surfaceArea = surfaceAreaField.evaluateReal(fieldcache, 1)
         self.assertEqual(result, RESULT_OK)
-        self.assertAlmostEqual(surfaceArea, 14265.760370377262, delta=1.0E-6)
+        self.assertAlmostEqual(surfaceArea, 14265.760369176582, delta=1.0E-6)
         result, volume = volumeField.evaluateReal(fieldcache, 1)
         self.assertEqual(result, RESULT_OK)
-        self.assertAlmostEqual(volume, 23911.026921747245, delta=1.0E-6)
+        self.assertAlmostEqual(volume, 23911.026757559146, delta=1.0E-6)
 
     def test_mousecolon1(self):
         """
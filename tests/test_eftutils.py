@@ -0,0 +1,43 @@
+import unittest
+from opencmiss.utils.zinc.field import findOrCreateFieldCoordinates
+from opencmiss.zinc.context import Context
+from opencmiss.zinc.node import Node
+from scaffoldmaker.utils.eft_utils import remapEftNodeValueLabel, setEftScaleFactorIds
+from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubichermite
+
+class EftUtilsTestCase(unittest.TestCase):
+
+    def test_shared_eft_cache(self):
+        """
+        Test identical EFTs share element templates, and invalid EFTs fail without being cached.
+        """
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        fieldmodule = region.getFieldmodule()
+        coordinates = findOrCreateFieldCoordinates(fieldmodule)
+        mesh = fieldmodule.findMeshByDimension(3)
+        tricubichermite = eftfactory_tricubichermite(mesh, False, memoize=True)
+        sharedEftCache = tricubichermite._sharedEftCache
+
+        results = []
+        for i in range(2):
+            eft = tricubichermite.createEftNoCrossDerivatives()
+            setEftScaleFactorIds(eft, [1], [])
+            remapEftNodeValueLabel(eft, [ 5, 7 ], Node.VALUE_LABEL_D_DS3, [ ( Node.VALUE_LABEL_D_DS1, [1] ), ( Node.VALUE_LABEL_D_DS3, []) ])
+            results.append(tricubichermite.getElementtemplate(eft, coordinates))
+        self.assertIs(results[0][0], results[1][0])
+        self.assertIs(results[0][1], results[1][1])
+        self.assertEqual((1, 1, 2), sharedEftCache.getCounts())
+
+        # scale factor declared but not used by any term
+        eft = tricubichermite.createEftNoCrossDerivatives()
+        setEftScaleFactorIds(eft, [1], [])
+        remapEftNodeValueLabel(eft, [ 6, 8 ], Node.VALUE_LABEL_D_DS3, [ ( Node.VALUE_LABEL_D_DS1, [] ), ( Node.VALUE_LABEL_D_DS3, []) ])
+        self.assertFalse(eft.validate())
+        for i in range(2):
+            with self.assertRaises(AssertionError):
+                tricubichermite.getElementtemplate(eft, coordinates)
+        self.assertEqual((1, 1, 4), sharedEftCache.getCounts())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,274 @@
+import io
+import re
+import unittest
+import numpy as np
+from opencmiss.utils.zinc.finiteelement import getElementNodeIdentifiersBasisOrder
+from opencmiss.zinc.context import Context
+from opencmiss.zinc.element import Element, Elementbasis
+from opencmiss.zinc.field import Field
+from opencmiss.zinc.result import RESULT_OK
+from scaffoldmaker.annotation.annotationgroup import AnnotationGroup
+from scaffoldmaker.meshtypes.meshtype_3d_colonsegment1 import MeshType_3d_colonsegment1
+from scaffoldmaker.utils.exportvtk import ExportVtk
+
+def readLegacyVtk(data, binary):
+    '''
+    Read points, cells, cell types and integer cell data from legacy vtk unstructured grid.
+    :return: points array, cells array, cell types array, dict cell data name -> array
+    '''
+    instream = io.BytesIO(data)
+    assert instream.readline() == b'# vtk DataFile Version 2.0\n'
+    instream.readline()
+    assert instream.readline() == (b'BINARY\n' if binary else b'ASCII\n')
+    assert instream.readline() == b'DATASET UNSTRUCTURED_GRID\n'
+
+    def readArray(count, dtype):
+        if binary:
+            array = np.frombuffer(instream.read(count*np.dtype(dtype).itemsize), dtype=dtype)
+            instream.readline()
+            return array
+        values = []
+        while len(values) < count:
+            values += instream.readline().split()
+        assert len(values) == count
+        return np.array([ float(value) for value in values ]) if dtype == '>f8' else \
+            np.array([ int(value) for value in values ], dtype=np.int64)
+
+    pointsCount = int(re.match(rb'POINTS (\d+) double\n', instream.readline()).group(1))
+    points = readArray(pointsCount*3, '>f8').reshape((pointsCount, 3))
+    match = re.match(rb'CELLS (\d+) (\d+)\n', instream.readline())
+    cellCount, cellListSize = int(match.group(1)), int(match.group(2))
+    cells = readArray(cellListSize, '>i4').reshape((cellCount, -1))
+    assert (cells[:, 0] == (cells.shape[1] - 1)).all()
+    assert instream.readline() == b'CELL_TYPES ' + str(cellCount).encode() + b'\n'
+    cellTypes = readArray(cellCount, '>i4')
+    cellData = {}
+    line = instream.readline()
+    if line:
+        assert line == b'CELL_DATA ' + str(cellCount).encode() + b'\n'
+        line = instream.readline()
+        while line:
+            name, vtkType = ( s.decode() for s in re.match(rb'SCALARS (\S+) (int|vtktypeint64) 1\n', line).groups() )
+            assert instream.readline() == b'LOOKUP_TABLE default\n'
+            cellData[name] = readArray(cellCount, '>i4' if (vtkType == 'int') else '>i8')
+            line = instream.readline()
+    return points, cells[:, 1:], cellTypes, cellData
+
+def readVtu(data):
+    '''
+    Read points, cells, cell types and integer cell data from vtu with raw appended data.
+    :return: points array, cells array, cell types array, dict cell data name -> array
+    '''
+    appendedStart = data.index(b'<AppendedData encoding="raw">\n_') + len(b'<AppendedData encoding="raw">\n_')
+    header = data[:appendedStart].decode()
+    pointsCount, cellCount = ( int(s) for s in re.search(r'NumberOfPoints="(\d+)" NumberOfCells="(\d+)"', header).groups() )
+    arrays = {}
+    for match in re.finditer(r'<DataArray type="(\w+)"( NumberOfComponents="3")?( Name="(\w+)")? format="appended" offset="(\d+)"/>', header):
+        vtuType, name, offset = match.group(1), match.group(4) or 'Points', int(match.group(5))
+        start = appendedStart + offset
+        nbytes = int(np.frombuffer(data[start:start + 8], dtype='<u8')[0])
+        dtype = { 'Float64': '<f8', 'Int64': '<i8', 'Int32': '<i4', 'UInt8': '<u1' }[vtuType]
+        arrays[name] = np.frombuffer(data[start + 8:start + 8 + nbytes], dtype=dtype)
+    points = arrays.pop('Points').reshape((pointsCount, 3))
+    cells = arrays.pop('connectivity').reshape((cellCount, -1))
+    offsets = arrays.pop('offsets')
+    assert (offsets == np.arange(1, cellCount + 1)*cells.shape[1]).all()
+    cellTypes = arrays.pop('types')
+    return points, cells, cellTypes, arrays
+
+def addAnnotationGroups(region, annotationGroups, groupsCount):
+    '''
+    Add annotation groups containing every (g + 2)th element until there are groupsCount.
+    '''
+    mesh3d = region.getFieldmodule().findMeshByDimension(3)
+    for g in range(len(annotationGroups), groupsCount):
+        annotationGroup = AnnotationGroup(region, 'group ' + str(g), None, None)
+        meshGroup = annotationGroup.getMeshGroup(mesh3d)
+        for elementIdentifier in range(g + 2, mesh3d.getSize() + 1, g + 2):
+            assert meshGroup.addElement(mesh3d.findElementByIdentifier(elementIdentifier)) == RESULT_OK
+        annotationGroups.append(annotationGroup)
+
+class ExportVtkTestCase(unittest.TestCase):
+
+    def test_export_vtk(self):
+        """
+        Test scaffold exported to legacy vtk text and binary, and vtu formats reads back
+        with the same points, cells and annotation cell data, in chunks smaller than the model.
+        """
+        options = MeshType_3d_colonsegment1.getDefaultOptions("Human 1")
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        annotationGroups = MeshType_3d_colonsegment1.generateBaseMesh(region, options)
+        self.assertEqual(3, len(annotationGroups))
+        fieldmodule = region.getFieldmodule()
+        mesh3d = fieldmodule.findMeshByDimension(3)
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+        self.assertEqual(144, mesh3d.getSize())
+        chunkSize = 50
+
+        for consecutiveNodeIdentifiers in (True, False):
+            if not consecutiveNodeIdentifiers:
+                self.assertEqual(RESULT_OK, nodes.findNodeByIdentifier(1).setIdentifier(1000))
+            # expected values from Zinc in node and element identifier order
+            fieldcache = fieldmodule.createFieldcache()
+            nodeIdentifiers = []
+            expectedPoints = []
+            nodeiterator = nodes.createNodeiterator()
+            node = nodeiterator.next()
+            while node.isValid():
+                nodeIdentifiers.append(node.getIdentifier())
+                fieldcache.setNode(node)
+                result, x = coordinates.evaluateReal(fieldcache, 3)
+                self.assertEqual(RESULT_OK, result)
+                expectedPoints.append(x)
+                node = nodeiterator.next()
+            self.assertEqual(consecutiveNodeIdentifiers, nodeIdentifiers == list(range(1, len(nodeIdentifiers) + 1)))
+            expectedCells = []
+            expectedCellData = { annotationGroup.getName().replace(' ', '_'): [] for annotationGroup in annotationGroups }
+            elementiterator = mesh3d.createElementiterator()
+            element = elementiterator.next()
+            while element.isValid():
+                eft = element.getElementfieldtemplate(coordinates, -1)
+                elementNodeIdentifiers = getElementNodeIdentifiersBasisOrder(element, eft)
+                expectedCells.append([ nodeIdentifiers.index(elementNodeIdentifiers[i]) for i in [ 0, 1, 3, 2, 4, 5, 7, 6 ] ])
+                for annotationGroup in annotationGroups:
+                    expectedCellData[annotationGroup.getName().replace(' ', '_')].append(
+                        1 if annotationGroup.getMeshGroup(mesh3d).containsElement(element) else 0)
+                element = elementiterator.next()
+            expectedMask = sum((np.array(values) << g) for g, values in enumerate(expectedCellData.values()))
+
+            exportVtk = ExportVtk(region, 'Test colon segment', annotationGroups)
+            for binary, vtu in ((False, False), (True, False), (False, True)):
+                for annotationMask in (False, True):
+                    outstream = io.BytesIO()
+                    exportVtk.write(outstream, binary=binary, vtu=vtu, chunkSize=chunkSize, annotationMask=annotationMask)
+                    data = outstream.getvalue()
+                    points, cells, cellTypes, cellData = readVtu(data) if vtu else readLegacyVtk(data, binary)
+                    self.assertEqual(points.tolist(), expectedPoints)
+                    self.assertEqual(cells.tolist(), expectedCells)
+                    self.assertEqual(cellTypes.tolist(), [ 12 ]*len(expectedCells))
+                    if annotationMask:
+                        self.assertEqual(list(cellData.keys()), [ 'annotation_mask' ])
+                        self.assertEqual(cellData['annotation_mask'].tolist(), expectedMask.tolist())
+                    else:
+                        self.assertEqual(list(cellData.keys()), list(expectedCellData.keys()))
+                        for name, values in expectedCellData.items():
+                            self.assertEqual(cellData[name].tolist(), values)
+
+    def test_export_vtk_many_annotation_groups(self):
+        """
+        Test annotation cell data for more than 32 annotation groups, when the annotation mask is
+        64-bit, reads back from legacy vtk text and binary, and vtu formats.
+        """
+        options = MeshType_3d_colonsegment1.getDefaultOptions("Human 1")
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        annotationGroups = MeshType_3d_colonsegment1.generateBaseMesh(region, options)
+        mesh3d = region.getFieldmodule().findMeshByDimension(3)
+        addAnnotationGroups(region, annotationGroups, 40)
+        expectedCellData = {}
+        for annotationGroup in annotationGroups:
+            meshGroup = annotationGroup.getMeshGroup(mesh3d)
+            expectedCellData[annotationGroup.getName().replace(' ', '_')] = [ 1 if meshGroup.containsElement(
+                mesh3d.findElementByIdentifier(elementIdentifier)) else 0 for elementIdentifier in range(1, mesh3d.getSize() + 1) ]
+        expectedMask = sum((np.array(values, dtype=np.int64) << g) for g, values in enumerate(expectedCellData.values()))
+        self.assertTrue(expectedMask.max() >= (1 << 32))
+
+        exportVtk = ExportVtk(region, 'Test colon segment', annotationGroups)
+        for binary, vtu in ((False, False), (True, False), (False, True)):
+            for annotationMask in (False, True):
+                outstream = io.BytesIO()
+                exportVtk.write(outstream, binary=binary, vtu=vtu, chunkSize=50, annotationMask=annotationMask)
+                points, cells, cellTypes, cellData = readVtu(outstream.getvalue()) if vtu else readLegacyVtk(outstream.getvalue(), binary)
+                self.assertEqual(cellTypes.tolist(), [ 12 ]*mesh3d.getSize())
+                if annotationMask:
+                    self.assertEqual(list(cellData.keys()), [ 'annotation_mask' ])
+                    self.assertEqual(cellData['annotation_mask'].tolist(), expectedMask.tolist())
+                else:
+                    self.assertEqual(list(cellData.keys()), list(expectedCellData.keys()))
+                    for name, values in expectedCellData.items():
+                        self.assertEqual(cellData[name].tolist(), values)
+
+    def test_export_vtk_binary_layout(self):
+        """
+        Test every array in legacy vtk binary and vtu output has exactly the size and offset its
+        header declares, with one array per annotation group for more than 32 groups.
+        """
+        options = MeshType_3d_colonsegment1.getDefaultOptions("Human 1")
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        annotationGroups = MeshType_3d_colonsegment1.generateBaseMesh(region, options)
+        addAnnotationGroups(region, annotationGroups, 33)
+        fieldmodule = region.getFieldmodule()
+        pointsCount = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES).getSize()
+        cellCount = fieldmodule.findMeshByDimension(3).getSize()
+        exportVtk = ExportVtk(region, 'Test colon segment', annotationGroups)
+
+        outstream = io.BytesIO()
+        exportVtk.write(outstream, binary=True, chunkSize=50)
+        data = outstream.getvalue()
+        sizes = { b'POINTS': pointsCount*3*8, b'CELLS': cellCount*9*4, b'CELL_TYPES': cellCount*4, b'SCALARS': cellCount*4 }
+        position = data.index(b'POINTS')
+        arraysCount = 0
+        while position < len(data):
+            end = data.index(b'\n', position) + 1
+            keyword = data[position:end].split()[0]
+            if keyword == b'SCALARS':
+                self.assertEqual(b'LOOKUP_TABLE default\n', data[end:end + 21])
+                end += 21
+            elif keyword == b'CELL_DATA':
+                position = end
+                continue
+            position = end + sizes[keyword]
+            self.assertEqual(b'\n', data[position:position + 1])
+            position += 1
+            arraysCount += 1
+        self.assertEqual(len(data), position)
+        self.assertEqual(3 + 33, arraysCount)
+
+        outstream = io.BytesIO()
+        exportVtk.write(outstream, vtu=True, chunkSize=50)
+        data = outstream.getvalue()
+        appendedStart = data.index(b'<AppendedData encoding="raw">\n_') + len(b'<AppendedData encoding="raw">\n_')
+        header = data[:appendedStart].decode()
+        dataArrays = re.findall(r'<DataArray type="(\w+)".*? offset="(\d+)"/>', header)
+        self.assertEqual(4 + 33, len(dataArrays))
+        counts = [ pointsCount*3, cellCount*8, cellCount, cellCount ] + [ cellCount ]*33
+        itemSizes = { 'Float64': 8, 'Int64': 8, 'Int32': 4, 'UInt8': 1 }
+        position = appendedStart
+        for ( vtuType, offset ), count in zip(dataArrays, counts):
+            self.assertEqual(appendedStart + int(offset), position)
+            nbytes = int(np.frombuffer(data[position:position + 8], dtype='<u8')[0])
+            self.assertEqual(count*itemSizes[vtuType], nbytes)
+            position += 8 + nbytes
+        self.assertEqual(b'\n</AppendedData>\n</VTKFile>\n', data[position:])
+
+    def test_export_vtk_missing_node(self):
+        """
+        Test export fails if an element has a node which is not set.
+        """
+        options = MeshType_3d_colonsegment1.getDefaultOptions("Human 1")
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        MeshType_3d_colonsegment1.generateBaseMesh(region, options)
+        fieldmodule = region.getFieldmodule()
+        mesh3d = fieldmodule.findMeshByDimension(3)
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+        eft = mesh3d.createElementfieldtemplate(fieldmodule.createElementbasis(3, Elementbasis.FUNCTION_TYPE_LINEAR_LAGRANGE))
+        elementtemplate = mesh3d.createElementtemplate()
+        elementtemplate.setElementShapeType(Element.SHAPE_TYPE_CUBE)
+        self.assertEqual(RESULT_OK, elementtemplate.defineField(coordinates, -1, eft))
+        element = mesh3d.createElement(-1, elementtemplate)
+        for localNodeIndex in range(1, 8):
+            self.assertEqual(RESULT_OK, element.setNode(eft, localNodeIndex, nodes.findNodeByIdentifier(localNodeIndex)))
+        for nodeIdentifiers in ( 'consecutive', 'non-consecutive' ):
+            if nodeIdentifiers == 'non-consecutive':
+                self.assertEqual(RESULT_OK, nodes.findNodeByIdentifier(100).setIdentifier(1000))
+            for binary, vtu in ((False, False), (True, False), (False, True)):
+                with self.assertRaises(KeyError):
+                    ExportVtk(region, 'Test colon segment').write(io.BytesIO(), binary=binary, vtu=vtu, chunkSize=50)
+
+if __name__ == "__main__":
+    unittest.main()
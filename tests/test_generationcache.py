@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+from opencmiss.zinc.context import Context
+from opencmiss.zinc.field import Field
+from opencmiss.zinc.result import RESULT_OK
+from scaffoldmaker.meshtypes.meshtype_3d_box1 import MeshType_3d_box1
+from scaffoldmaker.meshtypes.meshtype_3d_colonsegment1 import MeshType_3d_colonsegment1
+from scaffoldmaker.scaffoldpackage import ScaffoldPackage
+from scaffoldmaker.utils.generationcache import GenerationCache
+
+def generateScaffold(scaffoldPackage, generationCache):
+    '''
+    Generate scaffold package in a new context using generation cache.
+    :return: Context, annotation groups, model written to EX format in memory.
+    '''
+    context = Context("Test")
+    region = context.getDefaultRegion()
+    annotationGroups = scaffoldPackage.generate(region, generationCache)
+    streaminformation = region.createStreaminformationRegion()
+    memoryresource = streaminformation.createStreamresourceMemory()
+    region.write(streaminformation)
+    result, buffer = memoryresource.getBuffer()
+    assert result == RESULT_OK
+    return context, annotationGroups, buffer
+
+class GenerationCacheTestCase(unittest.TestCase):
+
+    def test_generation_cache(self):
+        """
+        Test identical scaffold is loaded from the generation cache, and changed settings
+        or a corrupt cache entry miss the cache.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            generationCache = GenerationCache(directory)
+            scaffoldPackage = ScaffoldPackage(MeshType_3d_colonsegment1, defaultParameterSetName='Human 1')
+            context, annotationGroups, buffer = generateScaffold(scaffoldPackage, generationCache)
+            self.assertEqual((0, 1), (generationCache.getHitsCount(), generationCache.getMissesCount()))
+            self.assertEqual(3, len(annotationGroups))
+            key = generationCache.getKey(scaffoldPackage)
+            self.assertEqual(sorted([ key + '.exf', key + '.json' ]), sorted(os.listdir(directory)))
+
+            # hit
+            context, cachedAnnotationGroups, cachedBuffer = generateScaffold(scaffoldPackage, generationCache)
+            self.assertEqual((1, 1), (generationCache.getHitsCount(), generationCache.getMissesCount()))
+            self.assertEqual(buffer, cachedBuffer)
+            self.assertEqual([ ( a.getName(), a.getFMANumber(), a.getLyphID() ) for a in annotationGroups ],
+                [ ( a.getName(), a.getFMANumber(), a.getLyphID() ) for a in cachedAnnotationGroups ])
+            mesh3d = context.getDefaultRegion().getFieldmodule().findMeshByDimension(3)
+            self.assertEqual(144, mesh3d.getSize())
+            self.assertTrue(cachedAnnotationGroups[0].getMeshGroup(mesh3d).getSize() > 0)
+
+            # invalidation
+            scaffoldPackage.getScaffoldSettings()['Number of elements along segment'] += 1
+            self.assertNotEqual(key, generationCache.getKey(scaffoldPackage))
+            context, annotationGroups, changedBuffer = generateScaffold(scaffoldPackage, generationCache)
+            self.assertEqual((1, 2), (generationCache.getHitsCount(), generationCache.getMissesCount()))
+            self.assertNotEqual(buffer, changedBuffer)
+            scaffoldPackage.getScaffoldSettings()['Number of elements along segment'] -= 1
+            self.assertEqual(key, generationCache.getKey(scaffoldPackage))
+
+            # corrupt entry is removed and regenerated
+            modelFileName = os.path.join(directory, key + '.exf')
+            with open(modelFileName, 'rb') as f:
+                model = f.read()
+            with open(modelFileName, 'wb') as f:
+                f.write(model[:len(model)//2] + b'\nNot a valid EX file\n')
+            context = Context("Test")
+            region = context.getDefaultRegion()
+            self.assertIsNone(generationCache.load(key, region))
+            self.assertEqual((1, 3), (generationCache.getHitsCount(), generationCache.getMissesCount()))
+            self.assertEqual(0, region.getFieldmodule().findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES).getSize())
+            self.assertFalse(os.path.exists(modelFileName))
+            self.assertFalse(os.path.exists(os.path.join(directory, key + '.json')))
+            context, annotationGroups, regeneratedBuffer = generateScaffold(scaffoldPackage, generationCache)
+            self.assertEqual((1, 4), (generationCache.getHitsCount(), generationCache.getMissesCount()))
+            self.assertEqual(buffer, regeneratedBuffer)
+            self.assertTrue(os.path.exists(modelFileName))
+
+            generationCache.clear()
+            self.assertEqual([], os.listdir(directory))
+            self.assertEqual((0, 0), (generationCache.getHitsCount(), generationCache.getMissesCount()))
+
+    def test_generation_cache_eviction(self):
+        """
+        Test least recently used entries are removed when the cache exceeds its maximum size.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            scaffoldPackages = []
+            keys = []
+            for elementsCount in range(1, 4):
+                scaffoldPackage = ScaffoldPackage(MeshType_3d_box1, { 'scaffoldSettings' : { 'Number of elements 1' : elementsCount } })
+                scaffoldPackages.append(scaffoldPackage)
+            # size the cache to hold the two largest entries
+            generationCache = GenerationCache(directory)
+            entrySizes = []
+            for scaffoldPackage in scaffoldPackages:
+                generateScaffold(scaffoldPackage, generationCache)
+                key = generationCache.getKey(scaffoldPackage)
+                keys.append(key)
+                entrySizes.append(sum(os.path.getsize(os.path.join(directory, key + extension)) for extension in ('.exf', '.json')))
+            generationCache.clear()
+            generationCache = GenerationCache(directory, maximumSize=entrySizes[1] + entrySizes[2])
+
+            def getCachedKeys():
+                return sorted(set(os.path.splitext(fileName)[0] for fileName in os.listdir(directory)))
+
+            for i in range(2):
+                generateScaffold(scaffoldPackages[i], generationCache)
+                # set distinct access times as file times may have coarse resolution
+                for extension in ('.exf', '.json'):
+                    os.utime(os.path.join(directory, keys[i] + extension), (1000.0*(i + 1), 1000.0*(i + 1)))
+            self.assertEqual(sorted(keys[0:2]), getCachedKeys())
+            # loading the first entry makes it the most recently used
+            generateScaffold(scaffoldPackages[0], generationCache)
+            self.assertEqual((1, 2), (generationCache.getHitsCount(), generationCache.getMissesCount()))
+            generateScaffold(scaffoldPackages[2], generationCache)
+            self.assertEqual(sorted([ keys[0], keys[2] ]), getCachedKeys())
+            generateScaffold(scaffoldPackages[1], generationCache)
+            self.assertEqual((1, 4), (generationCache.getHitsCount(), generationCache.getMissesCount()))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,9 +2,12 @@ import unittest
 from opencmiss.utils.zinc.finiteelement import evaluateFieldNodesetRange
 from opencmiss.zinc.context import Context
 from opencmiss.zinc.field import Field
+from opencmiss.zinc.node import Node
 from opencmiss.zinc.result import RESULT_OK
 from scaffoldmaker.annotation.annotationgroup import AnnotationGroup
 from scaffoldmaker.meshtypes.meshtype_3d_heart1 import MeshType_3d_heart1
+from scaffoldmaker.meshtypes.meshtype_3d_heartventricles1 import MeshType_3d_heartventricles1
+from scaffoldmaker.utils.meshrefinement import MeshRefinement
 from testutils import assertAlmostEqualList
 
 class HeartScaffoldTestCase(unittest.TestCase):
@@ -50,5 +53,78 @@ class HeartScaffoldTestCase(unittest.TestCase):
         assertAlmostEqualList(self, minimums, [ -50.7876375290527, -57.76590573823474, -91.6 ], 1.0E-6)
         assertAlmostEqualList(self, maximums, [ 43.81084359764995, 39.03925080604259, 40.71693637558552 ], 1.0E-6)
 
+    def test_heartventricles1_refine(self):
+        """
+        Test creation of refined heart ventricles scaffold.
+        """
+        options = MeshType_3d_heartventricles1.getDefaultOptions("Human 1")
+        options['Refine'] = True
+        self.assertEqual(4, options.get("Refine number of elements surface"))
+        self.assertEqual(1, options.get("Refine number of elements through LV wall"))
+        self.assertEqual(1, options.get("Refine number of elements through wall"))
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        self.assertTrue(region.isValid())
+        annotationGroups = MeshType_3d_heartventricles1.generateMesh(region, options)
+
+        fieldmodule = region.getFieldmodule()
+        mesh3d = fieldmodule.findMeshByDimension(3)
+        self.assertEqual(1156, mesh3d.getSize())
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        self.assertEqual(2239, nodes.getSize())
+
+        coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+        self.assertTrue(coordinates.isValid())
+        minimums, maximums = evaluateFieldNodesetRange(coordinates, nodes)
+        assertAlmostEqualList(self, minimums, [ -37.95270374691572, -47.578331433313515, -80.0 ], 1.0E-6)
+        assertAlmostEqualList(self, maximums, [ 56.81240560816304, 47.578331433313515, 0.7629875336581462 ], 1.0E-6)
+
+    def test_heartventricles1_refine_processes(self):
+        """
+        Test refined heart ventricles are the same when refined in a process pool.
+        """
+        options = MeshType_3d_heartventricles1.getDefaultOptions("Human 1")
+        options['Refine'] = True
+        results = []
+        defaultProcessesCount = MeshRefinement.defaultProcessesCount
+        try:
+            for processesCount in (1, 2):
+                MeshRefinement.defaultProcessesCount = processesCount
+                context = Context("Test")
+                region = context.getDefaultRegion()
+                MeshType_3d_heartventricles1.generateMesh(region, options)
+                fieldmodule = region.getFieldmodule()
+                fieldcache = fieldmodule.createFieldcache()
+                coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+                nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+                self.assertEqual(2239, nodes.getSize())
+                nodeCoordinates = []
+                nodeiterator = nodes.createNodeiterator()
+                node = nodeiterator.next()
+                while node.isValid():
+                    fieldcache.setNode(node)
+                    result, x = coordinates.getNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, 3)
+                    nodeCoordinates.append(( node.getIdentifier(), x ))
+                    node = nodeiterator.next()
+                mesh3d = fieldmodule.findMeshByDimension(3)
+                self.assertEqual(1156, mesh3d.getSize())
+                elementNodes = []
+                elementiterator = mesh3d.createElementiterator()
+                element = elementiterator.next()
+                while element.isValid():
+                    eft = element.getElementfieldtemplate(coordinates, -1)
+                    elementNodes.append(( element.getIdentifier(),
+                        [ element.getNode(eft, n).getIdentifier() for n in range(1, eft.getNumberOfLocalNodes() + 1) ] ))
+                    element = elementiterator.next()
+                results.append(( nodeCoordinates, elementNodes ))
+        finally:
+            MeshRefinement.defaultProcessesCount = defaultProcessesCount
+        serialNodeCoordinates, serialElementNodes = results[0]
+        poolNodeCoordinates, poolElementNodes = results[1]
+        self.assertEqual(serialElementNodes, poolElementNodes)
+        self.assertEqual([ n[0] for n in serialNodeCoordinates ], [ n[0] for n in poolNodeCoordinates ])
+        for serial, pool in zip(serialNodeCoordinates, poolNodeCoordinates):
+            assertAlmostEqualList(self, serial[1], pool[1], 1.0E-12)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,210 @@
+import unittest
+import numpy as np
+from scaffoldmaker.utils import interpolation as interp
+from scaffoldmaker.utils import vector
+
+def getSimpsonArcLength(v1, d1, v2, d2):
+    """
+    :return: Reference arc length of cubic Hermite curve by composite Simpson rule on many intervals.
+    """
+    xi = np.linspace(0.0, 1.0, 20001)
+    dm = interp.interpolateCubicHermiteDerivativeArray(v1, d1, v2, d2, xi)
+    speed = np.sqrt(np.sum(dm*dm, axis=1))
+    return (speed[0] + 4.0*np.sum(speed[1:-1:2]) + 2.0*np.sum(speed[2:-1:2]) + speed[-1])/60000.0
+
+class InterpolationTestCase(unittest.TestCase):
+
+    def test_cubic_hermite_arrays(self):
+        """
+        Test array cubic Hermite kernels give the same results as the list functions.
+        """
+        rng = np.random.default_rng(1)
+        v1, d1, v2, d2, radial = [ rng.random((20, 3)) for i in range(5) ]
+        xi = rng.random(20)
+        x = interp.interpolateCubicHermiteArray(v1, d1, v2, d2, xi)
+        dx = interp.interpolateCubicHermiteDerivativeArray(v1, d1, v2, d2, xi)
+        ddx = interp.interpolateCubicHermiteSecondDerivativeArray(v1, d1, v2, d2, xi)
+        curvature = interp.getCubicHermiteCurvatureArray(v1, d1, v2, d2, radial, xi)
+        self.assertEqual((20, 3), x.shape)
+        self.assertEqual((20, ), curvature.shape)
+        for n in range(20):
+            args = [ a[n].tolist() for a in (v1, d1, v2, d2) ] + [ xi[n] ]
+            self.assertEqual(interp.interpolateCubicHermite(*args), x[n].tolist())
+            self.assertEqual(interp.interpolateCubicHermiteDerivative(*args), dx[n].tolist())
+            self.assertEqual(interp.interpolateCubicHermiteSecondDerivative(*args), ddx[n].tolist())
+            self.assertAlmostEqual(interp.getCubicHermiteCurvature(*(args[:4] + [ radial[n].tolist(), xi[n] ])), curvature[n], delta=1.0E-12)
+        # single curve at many xi
+        x = interp.interpolateCubicHermiteArray(v1[0], d1[0], v2[0], d2[0], xi)
+        self.assertEqual((20, 3), x.shape)
+        self.assertEqual(interp.interpolateCubicHermite(v1[0], d1[0], v2[0], d2[0], xi[5]), x[5].tolist())
+
+    def test_sample_cubic_hermite(self):
+        """
+        Test sampling straight line curves and interpolating scalar and vector values at the samples.
+        """
+        nx = [ [ 0.0, 0.0, 0.0 ], [ 1.0, 0.0, 0.0 ], [ 3.0, 0.0, 0.0 ] ]
+        nd1 = [ [ 1.0, 0.0, 0.0 ], [ 1.5, 0.0, 0.0 ], [ 2.0, 0.0, 0.0 ] ]
+        px, pd1, pe, pxi, psf = interp.sampleCubicHermiteCurves(nx, nd1, 6, arcLengthDerivatives = True)
+        self.assertEqual(7, len(px))
+        self.assertEqual([ 0, 0, 1, 1, 1, 1, 1 ], pe)
+        for n in range(7):
+            self.assertAlmostEqual(0.5*n, px[n][0], delta=1.0E-6)
+            self.assertAlmostEqual(0.5, pd1[n][0], delta=1.0E-6)
+        v, d = interp.interpolateSampleCubicHermite(nx, nd1, pe, pxi, psf)
+        vs, ds = interp.interpolateSampleCubicHermite([ x[0] for x in nx ], [ d1[0] for d1 in nd1 ], pe, pxi, psf)
+        self.assertTrue(isinstance(vs[0], float))
+        self.assertEqual([ x[0] for x in v ], vs)
+        self.assertEqual([ d1[0] for d1 in d ], ds)
+
+    def test_sample_cubic_hermite_arrays(self):
+        """
+        Test sampling few points with python loops matches sampling with numpy arrays.
+        """
+        nx = [ [ 0.0, 0.0, 0.0 ], [ 1.0, 0.0, 0.0 ], [ 3.0, 1.0, 0.0 ], [ 4.0, 3.0, 1.0 ] ]
+        nd1 = [ [ 1.0, 0.0, 0.0 ], [ 1.5, 0.5, 0.0 ], [ 2.0, 1.0, 0.5 ], [ 1.0, 2.0, 1.0 ] ]
+        elementsCountOut = 7
+        self.assertTrue(elementsCountOut < interp._sampleArraysMinimumElementsOut)
+        samples = [ interp.sampleCubicHermiteCurves(nx, nd1, elementsCountOut, elementLengthStartEndRatio = 2.0),
+            interp.sampleCubicHermiteCurves(nx, nd1, elementsCountOut, arcLengthDerivatives = True),
+            interp.sampleCubicHermiteCurvesSmooth(nx, nd1, elementsCountOut, 0.5, 1.0) ]
+        sampleArraysMinimumElementsOut = interp._sampleArraysMinimumElementsOut
+        interp._sampleArraysMinimumElementsOut = 1
+        try:
+            arraySamples = [ interp.sampleCubicHermiteCurves(nx, nd1, elementsCountOut, elementLengthStartEndRatio = 2.0),
+                interp.sampleCubicHermiteCurves(nx, nd1, elementsCountOut, arcLengthDerivatives = True),
+                interp.sampleCubicHermiteCurvesSmooth(nx, nd1, elementsCountOut, 0.5, 1.0) ]
+        finally:
+            interp._sampleArraysMinimumElementsOut = sampleArraysMinimumElementsOut
+        for sample, arraySample in zip(samples, arraySamples):
+            px, pd1, pe, pxi, psf = sample
+            apx, apd1, ape, apxi, apsf = arraySample
+            self.assertEqual(elementsCountOut + 1, len(px))
+            self.assertEqual(ape, pe)
+            for n in range(elementsCountOut + 1):
+                self.assertAlmostEqual(apxi[n], pxi[n], delta=1.0E-12)
+                self.assertAlmostEqual(apsf[n], psf[n], delta=1.0E-12)
+                for c in range(3):
+                    self.assertAlmostEqual(apx[n][c], px[n][c], delta=1.0E-12)
+                    self.assertAlmostEqual(apd1[n][c], pd1[n][c], delta=1.0E-12)
+
+    def test_arc_length(self):
+        """
+        Test adaptive and batched arc lengths and Newton solution of derivative scaling.
+        """
+        v1 = [ 1.0, 0.0, 0.0 ]
+        d1 = [ 0.0, 5.0, 0.0 ]
+        v2 = [ 0.0, 1.0, 0.0 ]
+        d2 = [ -5.0, 0.0, 0.0 ]
+        expectedArcLength = getSimpsonArcLength(v1, d1, v2, d2)
+        self.assertAlmostEqual(expectedArcLength, 2.2754967808121305, delta=1.0E-9)
+        # 3 point Gauss is poor for this curvature
+        self.assertAlmostEqual(2.1307259145227455, interp.getCubicHermiteArcLength(v1, d1, v2, d2), delta=1.0E-12)
+        self.assertAlmostEqual(expectedArcLength, interp.getCubicHermiteArcLength(v1, d1, v2, d2, tolerance=1.0E-10), delta=1.0E-9)
+        self.assertAlmostEqual(expectedArcLength, interp.getCubicHermiteArcLength(v1, d1, v2, d2, tolerance=1.0E-4), delta=1.0E-4)
+        rng = np.random.default_rng(2)
+        v1s, d1s, v2s, d2s = [ rng.random((10, 3)) for i in range(4) ]
+        arcLengths = interp.getCubicHermiteArcLengthArray(v1s, d1s, v2s, d2s)
+        adaptiveArcLengths = interp.getCubicHermiteArcLengthArray(v1s, d1s, v2s, d2s, tolerance=1.0E-10)
+        for n in range(10):
+            args = [ a[n].tolist() for a in (v1s, d1s, v2s, d2s) ]
+            self.assertEqual(interp.getCubicHermiteArcLength(*args), arcLengths[n])
+            self.assertAlmostEqual(interp.getCubicHermiteArcLength(*args, tolerance=1.0E-10), adaptiveArcLengths[n], delta=1.0E-12)
+        for tolerance in (None, 1.0E-8):
+            scaling = interp.computeCubicHermiteDerivativeScaling(v1, d1, v2, d2, tolerance=tolerance)
+            arcLength = interp.getCubicHermiteArcLength(v1, [ scaling*d for d in d1 ], v2, [ scaling*d for d in d2 ], tolerance=tolerance)
+            self.assertAlmostEqual(5.0*scaling, arcLength, delta=1.0E-8)
+            arcLength = interp.computeCubicHermiteArcLength(v1, d1, v2, d2, True, tolerance=tolerance)
+            self.assertAlmostEqual(arcLength, interp.getCubicHermiteArcLength(v1, [ 0.0, arcLength, 0.0 ], v2, [ -arcLength, 0.0, 0.0 ], tolerance=tolerance), delta=1.0E-8)
+        self.assertAlmostEqual(1.556722661223, interp.computeCubicHermiteArcLength(v1, d1, v2, d2, True), delta=1.0E-10)
+        self.assertAlmostEqual(1.556752345796, interp.computeCubicHermiteArcLength(v1, d1, v2, d2, True, tolerance=1.0E-10), delta=1.0E-10)
+        # short chord with unit derivatives far from the solution: quadrature intervals must suit the solved derivatives
+        v1 = [ 0.762, 0.013, 0.351 ]
+        d1 = vector.normalise([ 0.57, -0.236, -0.787 ])
+        v2 = [ 0.763, 0.013, 0.341 ]
+        d2 = vector.normalise([ 0.298, -0.199, 0.934 ])
+        arcLength = interp.computeCubicHermiteArcLength(v1, d1, v2, d2, True, tolerance=1.0E-8)
+        expectedArcLength = getSimpsonArcLength(v1, [ arcLength*d for d in d1 ], v2, [ arcLength*d for d in d2 ])
+        self.assertAlmostEqual(expectedArcLength, arcLength, delta=1.0E-8*arcLength)
+        scaling = interp.computeCubicHermiteDerivativeScaling(v1, d1, v2, d2, tolerance=1.0E-8)
+        expectedArcLength = getSimpsonArcLength(v1, [ scaling*d for d in d1 ], v2, [ scaling*d for d in d2 ])
+        self.assertAlmostEqual(expectedArcLength, scaling, delta=1.0E-8*scaling)
+
+    def test_arc_length_index(self):
+        """
+        Test arc length index locates points at arc distances consistently with per-element arc lengths.
+        """
+        nx = [ [ 0.0, 0.0, 0.0 ], [ 1.0, 0.0, 0.0 ], [ 3.0, 1.0, 0.0 ], [ 4.0, 3.0, 1.0 ] ]
+        nd1 = [ [ 1.0, 0.0, 0.0 ], [ 1.5, 0.5, 0.0 ], [ 2.0, 1.0, 0.5 ], [ 1.0, 2.0, 1.0 ] ]
+        arcLengthIndex = interp.HermiteCurveArcLengthIndex(nx, nd1)
+        lengths = arcLengthIndex.getCumulativeLengths()
+        self.assertEqual(4, len(lengths))
+        length = 0.0
+        for e in range(3):
+            length += interp.getCubicHermiteArcLength(nx[e], nd1[e], nx[e + 1], nd1[e + 1])
+            self.assertAlmostEqual(length, lengths[e + 1], delta=1.0E-12)
+        self.assertAlmostEqual(5.763846042696357, arcLengthIndex.getLength(), delta=1.0E-12)
+        arcDistances = np.linspace(0.0, length, 21)[1:-1]
+        px, pd1, pe, pxi = arcLengthIndex.getPointsAtArcDistances(arcDistances)
+        self.assertEqual((19, 3), px.shape)
+        for n in range(19):
+            e = pe[n]
+            self.assertAlmostEqual(arcDistances[n], lengths[e] + \
+                interp.getCubicHermiteArcLengthToXi(nx[e], nd1[e], nx[e + 1], nd1[e + 1], pxi[n]), delta=1.0E-12)
+            self.assertEqual(interp.interpolateCubicHermite(nx[e], nd1[e], nx[e + 1], nd1[e + 1], pxi[n]), px[n].tolist())
+            x, d1, pointe, pointxi = interp.getCubicHermiteCurvesPointAtArcDistance(nx, nd1, arcDistances[n])
+            self.assertEqual(e, pointe)
+            self.assertAlmostEqual(pxi[n], pointxi, delta=1.0E-12)
+            for c in range(3):
+                self.assertAlmostEqual(pd1[n][c], d1[c], delta=1.0E-12)
+        # clamped at ends, and node distance at start of next element
+        self.assertEqual(( nx[0], nd1[0], 0, 0.0 ), arcLengthIndex.getPointAtArcDistance(-1.0))
+        self.assertEqual(( nx[-1], nd1[-1], 2, 1.0 ), arcLengthIndex.getPointAtArcDistance(length + 1.0))
+        self.assertEqual(( 1, 0.0 ), arcLengthIndex.getPointAtArcDistance(lengths[1])[2:])
+        self.assertEqual(( nx[0], nd1[0], 0, 0.0 ), interp.getCubicHermiteCurvesPointAtArcDistance(nx, nd1, -1.0))
+        self.assertEqual(( nx[-1], nd1[-1], 2, 1.0 ), interp.getCubicHermiteCurvesPointAtArcDistance(nx, nd1, length + 1.0))
+
+    def test_arc_length_xi_looped(self):
+        """
+        Test xi is found at arc distances in a looped element where arc length to xi is not monotonic.
+        """
+        nx = [ [ 9.14, 8.56, 9.44 ], [ 9.52, 8.87, 9.97 ] ]
+        nd1 = [ [ 1.62, 0.71, 1.76 ], [ 1.16, 1.62, 2.04 ] ]
+        self.assertGreater(interp.getCubicHermiteArcLengthToXi(nx[0], nd1[0], nx[1], nd1[1], 0.6),
+            interp.getCubicHermiteArcLengthToXi(nx[0], nd1[0], nx[1], nd1[1], 0.7))
+        arcLengthIndex = interp.HermiteCurveArcLengthIndex(nx, nd1)
+        arcDistances = [ 0.1, 0.398, 0.598, 0.9 ]
+        _, axi = arcLengthIndex.getElementXiArray(arcDistances)
+        for n in range(4):
+            _, _, e, xi = interp.getCubicHermiteCurvesPointAtArcDistance(nx, nd1, arcDistances[n])
+            self.assertEqual(0, e)
+            self.assertAlmostEqual(axi[n], xi, delta=1.0E-12)
+            self.assertAlmostEqual(arcDistances[n], interp.getCubicHermiteArcLengthToXi(nx[0], nd1[0], nx[1], nd1[1], xi), delta=1.0E-10)
+        self.assertAlmostEqual(0.8502257425975394, axi[2], delta=1.0E-10)
+
+    def test_smooth_derivatives_arrays(self):
+        """
+        Test smoothing derivatives along many lines and loops at once gives the same results as one at a time.
+        """
+        rng = np.random.default_rng(4)
+        t = np.linspace(0.0, 1.0, 5)
+        nx = np.stack([ np.stack([ 3.0*t + 0.2*rng.random(5), np.sin(2.0*t + k), 0.3*k*t ], axis=1) for k in range(6) ])
+        nd1 = np.gradient(nx, axis=1)*(1.0 + 0.3*rng.random((6, 5, 1)))
+        fixStartDerivative = [ True, False, False, True, False, False ]
+        fixEndDirection = [ False, True, False, True, False, True ]
+        for magnitudeScalingMode in (interp.DerivativeScalingMode.ARITHMETIC_MEAN, interp.DerivativeScalingMode.HARMONIC_MEAN):
+            for fixAllDirections in (False, True):
+                md1 = interp.smoothCubicHermiteDerivativesLineArray(nx, nd1, fixAllDirections=fixAllDirections,
+                    fixStartDerivative=fixStartDerivative, fixEndDirection=fixEndDirection, magnitudeScalingMode=magnitudeScalingMode)
+                self.assertEqual((6, 5, 3), md1.shape)
+                for n in range(6):
+                    self.assertEqual(interp.smoothCubicHermiteDerivativesLine(nx[n].tolist(), nd1[n].tolist(), fixAllDirections=fixAllDirections,
+                        fixStartDerivative=fixStartDerivative[n], fixEndDirection=fixEndDirection[n],
+                        magnitudeScalingMode=magnitudeScalingMode), md1[n].tolist())
+                md1 = interp.smoothCubicHermiteDerivativesLoopArray(nx, nd1, fixAllDirections=fixAllDirections,
+                    magnitudeScalingMode=magnitudeScalingMode)
+                for n in range(6):
+                    self.assertEqual(interp.smoothCubicHermiteDerivativesLoop(nx[n].tolist(), nd1[n].tolist(), fixAllDirections=fixAllDirections,
+                        magnitudeScalingMode=magnitudeScalingMode), md1[n].tolist())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from opencmiss.zinc.context import Context
+from opencmiss.zinc.field import Field
+from opencmiss.zinc.node import Node
+from opencmiss.zinc.result import RESULT_OK
+from scaffoldmaker.meshtypes.meshtype_3d_box1 import MeshType_3d_box1
+from scaffoldmaker.utils.meshrefinement import MeshRefinement
+
+class MeshRefinementTestCase(unittest.TestCase):
+
+    def test_refine_merge_chained_nodes(self):
+        """
+        Test refined points each within tolerance of the next but not of the one after are
+        merged with the first node created in tolerance only, not transitively.
+        """
+        context = Context("Test")
+        sourceRegion = context.getDefaultRegion()
+        options = MeshType_3d_box1.getDefaultOptions()
+        options['Number of elements 1'] = 1
+        options['Number of elements 2'] = 1
+        options['Number of elements 3'] = 1
+        MeshType_3d_box1.generateMesh(sourceRegion, options)
+        targetRegion = sourceRegion.createChild('refined')
+        meshrefinement = MeshRefinement(sourceRegion, targetRegion)
+        tolerance = meshrefinement._nodeGrid._tolerance
+        # squeeze xi1 = 1 face to 1.5*tolerance in y, so refining twice in xi2 gives 3 points
+        # 0.75*tolerance apart along each of its edges
+        fieldmodule = sourceRegion.getFieldmodule()
+        coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        fieldcache = fieldmodule.createFieldcache()
+        for nodeIdentifier in (2, 4, 6, 8):
+            fieldcache.setNode(nodes.findNodeByIdentifier(nodeIdentifier))
+            result, x = coordinates.getNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, 3)
+            self.assertEqual(RESULT_OK, result)
+            x[1] = 1.5*tolerance if (nodeIdentifier in (4, 8)) else 0.0
+            self.assertEqual(RESULT_OK, coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, x))
+            self.assertEqual(RESULT_OK, coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS2, 1, [ 0.0, 1.5*tolerance, 0.0 ]))
+        meshrefinement.refineAllElementsCubeStandard3d(1, 2, 1)
+        del meshrefinement
+
+        targetFieldmodule = targetRegion.getFieldmodule()
+        self.assertEqual(2, targetFieldmodule.findMeshByDimension(3).getSize())
+        # 6 nodes on xi1 = 0 face and 2 of 3 on each edge on xi1 = 1 face, where the middle point
+        # merges with the first but the last is not within tolerance of the first
+        targetNodes = targetFieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        self.assertEqual(10, targetNodes.getSize())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from opencmiss.zinc.context import Context
+from opencmiss.zinc.field import FieldFiniteElement
+from scaffoldmaker.meshtypes.meshtype_3d_box1 import MeshType_3d_box1
+from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
+from scaffoldmaker.scaffoldpackage import ScaffoldPackage
+from scaffoldmaker.utils import profiling
+from scaffoldmaker.utils.profiling import GenerationProfiler, getActiveProfiler
+
+class MeshType_test_outer(Scaffold_base):
+
+    @staticmethod
+    def generateBaseMesh(region, options):
+        MeshType_test_inner.generateBaseMesh(region, options)
+        MeshType_test_inner.generateBaseMesh(region, options)
+
+class MeshType_test_inner(Scaffold_base):
+
+    @classmethod
+    def generateBaseMesh(cls, region, options):
+        return cls.__name__
+
+class ProfilingTestCase(unittest.TestCase):
+
+    def test_profile_zinc_calls(self):
+        """
+        Test Zinc calls are counted in the scaffold generation stage making them, including
+        FieldFiniteElement node parameter calls, and Zinc methods are restored afterwards.
+        """
+        setNodeParameters = FieldFiniteElement.setNodeParameters
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        with GenerationProfiler('box') as profiler:
+            self.assertIs(profiler, getActiveProfiler())
+            self.assertIsNot(setNodeParameters, FieldFiniteElement.setNodeParameters)
+            ScaffoldPackage(MeshType_3d_box1).generate(region)
+        self.assertIsNone(getActiveProfiler())
+        self.assertIs(setNodeParameters, FieldFiniteElement.setNodeParameters)
+        report = profiler.getReport()
+        self.assertEqual('box', report['name'])
+        self.assertEqual([ 'ScaffoldPackage.generate' ], [ stage['name'] for stage in report['stages'] ])
+        generateMeshStage = report['stages'][0]['stages'][0]
+        self.assertEqual('MeshType_3d_box1.generateMesh', generateMeshStage['name'])
+        generateBaseMeshStage = generateMeshStage['stages'][0]
+        self.assertEqual('MeshType_3d_box1.generateBaseMesh', generateBaseMeshStage['name'])
+        zincCalls = generateBaseMeshStage['zincCalls']
+        self.assertEqual(8, zincCalls['Nodeset.createNode'])
+        self.assertEqual(32, zincCalls['FieldFiniteElement.setNodeParameters'])
+        self.assertEqual(1, zincCalls['Mesh.createElement'])
+
+    def test_profile_missing_zinc_method(self):
+        """
+        Test profiling fails if a Zinc method to count is not defined in its class, restoring other methods.
+        """
+        setNodeParameters = FieldFiniteElement.setNodeParameters
+        zincCountedMethods = profiling._zincCountedMethods
+        profiling._zincCountedMethods = zincCountedMethods + [ ( 'opencmiss.zinc.field', 'Field', 'setNodeParameters' ) ]
+        try:
+            with self.assertRaises(AssertionError):
+                with GenerationProfiler():
+                    pass
+        finally:
+            profiling._zincCountedMethods = zincCountedMethods
+        self.assertIsNone(getActiveProfiler())
+        self.assertIs(setNodeParameters, FieldFiniteElement.setNodeParameters)
+
+    def test_profile_scaffold_stages(self):
+        """
+        Test generation methods of scaffolds derived from Scaffold_base are timed as nested stages,
+        with repeated calls accumulated and return values passed through.
+        """
+        self.assertEqual('MeshType_test_inner', MeshType_test_inner.generateBaseMesh(None, {}))
+        with GenerationProfiler(countZincCalls=False) as profiler:
+            MeshType_test_outer.generateBaseMesh(None, {})
+            MeshType_test_outer.generateBaseMesh(None, {})
+        outerStage = profiler.getReport()['stages'][0]
+        self.assertEqual('MeshType_test_outer.generateBaseMesh', outerStage['name'])
+        self.assertEqual(2, outerStage['count'])
+        innerStage = outerStage['stages'][0]
+        self.assertEqual('MeshType_test_inner.generateBaseMesh', innerStage['name'])
+        self.assertEqual(4, innerStage['count'])
+        self.assertNotIn('stages', innerStage)
+        self.assertTrue(0.0 < innerStage['time'] <= outerStage['time'] <= profiler.getReport()['time'])
+
+if __name__ == "__main__":
+    unittest.main()
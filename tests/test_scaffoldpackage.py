@@ -0,0 +1,83 @@
+import unittest
+from scaffoldmaker.meshtypes.meshtype_1d_path1 import MeshType_1d_path1
+from scaffoldmaker.meshtypes.meshtype_3d_colon1 import MeshType_3d_colon1
+from scaffoldmaker.meshtypes.meshtype_3d_colonsegment1 import MeshType_3d_colonsegment1
+from scaffoldmaker.scaffoldpackage import ScaffoldPackage
+
+class ScaffoldPackageTestCase(unittest.TestCase):
+
+    def test_scaffoldpackage_fingerprint(self):
+        """
+        Test cached fingerprint changes with settings, nested scaffold package settings,
+        deep copied settings and mesh edits.
+        """
+        scaffoldPackage = ScaffoldPackage(MeshType_3d_colon1, defaultParameterSetName='Human 1')
+        fingerprint = scaffoldPackage.getFingerprint()
+        self.assertEqual(fingerprint, scaffoldPackage.getFingerprint())
+
+        settings = scaffoldPackage.getScaffoldSettings()
+        settings['Number of segments'] += 1
+        modifiedFingerprint = scaffoldPackage.getFingerprint()
+        self.assertNotEqual(fingerprint, modifiedFingerprint)
+        settings['Number of segments'] -= 1
+        self.assertEqual(fingerprint, scaffoldPackage.getFingerprint())
+
+        # modify nested scaffold package settings
+        centralPathSettings = settings['Central path'].getScaffoldSettings()
+        centralPathSettings['Number of elements'] += 1
+        nestedFingerprint = scaffoldPackage.getFingerprint()
+        self.assertNotEqual(fingerprint, nestedFingerprint)
+        centralPathSettings['Number of elements'] -= 1
+        self.assertEqual(fingerprint, scaffoldPackage.getFingerprint())
+        # modify settings of another nested scaffold package
+        segmentProfile = settings['Segment profile']
+        segmentProfile.getScaffoldSettings()['Wall thickness'] *= 2.0
+        self.assertNotEqual(fingerprint, scaffoldPackage.getFingerprint())
+        segmentProfile.getScaffoldSettings()['Wall thickness'] *= 0.5
+        self.assertEqual(fingerprint, scaffoldPackage.getFingerprint())
+
+        # deep copy has independent settings and fingerprint cache
+        copyPackage = ScaffoldPackage(MeshType_3d_colon1)
+        copyPackage.deepcopy(scaffoldPackage)
+        self.assertEqual(fingerprint, copyPackage.getFingerprint())
+        copyPackage.getScaffoldSettings()['Central path'].getScaffoldSettings()['Number of elements'] += 1
+        self.assertEqual(nestedFingerprint, copyPackage.getFingerprint())
+        self.assertEqual(fingerprint, scaffoldPackage.getFingerprint())
+        self.assertNotEqual(scaffoldPackage, copyPackage)
+        copyPackage.getScaffoldSettings()['Central path'].getScaffoldSettings()['Number of elements'] -= 1
+        self.assertEqual(scaffoldPackage, copyPackage)
+        settings['Segment profile'].getScaffoldSettings()['Wall thickness'] *= 2.0
+        self.assertNotEqual(fingerprint, scaffoldPackage.getFingerprint())
+        self.assertEqual(fingerprint, copyPackage.getFingerprint())
+        settings['Segment profile'].getScaffoldSettings()['Wall thickness'] *= 0.5
+
+        # mesh edits
+        scaffoldPackage.setMeshEdits('Region: /\n')
+        self.assertNotEqual(fingerprint, scaffoldPackage.getFingerprint())
+        self.assertNotEqual(scaffoldPackage, copyPackage)
+        scaffoldPackage.setMeshEdits(None)
+        self.assertEqual(fingerprint, scaffoldPackage.getFingerprint())
+        self.assertEqual(scaffoldPackage, copyPackage)
+
+    def test_scaffoldpackage_equality(self):
+        """
+        Test scaffold packages with equal but differently typed option values are equal.
+        """
+        scaffoldPackage1 = ScaffoldPackage(MeshType_1d_path1, { 'scaffoldSettings' : { 'Length' : 1 } })
+        scaffoldPackage2 = ScaffoldPackage(MeshType_1d_path1, { 'scaffoldSettings' : { 'Length' : 1.0 } })
+        self.assertNotEqual(scaffoldPackage1.getFingerprint(), scaffoldPackage2.getFingerprint())
+        self.assertEqual(scaffoldPackage1, scaffoldPackage2)
+        scaffoldPackage2.getScaffoldSettings()['Length'] = 2.0
+        self.assertNotEqual(scaffoldPackage1, scaffoldPackage2)
+        self.assertNotEqual(scaffoldPackage1, ScaffoldPackage(MeshType_3d_colonsegment1))
+
+        scaffoldPackage1 = ScaffoldPackage(MeshType_3d_colon1, defaultParameterSetName='Human 1')
+        scaffoldPackage2 = ScaffoldPackage(MeshType_3d_colon1, defaultParameterSetName='Human 1')
+        self.assertEqual(scaffoldPackage1, scaffoldPackage2)
+        scaffoldPackage2.getScaffoldSettings()['Segment profile'].getScaffoldSettings()['Number of tenia coli'] = 3.0
+        self.assertEqual(scaffoldPackage1, scaffoldPackage2)
+        scaffoldPackage2.getScaffoldSettings()['Segment profile'].getScaffoldSettings()['Number of tenia coli'] = True
+        self.assertNotEqual(scaffoldPackage1, scaffoldPackage2)
+
+if __name__ == "__main__":
+    unittest.main()
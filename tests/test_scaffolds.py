@@ -0,0 +1,52 @@
+import unittest
+from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
+from scaffoldmaker.scaffolds import Scaffolds
+
+class MeshType_test_custom1(Scaffold_base):
+
+    @staticmethod
+    def getName():
+        return '3D Test Custom 1'
+
+class ScaffoldsTestCase(unittest.TestCase):
+
+    def test_scaffold_registry(self):
+        """
+        Test lazy scaffold registry names match the scaffold types they load.
+        """
+        scaffolds = Scaffolds()
+        self.assertIsNone(scaffolds.findScaffoldTypeByName("Not a scaffold"))
+        scaffoldType = scaffolds.findScaffoldTypeByName("3D Box 1")
+        self.assertEqual("3D Box 1", scaffoldType.getName())
+        self.assertIs(scaffoldType, scaffolds.getDefaultScaffoldType())
+        names = scaffolds.getScaffoldTypeNames()
+        self.assertEqual(28, len(names))
+        scaffoldTypes = scaffolds.getScaffoldTypes()
+        self.assertEqual(names, [ scaffoldType.getName() for scaffoldType in scaffoldTypes ])
+        for name, scaffoldType in zip(names, scaffoldTypes):
+            self.assertIs(scaffoldType, scaffolds.findScaffoldTypeByName(name))
+        self.assertIs(scaffoldTypes, scaffolds.getScaffoldTypes())
+        self.assertIs(scaffoldTypes, scaffolds._allScaffoldTypes)
+        from scaffoldmaker.scaffolds import MeshType_3d_heart1
+        self.assertIs(MeshType_3d_heart1, scaffolds.findScaffoldTypeByName("3D Heart 1"))
+
+    def test_scaffold_registry_modified(self):
+        """
+        Test scaffold types added to or removed from an instance's list are seen by that instance only.
+        """
+        scaffolds = Scaffolds()
+        scaffoldType = scaffolds.findScaffoldTypeByName("3D Box 1")
+        scaffolds._allScaffoldTypes.append(MeshType_test_custom1)
+        self.assertIs(MeshType_test_custom1, scaffolds.findScaffoldTypeByName("3D Test Custom 1"))
+        self.assertEqual("3D Test Custom 1", scaffolds.getScaffoldTypeNames()[-1])
+        self.assertIs(MeshType_test_custom1, scaffolds.getScaffoldTypes()[-1])
+        scaffolds.getScaffoldTypes().remove(scaffoldType)
+        self.assertIsNone(scaffolds.findScaffoldTypeByName("3D Box 1"))
+        self.assertEqual(28, len(scaffolds.getScaffoldTypeNames()))
+        otherScaffolds = Scaffolds()
+        self.assertIsNone(otherScaffolds.findScaffoldTypeByName("3D Test Custom 1"))
+        self.assertIs(scaffoldType, otherScaffolds.findScaffoldTypeByName("3D Box 1"))
+        self.assertNotIn(MeshType_test_custom1, otherScaffolds.getScaffoldTypes())
+
+if __name__ == "__main__":
+    unittest.main()
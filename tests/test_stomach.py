@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+from opencmiss.utils.zinc.finiteelement import evaluateFieldNodesetRange
+from opencmiss.zinc.context import Context
+from opencmiss.zinc.field import Field
+from opencmiss.zinc.node import Node
+from opencmiss.zinc.result import RESULT_OK
+from scaffoldmaker.meshtypes.meshtype_3d_stomachhuman1 import MeshType_3d_stomachhuman1
+from testutils import assertAlmostEqualList
+
+class StomachScaffoldTestCase(unittest.TestCase):
+
+    def test_stomachhuman1(self):
+        """
+        Test creation of human stomach scaffold with normalized circumferential segment lengths.
+        """
+        options = MeshType_3d_stomachhuman1.getDefaultOptions()
+        self.assertEqual(11, options.get("Number of elements along the axis"))
+        self.assertEqual(3, options.get("Number of elements through the wall"))
+        self.assertEqual(8, options.get("Number of elements along the circumference"))
+        self.assertTrue(options.get("Normalize Circumferential Segment Lengths"))
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        self.assertTrue(region.isValid())
+        MeshType_3d_stomachhuman1.generateMesh(region, options)
+
+        fieldmodule = region.getFieldmodule()
+        mesh3d = fieldmodule.findMeshByDimension(3)
+        self.assertEqual(264, mesh3d.getSize())
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        self.assertEqual(384, nodes.getSize())
+
+        coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+        self.assertTrue(coordinates.isValid())
+        minimums, maximums = evaluateFieldNodesetRange(coordinates, nodes)
+        assertAlmostEqualList(self, minimums, [ -0.41616963761302894, -0.4718423850914561, -0.5617831769261747 ], 1.0E-6)
+        assertAlmostEqualList(self, maximums, [ 0.5815545631087864, 0.525356024865248, 0.406414028685124 ], 1.0E-6)
+        fieldcache = fieldmodule.createFieldcache()
+        fieldcache.setNode(nodes.findNodeByIdentifier(40))
+        result, x = coordinates.getNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, 3)
+        self.assertEqual(RESULT_OK, result)
+        assertAlmostEqualList(self, x, [ 0.09842450240372068, 0.090183160749508, 0.26049761498820967 ], 1.0E-6)
+
+    def test_stomachhuman1_many_elements_around(self):
+        """
+        Test human stomach scaffold with 64 elements around is generated with the default and checked
+        number of circumferential length samples, and with the latter no nodes around coincide.
+        """
+        options = MeshType_3d_stomachhuman1.getDefaultOptions()
+        options['Number of elements along the circumference'] = 64
+        for samplesCount in (200, 4096):
+            if samplesCount > 200:
+                MeshType_3d_stomachhuman1.checkOptions(options)
+            self.assertEqual(samplesCount, options['Circumferential length samples'])
+            context = Context("Test")
+            region = context.getDefaultRegion()
+            MeshType_3d_stomachhuman1.generateMesh(region, options)
+            fieldmodule = region.getFieldmodule()
+            self.assertEqual(2112, fieldmodule.findMeshByDimension(3).getSize())
+            nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+            self.assertEqual(3072, nodes.getSize())
+        coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+        fieldcache = fieldmodule.createFieldcache()
+        x = []
+        for nodeIdentifier in range(1, 3073):
+            fieldcache.setNode(nodes.findNodeByIdentifier(nodeIdentifier))
+            result, nx = coordinates.getNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, 3)
+            self.assertEqual(RESULT_OK, result)
+            x.append(nx)
+        # nodes are numbered around cross-sections of 64 nodes
+        x = np.array(x).reshape((-1, 64, 3))
+        segmentLengths = np.linalg.norm(np.roll(x, -1, axis=1) - x, axis=2)
+        self.assertTrue(np.all(segmentLengths > 0.1*np.mean(segmentLengths, axis=1)[:, np.newaxis]))
+
+if __name__ == "__main__":
+    unittest.main()
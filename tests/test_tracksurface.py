@@ -0,0 +1,48 @@
+import math
+import unittest
+from scaffoldmaker.utils.tracksurface import TrackSurface, TrackSurfacePosition
+
+class TrackSurfaceTestCase(unittest.TestCase):
+
+    def test_evaluate_coordinates(self):
+        """
+        Test single and many position evaluation of track surface on part of a cylinder.
+        """
+        elementsCount1 = 4
+        elementsCount2 = 3
+        nx = []
+        nd1 = []
+        nd2 = []
+        for n2 in range(elementsCount2 + 1):
+            for n1 in range(elementsCount1 + 1):
+                angle = 0.5*n1
+                nx .append([ math.cos(angle), math.sin(angle), 0.4*n2 ])
+                nd1.append([ -0.5*math.sin(angle), 0.5*math.cos(angle), 0.0 ])
+                nd2.append([ 0.0, 0.0, 0.4 ])
+        trackSurface = TrackSurface(elementsCount1, elementsCount2, nx, nd1, nd2)
+        # exact at nodes
+        x, d1, d2 = trackSurface.evaluateCoordinates(TrackSurfacePosition(1, 2, 1.0, 0.0), derivatives = True)
+        for c in range(3):
+            self.assertAlmostEqual(nx[12][c], x[c], delta=1.0E-12)
+            self.assertAlmostEqual(nd1[12][c], d1[c], delta=1.0E-12)
+            self.assertAlmostEqual(nd2[12][c], d2[c], delta=1.0E-12)
+        x = trackSurface.evaluateCoordinates(TrackSurfacePosition(2, 1, 0.5, 0.25))
+        self.assertAlmostEqual(1.0, math.sqrt(x[0]*x[0] + x[1]*x[1]), delta=1.0E-3)
+        self.assertAlmostEqual(0.5, x[2], delta=1.0E-12)
+        proportions = [ [ 0.0, 0.0 ], [ 0.3, 0.6 ], [ 0.625, 0.5 ], [ 1.0, 1.0 ] ]
+        positions = trackSurface.createPositionsProportionArray(proportions)
+        self.assertEqual([ 2.0, 1.0, 0.5, 0.5 ], positions[2].tolist())
+        px, pd1, pd2 = trackSurface.evaluateCoordinatesMany(positions, derivatives = True)
+        self.assertEqual((4, 3), px.shape)
+        for n in range(4):
+            position = trackSurface.createPositionProportion(*proportions[n])
+            self.assertEqual([ position.e1, position.e2, position.xi1, position.xi2 ], positions[n].tolist())
+            x, d1, d2 = trackSurface.evaluateCoordinates(position, derivatives = True)
+            for c in range(3):
+                self.assertAlmostEqual(x[c], px[n][c], delta=1.0E-12)
+                self.assertAlmostEqual(d1[c], pd1[n][c], delta=1.0E-12)
+                self.assertAlmostEqual(d2[c], pd2[n][c], delta=1.0E-12)
+        self.assertEqual(px.tolist(), trackSurface.evaluateCoordinatesMany(positions).tolist())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import numpy as np
+from scaffoldmaker.annotation.annotationgroup import AnnotationGroup
+from opencmiss.utils.zinc.field import findOrCreateFieldCoordinates
+from opencmiss.zinc.context import Context
+from opencmiss.zinc.element import Element, Elementbasis
+from opencmiss.zinc.field import Field
+from opencmiss.zinc.node import Node
+from opencmiss.zinc.result import RESULT_OK
+from scaffoldmaker.utils.profiling import GenerationProfiler
+from scaffoldmaker.utils.zinc_utils import createElementsFromArrays, createNodesFromArrays
+
+class ZincUtilsTestCase(unittest.TestCase):
+
+    def test_create_nodes_from_arrays(self):
+        """
+        Test creating nodes with versioned parameters and non-consecutive identifiers from arrays,
+        setting only parameters which are non-zero at any node.
+        """
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        fieldmodule = region.getFieldmodule()
+        coordinates = findOrCreateFieldCoordinates(fieldmodule)
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        nodetemplate = nodes.createNodetemplate()
+        nodetemplate.defineField(coordinates)
+        nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS1, 2)
+        nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS2, 1)
+        valueLabels = [ Node.VALUE_LABEL_VALUE, ( Node.VALUE_LABEL_D_DS1, 1 ), ( Node.VALUE_LABEL_D_DS1, 2 ), Node.VALUE_LABEL_D_DS2 ]
+        values = np.zeros((3, 4, 3))
+        values[:, 0] = [ [ 0.0, 0.0, 0.0 ], [ 1.0, 0.0, 0.0 ], [ 2.0, 0.5, 0.0 ] ]
+        values[:, 1] = [ [ 1.0, 0.0, 0.0 ], [ 1.0, 0.2, 0.0 ], [ 1.0, 0.4, 0.0 ] ]
+        values[1, 2] = [ 0.0, 1.0, 0.0 ]
+        nodeIdentifiers = [ 5, 2, 11 ]
+        with GenerationProfiler() as profiler:
+            self.assertIsNone(createNodesFromArrays(nodes, nodetemplate, [ ( coordinates, valueLabels, values[:0] ) ], []))
+            self.assertEqual(12, createNodesFromArrays(nodes, nodetemplate, [ ( coordinates, valueLabels, values ) ], nodeIdentifiers))
+        zincCalls = profiler.getReport()['zincCalls']
+        self.assertEqual(3, zincCalls['Nodeset.createNode'])
+        # D_DS2 is zero at all nodes so is not set
+        self.assertEqual(9, zincCalls['FieldFiniteElement.setNodeParameters'])
+        self.assertEqual(3, nodes.getSize())
+        cache = fieldmodule.createFieldcache()
+        for n, nodeIdentifier in enumerate(nodeIdentifiers):
+            cache.setNode(nodes.findNodeByIdentifier(nodeIdentifier))
+            for v, valueLabel in enumerate(valueLabels):
+                valueLabel, version = valueLabel if isinstance(valueLabel, tuple) else ( valueLabel, 1 )
+                result, x = coordinates.getNodeParameters(cache, -1, valueLabel, version, 3)
+                self.assertEqual(RESULT_OK, result)
+                self.assertEqual(values[n, v].tolist(), x)
+
+        # consecutive identifiers from int, and empty input
+        self.assertEqual(23, createNodesFromArrays(nodes, nodetemplate, [ ( coordinates, valueLabels, values ) ], 20))
+        for nodeIdentifier in (20, 21, 22):
+            self.assertTrue(nodes.findNodeByIdentifier(nodeIdentifier).isValid())
+        self.assertEqual(30, createNodesFromArrays(nodes, nodetemplate, [ ( coordinates, valueLabels, values[:0] ) ], 30))
+        self.assertEqual(6, nodes.getSize())
+
+        with self.assertRaises(AssertionError):
+            createNodesFromArrays(nodes, nodetemplate, [ ( coordinates, valueLabels, values[:, :3] ) ], 40)
+        with self.assertRaises(AssertionError):
+            createNodesFromArrays(nodes, nodetemplate, [ ( coordinates, valueLabels, values[:, :, :2] ) ], 40)
+        with self.assertRaises(AssertionError):
+            createNodesFromArrays(nodes, nodetemplate, [ ( coordinates, valueLabels, values ) ], [ 40, 41 ])
+        self.assertEqual(6, nodes.getSize())
+
+    def test_create_elements_from_arrays(self):
+        """
+        Test creating elements from list and numpy array connectivity with mixed templates of
+        different local node counts, non-consecutive identifiers and mesh group masks.
+        """
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        fieldmodule = region.getFieldmodule()
+        coordinates = findOrCreateFieldCoordinates(fieldmodule, components_count=2)
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        nodetemplate = nodes.createNodetemplate()
+        nodetemplate.defineField(coordinates)
+        # 3 x 2 grid of nodes 1-6
+        values = [ [ [ float(i), float(j) ] ] for j in range(2) for i in range(3) ]
+        createNodesFromArrays(nodes, nodetemplate, [ ( coordinates, [ Node.VALUE_LABEL_VALUE ], values ) ], 1)
+        mesh = fieldmodule.findMeshByDimension(2)
+        elementtemplates = []
+        for shapeType, functionType in ((Element.SHAPE_TYPE_SQUARE, Elementbasis.FUNCTION_TYPE_LINEAR_LAGRANGE),
+                                        (Element.SHAPE_TYPE_TRIANGLE, Elementbasis.FUNCTION_TYPE_LINEAR_SIMPLEX)):
+            eft = mesh.createElementfieldtemplate(fieldmodule.createElementbasis(2, functionType))
+            elementtemplate = mesh.createElementtemplate()
+            elementtemplate.setElementShapeType(shapeType)
+            elementtemplate.defineField(coordinates, -1, eft)
+            elementtemplates.append(( elementtemplate, [ eft ] ))
+        groups = [ AnnotationGroup(region, name, None, None) for name in ('all', 'none', 'masked') ]
+        meshGroups = [ group.getMeshGroup(mesh) for group in groups ]
+
+        # mixed templates with list connectivity and non-consecutive identifiers
+        elementsNodeIdentifiers = [ [ 1, 2, 4, 5 ], [ 2, 3, 5 ], [ 3, 6, 5 ] ]
+        elementIdentifiers = [ 7, 3, 10 ]
+        self.assertEqual(11, createElementsFromArrays(mesh, elementtemplates, elementsNodeIdentifiers, elementIdentifiers,
+            elementtemplateIndexes=np.array([ 0, 1, 1 ]),
+            meshGroupsMasks=[ ( meshGroups[0], True ), ( meshGroups[1], False ), ( meshGroups[2], np.array([ False, True, True ]) ) ]))
+        self.assertEqual(3, mesh.getSize())
+        for elementIdentifier, nodeIdentifiers, elementtemplateIndex in zip(elementIdentifiers, elementsNodeIdentifiers, [ 0, 1, 1 ]):
+            element = mesh.findElementByIdentifier(elementIdentifier)
+            eft = elementtemplates[elementtemplateIndex][1][0]
+            self.assertEqual(nodeIdentifiers, [ element.getNode(eft, n + 1).getIdentifier() for n in range(len(nodeIdentifiers)) ])
+        self.assertEqual([ 3, 0, 2 ], [ meshGroup.getSize() for meshGroup in meshGroups ])
+        self.assertFalse(meshGroups[2].containsElement(mesh.findElementByIdentifier(7)))
+        self.assertTrue(meshGroups[2].containsElement(mesh.findElementByIdentifier(3)))
+
+        # numpy connectivity with default first template and consecutive identifiers
+        elementsNodeIdentifiers = np.array([ [ 1, 2, 4, 5 ], [ 2, 3, 5, 6 ] ])
+        self.assertEqual(22, createElementsFromArrays(mesh, elementtemplates, elementsNodeIdentifiers, 20,
+            meshGroupsMasks=[ ( meshGroups[2], [ True, False ] ) ]))
+        self.assertEqual([ 2, 3, 5, 6 ], [ mesh.findElementByIdentifier(21).getNode(elementtemplates[0][1][0], n + 1).getIdentifier() for n in range(4) ])
+        self.assertTrue(meshGroups[2].containsElement(mesh.findElementByIdentifier(20)))
+        self.assertFalse(meshGroups[2].containsElement(mesh.findElementByIdentifier(21)))
+        self.assertEqual(5, mesh.getSize())
+
+        # empty input
+        self.assertEqual(30, createElementsFromArrays(mesh, elementtemplates, [], 30))
+        self.assertIsNone(createElementsFromArrays(mesh, elementtemplates, np.zeros((0, 4), dtype=int), []))
+        self.assertEqual(5, mesh.getSize())
+
+if __name__ == "__main__":
+    unittest.main()